@@ -0,0 +1,98 @@
+"""Add search_documents table and full-text index
+
+Revision ID: 05c2fbe47005
+Revises: 6b1e8b898225
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05c2fbe47005'
+down_revision: Union[str, Sequence[str], None] = '6b1e8b898225'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE VIRTUAL TABLE search_documents_trigram USING fts5("
+    "title, body, content='search_documents', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); "
+    "INSERT INTO search_documents_trigram(rowid, title, body) VALUES (new.id, new.title, new.body); "
+    "END",
+    "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_trigram(search_documents_trigram, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "END",
+    "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_trigram(search_documents_trigram, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); "
+    "INSERT INTO search_documents_trigram(rowid, title, body) VALUES (new.id, new.title, new.body); "
+    "END",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS search_documents_au",
+    "DROP TRIGGER IF EXISTS search_documents_ad",
+    "DROP TRIGGER IF EXISTS search_documents_ai",
+    "DROP TABLE IF EXISTS search_documents_trigram",
+    "DROP TABLE IF EXISTS search_documents_fts",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE search_documents ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED",
+    "CREATE INDEX ix_search_documents_vector ON search_documents USING GIN (search_vector)",
+    "CREATE INDEX ix_search_documents_trgm ON search_documents "
+    "USING GIN ((title || ' ' || body) gin_trgm_ops)",
+]
+
+BACKFILL = [
+    "INSERT INTO search_documents (entity_type, entity_id, user_id, title, body) "
+    "SELECT 'client', id, user_id, TRIM(contact_name || ' ' || COALESCE(company_name, '')), "
+    "TRIM(contact_email || ' ' || COALESCE(notes, '')) FROM clients",
+    "INSERT INTO search_documents (entity_type, entity_id, user_id, title, body) "
+    "SELECT 'lead', id, NULL, name, email || ' ' || message FROM leads",
+    "INSERT INTO search_documents (entity_type, entity_id, user_id, title, body) "
+    "SELECT 'project', id, NULL, title, description || ' ' || COALESCE(CAST(tech_stack AS TEXT), '') FROM projects",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('search_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entity_type', 'entity_id', name='uq_search_document_entity')
+    )
+    op.create_index(op.f('ix_search_documents_id'), 'search_documents', ['id'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    ddl = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE}.get(dialect, [])
+    for statement in ddl + BACKFILL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    op.drop_index(op.f('ix_search_documents_id'), table_name='search_documents')
+    op.drop_table('search_documents')
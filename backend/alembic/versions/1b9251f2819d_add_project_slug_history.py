@@ -0,0 +1,41 @@
+"""Add project_slug_history table
+
+Revision ID: 1b9251f2819d
+Revises: d144fb823db0
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b9251f2819d'
+down_revision: Union[str, Sequence[str], None] = 'd144fb823db0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_slug_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_slug_history_id'), 'project_slug_history', ['id'], unique=False)
+    op.create_index(op.f('ix_project_slug_history_project_id'), 'project_slug_history', ['project_id'], unique=False)
+    op.create_index(op.f('ix_project_slug_history_slug'), 'project_slug_history', ['slug'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_project_slug_history_slug'), table_name='project_slug_history')
+    op.drop_index(op.f('ix_project_slug_history_project_id'), table_name='project_slug_history')
+    op.drop_index(op.f('ix_project_slug_history_id'), table_name='project_slug_history')
+    op.drop_table('project_slug_history')
@@ -0,0 +1,55 @@
+"""Add invoice_summaries table
+
+Revision ID: 6b1e8b898225
+Revises: 5235c19dae66
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1e8b898225'
+down_revision: Union[str, Sequence[str], None] = '5235c19dae66'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('invoice_summaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('DRAFT', 'SENT', 'PAID', 'OVERDUE', 'CANCELLED', name='invoicestatus', create_type=False), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('invoice_count', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'client_id', 'status', 'period', name='uq_invoice_summary_bucket')
+    )
+    op.create_index(op.f('ix_invoice_summaries_id'), 'invoice_summaries', ['id'], unique=False)
+    op.create_index(op.f('ix_invoice_summaries_user_id'), 'invoice_summaries', ['user_id'], unique=False)
+
+    # Backfill from existing invoices
+    op.execute(
+        "INSERT INTO invoice_summaries (user_id, client_id, status, period, invoice_count, total) "
+        "SELECT user_id, client_id, status, "
+        + ("to_char(COALESCE(issue_date, created_at), 'YYYY-MM')"
+           if op.get_bind().dialect.name == "postgresql"
+           else "strftime('%Y-%m', COALESCE(issue_date, created_at))")
+        + ", COUNT(*), COALESCE(SUM(total), 0) "
+        "FROM invoices GROUP BY user_id, client_id, status, 4"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_invoice_summaries_user_id'), table_name='invoice_summaries')
+    op.drop_index(op.f('ix_invoice_summaries_id'), table_name='invoice_summaries')
+    op.drop_table('invoice_summaries')
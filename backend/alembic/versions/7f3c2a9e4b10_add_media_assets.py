@@ -0,0 +1,56 @@
+"""Add content-addressed media_assets and project_media.asset_id
+
+Revision ID: 7f3c2a9e4b10
+Revises: 1b9251f2819d
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3c2a9e4b10'
+down_revision: Union[str, Sequence[str], None] = '1b9251f2819d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('media_assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('backend', sa.String(length=20), nullable=False),
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('media_type', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_media_assets_id'), 'media_assets', ['id'], unique=False)
+    op.create_index(op.f('ix_media_assets_sha256'), 'media_assets', ['sha256'], unique=True)
+    op.create_index(op.f('ix_media_assets_url'), 'media_assets', ['url'], unique=False)
+
+    # Existing uploads keep asset_id NULL and are deleted by URL as before
+    with op.batch_alter_table('project_media') as batch_op:
+        batch_op.add_column(sa.Column('asset_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_project_media_asset_id'), ['asset_id'], unique=False)
+        batch_op.create_foreign_key('fk_project_media_asset_id', 'media_assets', ['asset_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('project_media') as batch_op:
+        batch_op.drop_constraint('fk_project_media_asset_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_project_media_asset_id'))
+        batch_op.drop_column('asset_id')
+
+    op.drop_index(op.f('ix_media_assets_url'), table_name='media_assets')
+    op.drop_index(op.f('ix_media_assets_sha256'), table_name='media_assets')
+    op.drop_index(op.f('ix_media_assets_id'), table_name='media_assets')
+    op.drop_table('media_assets')
@@ -0,0 +1,35 @@
+"""Make invoice numbers unique per user instead of globally
+
+Revision ID: 9d3f5b7a1c42
+Revises: b5d8e2f4a196
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f5b7a1c42'
+down_revision: Union[str, Sequence[str], None] = 'b5d8e2f4a196'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # invoice_number_counters hands out numbers per user, so two users'
+    # first invoices of a year share a number
+    op.drop_index(op.f('ix_invoices_invoice_number'), table_name='invoices')
+    op.create_index(op.f('ix_invoices_invoice_number'), 'invoices', ['invoice_number'], unique=False)
+    with op.batch_alter_table('invoices') as batch_op:
+        batch_op.create_unique_constraint('uq_invoices_user_number', ['user_id', 'invoice_number'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('invoices') as batch_op:
+        batch_op.drop_constraint('uq_invoices_user_number', type_='unique')
+    op.drop_index(op.f('ix_invoices_invoice_number'), table_name='invoices')
+    op.create_index(op.f('ix_invoices_invoice_number'), 'invoices', ['invoice_number'], unique=True)
@@ -0,0 +1,74 @@
+"""Add project_tags and related_projects
+
+Revision ID: a7e3f1c9d254
+Revises: f2d4c6a8b031
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+import json
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3f1c9d254'
+down_revision: Union[str, Sequence[str], None] = 'f2d4c6a8b031'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_tags',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(length=100), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id', 'tag')
+    )
+    op.create_index('ix_project_tags_tag_project', 'project_tags', ['tag', 'project_id'], unique=False)
+    op.create_table('related_projects',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('related_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['related_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id', 'related_id')
+    )
+    op.create_index('ix_related_projects_project_score', 'related_projects', ['project_id', 'score'], unique=False)
+    op.create_index(op.f('ix_related_projects_related_id'), 'related_projects', ['related_id'], unique=False)
+
+    # Backfill from tech_stack, normalized as project_service.normalize_tag does
+    conn = op.get_bind()
+    rows = []
+    for project_id, tech_stack in conn.execute(sa.text("SELECT id, tech_stack FROM projects")):
+        if isinstance(tech_stack, str):
+            tech_stack = json.loads(tech_stack)
+        tags = {}
+        for name in tech_stack or []:
+            tag = re.sub(r"\s+", " ", name or "").strip().lower()
+            if tag:
+                tags.setdefault(tag, name.strip())
+        rows.extend({"project_id": project_id, "tag": tag, "name": name} for tag, name in tags.items())
+    if rows:
+        conn.execute(sa.text(
+            "INSERT INTO project_tags (project_id, tag, name) VALUES (:project_id, :tag, :name)"
+        ), rows)
+    conn.execute(sa.text(
+        "INSERT INTO related_projects (project_id, related_id, score) "
+        "SELECT a.project_id, b.project_id, COUNT(*) FROM project_tags a "
+        "JOIN project_tags b ON b.tag = a.tag AND b.project_id != a.project_id "
+        "GROUP BY a.project_id, b.project_id"
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_related_projects_related_id'), table_name='related_projects')
+    op.drop_index('ix_related_projects_project_score', table_name='related_projects')
+    op.drop_table('related_projects')
+    op.drop_index('ix_project_tags_tag_project', table_name='project_tags')
+    op.drop_table('project_tags')
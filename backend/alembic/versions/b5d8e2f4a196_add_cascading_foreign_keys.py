@@ -0,0 +1,96 @@
+"""Let the database cascade deletes of projects, clients and invoices
+
+Revision ID: b5d8e2f4a196
+Revises: a7e3f1c9d254
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from collections import defaultdict
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d8e2f4a196'
+down_revision: Union[str, Sequence[str], None] = 'a7e3f1c9d254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, referred table, ON DELETE action)
+FOREIGN_KEYS = [
+    ('projects', 'client_id', 'clients', 'SET NULL'),
+    ('project_media', 'project_id', 'projects', 'CASCADE'),
+    ('project_media', 'asset_id', 'media_assets', 'SET NULL'),
+    ('project_metrics', 'project_id', 'projects', 'CASCADE'),
+    ('invoices', 'client_id', 'clients', 'CASCADE'),
+    ('invoices', 'project_id', 'projects', 'SET NULL'),
+    ('invoice_items', 'invoice_id', 'invoices', 'CASCADE'),
+    ('invoice_summaries', 'client_id', 'clients', 'CASCADE'),
+]
+
+# Referencing columns a cascade looks rows up by; project_media.project_id
+# is already covered by uq_project_media_slot
+INDEXED_COLUMNS = [
+    ('projects', 'client_id'),
+    ('project_metrics', 'project_id'),
+    ('invoices', 'client_id'),
+    ('invoices', 'project_id'),
+    ('invoice_items', 'invoice_id'),
+    ('invoice_summaries', 'client_id'),
+]
+
+# Names SQLite's unnamed foreign keys get when batch mode reflects them
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s"}
+
+
+def _existing_name(inspector, table: str, column: str) -> Optional[str]:
+    for foreign_key in inspector.get_foreign_keys(table):
+        if foreign_key['constrained_columns'] == [column]:
+            return foreign_key['name'] or f'fk_{table}_{column}'
+    return None
+
+
+def _has_column(inspector, table: str, column: str) -> bool:
+    # Some databases were created with create_all and have columns no migration added
+    return table in inspector.get_table_names() and column in {c['name'] for c in inspector.get_columns(table)}
+
+
+def _set_ondelete(upgrading: bool) -> None:
+    inspector = sa.inspect(op.get_bind())
+    changes = defaultdict(list)
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        if not _has_column(inspector, table, column):
+            continue
+        changes[table].append((column, referred, ondelete if upgrading else None))
+
+    for table, columns in changes.items():
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for column, referred, ondelete in columns:
+                existing = _existing_name(inspector, table, column)
+                if existing:
+                    batch_op.drop_constraint(existing, type_='foreignkey')
+                batch_op.create_foreign_key(f'fk_{table}_{column}', referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _set_ondelete(upgrading=True)
+    inspector = sa.inspect(op.get_bind())
+    for table, column in INDEXED_COLUMNS:
+        if not _has_column(inspector, table, column):
+            continue
+        if f'ix_{table}_{column}' not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for table, column in INDEXED_COLUMNS:
+        if not _has_column(inspector, table, column):
+            continue
+        if f'ix_{table}_{column}' in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
+    _set_ondelete(upgrading=False)
@@ -0,0 +1,41 @@
+"""Add pending_media_deletions queue
+
+Revision ID: c81e5d0a6f27
+Revises: 7f3c2a9e4b10
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81e5d0a6f27'
+down_revision: Union[str, Sequence[str], None] = '7f3c2a9e4b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pending_media_deletions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('backend', sa.String(length=20), nullable=False),
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('media_type', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pending_media_deletions_id'), 'pending_media_deletions', ['id'], unique=False)
+    op.create_index(op.f('ix_pending_media_deletions_created_at'), 'pending_media_deletions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pending_media_deletions_created_at'), table_name='pending_media_deletions')
+    op.drop_index(op.f('ix_pending_media_deletions_id'), table_name='pending_media_deletions')
+    op.drop_table('pending_media_deletions')
@@ -0,0 +1,50 @@
+"""Add invoice_number_counters table
+
+Revision ID: d144fb823db0
+Revises: 05c2fbe47005
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd144fb823db0'
+down_revision: Union[str, Sequence[str], None] = '05c2fbe47005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    counters = op.create_table('invoice_number_counters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('last_number', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'year')
+    )
+
+    # Seed counters past the highest existing number, e.g. INV-2025-0042
+    last_numbers = {}
+    rows = op.get_bind().execute(sa.text("SELECT user_id, invoice_number FROM invoices"))
+    for user_id, invoice_number in rows:
+        match = re.search(r"(\d{4})-(\d+)$", invoice_number or "")
+        if match:
+            key = (user_id, int(match.group(1)))
+            last_numbers[key] = max(last_numbers.get(key, 0), int(match.group(2)))
+
+    if last_numbers:
+        op.bulk_insert(counters, [
+            {"user_id": user_id, "year": year, "last_number": number}
+            for (user_id, year), number in last_numbers.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('invoice_number_counters')
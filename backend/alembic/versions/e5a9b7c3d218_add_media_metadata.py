@@ -0,0 +1,41 @@
+"""Add extracted metadata columns to project_media and media_assets
+
+Revision ID: e5a9b7c3d218
+Revises: c81e5d0a6f27
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9b7c3d218'
+down_revision: Union[str, Sequence[str], None] = 'c81e5d0a6f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('project_media', 'media_assets')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows are filled in by: python -m app.commands.backfill_media_metadata
+    for table in TABLES:
+        op.add_column(table, sa.Column('width', sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column('height', sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column('byte_size', sa.BigInteger(), nullable=True))
+        op.add_column(table, sa.Column('mime_type', sa.String(length=50), nullable=True))
+        op.add_column(table, sa.Column('duration', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('poster_url', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('placeholder', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            for column in ('placeholder', 'poster_url', 'duration', 'mime_type', 'byte_size', 'height', 'width'):
+                batch_op.drop_column(column)
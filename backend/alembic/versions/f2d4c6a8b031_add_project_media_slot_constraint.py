@@ -0,0 +1,47 @@
+"""Make (project_id, media_type, display_order) unique on project_media
+
+Revision ID: f2d4c6a8b031
+Revises: e5a9b7c3d218
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d4c6a8b031'
+down_revision: Union[str, Sequence[str], None] = 'e5a9b7c3d218'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Move duplicates left by concurrent uploads after the project's last
+    # item, keeping the oldest row in each slot
+    conn = op.get_bind()
+    duplicates = conn.execute(sa.text(
+        "SELECT m.id, m.project_id FROM project_media m "
+        "WHERE EXISTS (SELECT 1 FROM project_media o "
+        "WHERE o.project_id = m.project_id AND o.media_type = m.media_type "
+        "AND o.display_order = m.display_order AND o.id < m.id) "
+        "ORDER BY m.id"
+    )).all()
+    for media_id, project_id in duplicates:
+        conn.execute(sa.text(
+            "UPDATE project_media SET display_order = ("
+            "SELECT COALESCE(MAX(display_order), -1) + 1 FROM project_media WHERE project_id = :project_id"
+            ") WHERE id = :media_id"
+        ), {"project_id": project_id, "media_id": media_id})
+
+    with op.batch_alter_table('project_media') as batch_op:
+        batch_op.create_unique_constraint('uq_project_media_slot', ['project_id', 'media_type', 'display_order'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('project_media') as batch_op:
+        batch_op.drop_constraint('uq_project_media_slot', type_='unique')
@@ -0,0 +1,29 @@
+"""Fill in dimensions, MIME type, duration, poster and placeholder for
+media uploaded before metadata was recorded.
+
+Usage (from backend/):
+    python -m app.commands.backfill_media_metadata           # rows without metadata
+    python -m app.commands.backfill_media_metadata --force   # re-read every row
+"""
+import argparse
+import sys
+from app.db import SessionLocal
+from app.services import media_service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill project media metadata")
+    parser.add_argument("--force", action="store_true", help="Re-read metadata for every media row")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        updated, failed = media_service.backfill_media_metadata(db, force=args.force)
+        print(f"Updated {updated} media row(s), {failed} failed")
+        return 1 if failed else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Apply pending migrations, skipping Alembic when the schema is already current.
+
+The head revision is computed at build time (--write-head) and stored in
+alembic/head.json together with a fingerprint of alembic/versions. At
+startup one query compares the database's alembic_version against it,
+and Alembic is only loaded and run when they differ. Upgrades hold an
+advisory lock so instances starting together don't race each other.
+If head.json is missing or the migrations changed since it was written,
+Alembic runs as before.
+
+Usage (from backend/):
+    python -m app.commands.migrate --write-head   # at build time
+    python -m app.commands.migrate                # at startup (start.sh)
+"""
+import argparse
+import hashlib
+import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Set
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+VERSIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+HEAD_FILE = BACKEND_DIR / "alembic" / "head.json"
+LOCK_ID = 7_362_401_903  # Arbitrary key for pg_advisory_lock, shared by every instance
+
+
+def versions_fingerprint() -> str:
+    """Hash of the migration file names and contents"""
+    digest = hashlib.sha256()
+    for path in sorted(VERSIONS_DIR.glob("*.py")):
+        content = path.read_bytes()
+        digest.update(f"{path.name}:{len(content)}\n".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def script_heads() -> List[str]:
+    """Head revision(s) of the migration scripts (loads Alembic and every script)"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return sorted(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+
+def write_head() -> List[str]:
+    """Store the current head revision(s) for the startup check"""
+    heads = script_heads()
+    HEAD_FILE.write_text(json.dumps({"heads": heads, "versions": versions_fingerprint()}))
+    return heads
+
+
+def expected_heads() -> Optional[Set[str]]:
+    """Head revision(s) from head.json, or None if it is missing or stale"""
+    try:
+        data = json.loads(HEAD_FILE.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    if data.get("versions") != versions_fingerprint():
+        return None
+    return set(data["heads"])
+
+
+def current_revisions(engine: Engine) -> Set[str]:
+    """Revision(s) recorded in the database's alembic_version table"""
+    with engine.connect() as connection:
+        if not inspect(connection).has_table("alembic_version"):
+            return set()
+        return set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+
+
+@contextmanager
+def migration_lock(engine: Engine):
+    """Hold a lock that only one migrating process at a time can take"""
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": LOCK_ID})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": LOCK_ID})
+        return
+
+    database = engine.url.database
+    if engine.dialect.name == "sqlite" and database and database != ":memory:":
+        try:
+            import fcntl
+        except ImportError:  # Windows: no concurrent instances to guard against
+            yield
+            return
+        with open(f"{database}.migrate.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return
+
+    yield
+
+
+def upgrade(engine: Engine) -> bool:
+    """Upgrade to head if needed. Returns whether Alembic ran."""
+    expected = expected_heads()
+    if expected and current_revisions(engine) == expected:
+        return False
+
+    with migration_lock(engine):
+        # Another instance may have finished migrating while this one waited
+        if expected and current_revisions(engine) == expected:
+            return False
+
+        from alembic import command
+        from alembic.config import Config
+
+        command.upgrade(Config(str(ALEMBIC_INI)), "head")
+    return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply pending database migrations")
+    parser.add_argument("--write-head", action="store_true", help="Record the head revision (run at build time)")
+    args = parser.parse_args(argv)
+
+    if args.write_head:
+        heads = write_head()
+        print(f"Wrote head revision {', '.join(heads)} to {HEAD_FILE.relative_to(BACKEND_DIR)}")
+        return 0
+
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        if upgrade(engine):
+            print("Migrations applied")
+        else:
+            print("Database schema is current; skipped migrations")
+        return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Verify or rebuild the invoice summary table.
+
+Usage (from backend/):
+    python -m app.commands.rebuild_invoice_summaries           # verify, then rebuild
+    python -m app.commands.rebuild_invoice_summaries --check   # verify only, exit 1 on drift
+"""
+import argparse
+import sys
+from app.db import SessionLocal
+from app.services import invoice_summary_service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verify or rebuild invoice summaries")
+    parser.add_argument("--check", action="store_true", help="Only verify, do not rebuild")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        mismatches = invoice_summary_service.verify_summaries(db)
+        for bucket, expected, actual in mismatches:
+            print(f"Mismatch {bucket}: expected {expected}, found {actual}")
+        print(f"{len(mismatches)} mismatched bucket(s)")
+
+        if args.check:
+            return 1 if mismatches else 0
+
+        rows = invoice_summary_service.rebuild_summaries(db)
+        print(f"Rebuilt {rows} summary row(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""Re-derive project tags from tech_stack and recompute related projects.
+
+Usage (from backend/):
+    python -m app.commands.rebuild_project_tags
+"""
+import sys
+from app.db import SessionLocal
+from app.services import project_service
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        count = project_service.rebuild_project_tags(db)
+        print(f"Stored {count} related project pair(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""Rebuild the search index from clients, leads and projects.
+
+Usage (from backend/):
+    python -m app.commands.rebuild_search_index
+"""
+import sys
+from app.db import SessionLocal, engine
+from app.services import search_service
+
+
+def main() -> int:
+    search_service.create_search_index(engine)
+    db = SessionLocal()
+    try:
+        count = search_service.rebuild_index(db)
+        print(f"Indexed {count} document(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
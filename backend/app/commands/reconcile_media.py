@@ -0,0 +1,39 @@
+"""Find stored media files that no project media references and queue them
+for deletion, then drain the deletion queue and remove abandoned chunked
+uploads. Schedule it where the app doesn't run background jobs (app.wsgi).
+
+Usage (from backend/):
+    python -m app.commands.reconcile_media             # queue orphans and delete them
+    python -m app.commands.reconcile_media --dry-run   # only list orphans
+    python -m app.commands.reconcile_media --backend cloudinary
+"""
+import argparse
+import sys
+from app.db import SessionLocal
+from app.services import media_cleanup_service, upload_session_service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Delete stored media files no project media references")
+    parser.add_argument("--dry-run", action="store_true", help="Only list orphaned files")
+    parser.add_argument("--backend", help="Storage backend to scan (default: the configured one)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        orphans = media_cleanup_service.reconcile_storage(db, args.backend, dry_run=args.dry_run)
+        for key in orphans:
+            print(key)
+        if args.dry_run:
+            print(f"{len(orphans)} orphaned file(s)")
+            return 0
+        removed = media_cleanup_service.drain_pending_deletions(db)
+        swept = upload_session_service.sweep_expired_sessions()
+        print(f"Queued {len(orphans)} orphaned file(s), deleted {removed} queued file(s), removed {swept} abandoned upload(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
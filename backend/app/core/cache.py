@@ -0,0 +1,444 @@
+"""Shared cache with invalidation across workers.
+
+CACHE_BACKEND picks where entries live:
+    memory          an LRU in each worker (CACHE_MAX_ENTRIES)
+    sqlite          one SQLite file shared by the workers on a host (CACHE_SQLITE_PATH)
+    redis           a Redis-protocol server at CACHE_URL (requires the redis package)
+    memory+sqlite   tiered: a per-worker LRU in front of the shared store
+    memory+redis
+
+Entries are grouped in namespaces and stored as JSON. invalidate() drops
+one key or a whole namespace. When workers keep entries in memory, the
+invalidation is also broadcast to the other workers (and from commands
+run in other processes). With PostgreSQL this uses LISTEN/NOTIFY. With
+SQLite it uses a log table in CACHE_SQLITE_PATH, polled through
+PRAGMA data_version. In tiered mode, memory copies live for at most
+CACHE_L1_TTL seconds, in case a broadcast is missed.
+
+invalidate_on_commit() ties a namespace to models: any session commit
+that wrote to their tables invalidates it, however the write was made.
+single_flight() makes concurrent misses for one key share a single load.
+"""
+import json
+import logging
+import os
+import random
+import select
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+CHANNEL = "cache_invalidation"  # PostgreSQL NOTIFY channel
+PURGE_CHANCE = 0.001  # Share of SQLite writes that also delete expired rows
+INVALIDATION_LOG_TTL = 60 * 60  # Seconds SQLite invalidation rows are kept
+RECONNECT_DELAY = 5.0
+FLIGHT_TIMEOUT = 30.0  # Seconds a single_flight() follower waits before running fn itself
+
+
+def cache_sqlite_path() -> str:
+    return settings.CACHE_SQLITE_PATH or os.path.join(tempfile.gettempdir(), "cm-dev-cache.sqlite3")
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+
+class _SQLiteFile:
+    """One connection per thread and process to a SQLite file"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS cache_invalidations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT NOT NULL, key TEXT, created REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        # Forked workers must not use the parent's connection
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.SCHEMA)
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return self._local.connection
+
+
+def _prefix_range(prefix: str) -> tuple:
+    """(low, high) bounds of the keys starting with prefix, for an index range scan"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SQLiteBackend:
+    def __init__(self, path: str):
+        self.file = _SQLiteFile(path)
+
+    def get(self, key: str) -> Any:
+        row = self.file.connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else MISSING
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        connection = self.file.connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl)
+        )
+        if random.random() < PURGE_CHANCE:
+            connection.execute("DELETE FROM cache_entries WHERE expires <= ?", (time.time(),))
+
+    def delete(self, key: str) -> None:
+        self.file.connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> None:
+        self.file.connection().execute("DELETE FROM cache_entries WHERE key >= ? AND key < ?", _prefix_range(prefix))
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        if not url:
+            raise ValueError("CACHE_BACKEND=redis requires CACHE_URL")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        value = self.client.get(key)
+        return MISSING if value is None else json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(key, json.dumps(value), ex=max(int(ttl), 1))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        keys = list(self.client.scan_iter(match=f"{prefix}*", count=1000))
+        for start in range(0, len(keys), 1000):
+            self.client.delete(*keys[start:start + 1000])
+
+
+class PostgresNotifier:
+    """Broadcasts invalidations with NOTIFY; listens on a dedicated connection"""
+
+    def publish(self, namespace: str, key: Optional[str]) -> None:
+        from sqlalchemy import text
+        from app.db import engine
+
+        with engine.connect() as connection:
+            payload = json.dumps({"namespace": namespace, "key": key})
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+            connection.commit()
+
+    def listen(self, apply: Callable, stop: threading.Event) -> None:
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+
+        listen_engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+        while not stop.is_set():
+            try:
+                connection = listen_engine.raw_connection()
+                try:
+                    driver = connection.driver_connection
+                    driver.autocommit = True
+                    driver.cursor().execute(f"LISTEN {CHANNEL}")
+                    # Anything sent while we weren't listening is lost
+                    apply(None, None)
+                    while not stop.is_set():
+                        if select.select([driver], [], [], 1.0)[0]:
+                            driver.poll()
+                            while driver.notifies:
+                                message = json.loads(driver.notifies.pop(0).payload)
+                                apply(message["namespace"], message["key"])
+                finally:
+                    connection.close()
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed: {str(e)}")
+                stop.wait(RECONNECT_DELAY)
+
+
+class SQLiteNotifier:
+    """Broadcasts invalidations through a log table, polled when PRAGMA data_version changes"""
+
+    def __init__(self, path: str):
+        self.file = _SQLiteFile(path)
+
+    def publish(self, namespace: str, key: Optional[str]) -> None:
+        connection = self.file.connection()
+        connection.execute(
+            "INSERT INTO cache_invalidations (namespace, key, created) VALUES (?, ?, ?)", (namespace, key, time.time())
+        )
+        if random.random() < PURGE_CHANCE * 100:
+            connection.execute("DELETE FROM cache_invalidations WHERE created < ?", (time.time() - INVALIDATION_LOG_TTL,))
+
+    def listen(self, apply: Callable, stop: threading.Event) -> None:
+        connection = self.file.connection()
+        last_id = connection.execute("SELECT coalesce(max(id), 0) FROM cache_invalidations").fetchone()[0]
+        version = None
+        while not stop.wait(settings.CACHE_INVALIDATION_POLL):
+            try:
+                # Changes whenever another connection commits to the file, so idle polls cost one PRAGMA
+                current = connection.execute("PRAGMA data_version").fetchone()[0]
+                if current == version:
+                    continue
+                version = current
+                for row_id, namespace, key in connection.execute(
+                    "SELECT id, namespace, key FROM cache_invalidations WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall():
+                    apply(namespace, key)
+                    last_id = row_id
+            except sqlite3.Error as e:
+                logger.warning(f"Cache invalidation poll failed: {str(e)}")
+
+
+class Cache:
+    def __init__(self, local: Optional[MemoryBackend] = None, shared=None, notifier=None):
+        self.local = local
+        self.shared = shared
+        self.notifier = notifier
+        self._stop: Optional[threading.Event] = None
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        full_key = f"{namespace}:{key}"
+        value = self.local.get(full_key) if self.local else MISSING
+        if value is MISSING and self.shared:
+            try:
+                value = self.shared.get(full_key)
+            except Exception as e:
+                logger.warning(f"Cache read failed: {str(e)}")
+            if value is not MISSING and self.local:
+                self.local.set(full_key, value, settings.CACHE_L1_TTL)
+        metrics.record_cache(namespace, hit=value is not MISSING)
+        return default if value is MISSING else value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        full_key = f"{namespace}:{key}"
+        ttl = ttl or settings.CACHE_DEFAULT_TTL
+        if self.shared:
+            try:
+                self.shared.set(full_key, value, ttl)
+            except Exception as e:
+                logger.warning(f"Cache write failed: {str(e)}")
+        if self.local:
+            self.local.set(full_key, value, min(ttl, settings.CACHE_L1_TTL) if self.shared else ttl)
+
+    def get_or_set(self, namespace: str, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Cached value, or loader()'s result, stored. None is cached like any other value."""
+        value = self.get(namespace, key, MISSING)
+        if value is MISSING:
+            value = loader()
+            self.set(namespace, key, value, ttl)
+        return value
+
+    def invalidate(self, namespace: str, key: Optional[str] = None) -> None:
+        """Drop one key, or every key in the namespace, in every worker"""
+        if self.shared:
+            try:
+                self._drop(self.shared, namespace, key)
+            except Exception as e:
+                logger.error(f"Cache invalidation of {namespace} failed: {str(e)}")
+        if self.local:
+            self._drop(self.local, namespace, key)
+            if self.notifier:
+                try:
+                    self.notifier.publish(namespace, key)
+                except Exception as e:
+                    logger.error(f"Cache invalidation broadcast for {namespace} failed: {str(e)}")
+
+    @staticmethod
+    def _drop(backend, namespace: Optional[str], key: Optional[str]) -> None:
+        if namespace is None:
+            backend.delete_prefix("")
+        elif key is None:
+            backend.delete_prefix(f"{namespace}:")
+        else:
+            backend.delete(f"{namespace}:{key}")
+
+    def _apply_remote(self, namespace: Optional[str], key: Optional[str]) -> None:
+        # The shared store was already updated by the sender; only memory copies are stale
+        self._drop(self.local, namespace, key)
+
+    def start_listener(self) -> None:
+        """Apply other workers' invalidations to this worker's memory, from a background thread"""
+        if not self.local or not self.notifier or self._stop:
+            return
+        self._stop = threading.Event()
+        threading.Thread(
+            target=self.notifier.listen, args=(self._apply_remote, self._stop), name="cache-invalidation", daemon=True
+        ).start()
+
+    def stop_listener(self) -> None:
+        if self._stop:
+            self._stop.set()
+            self._stop = None
+
+
+BACKENDS = ("memory", "sqlite", "redis", "memory+sqlite", "memory+redis")
+
+_cache: Optional[Cache] = None
+_cache_lock = threading.Lock()
+
+
+def _build() -> Cache:
+    name = settings.CACHE_BACKEND.lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+    local = MemoryBackend(settings.CACHE_MAX_ENTRIES) if name.startswith("memory") else None
+    shared = None
+    if name.endswith("sqlite"):
+        shared = SQLiteBackend(cache_sqlite_path())
+    elif name.endswith("redis"):
+        shared = RedisBackend(settings.CACHE_URL)
+
+    notifier = None
+    if local and settings.CACHE_BROADCAST:
+        if settings.DATABASE_URL.startswith("postgres"):
+            notifier = PostgresNotifier()
+        else:
+            notifier = SQLiteNotifier(cache_sqlite_path())
+    return Cache(local, shared, notifier)
+
+
+def get_cache() -> Cache:
+    """The configured cache, created on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _build()
+    return _cache
+
+
+# Table name -> namespaces invalidated by commits that write to it
+_table_namespaces: Dict[str, Set[str]] = {}
+
+
+def invalidate_on_commit(namespace: str, *models) -> None:
+    """Invalidate namespace after every commit that changed one of these models' tables"""
+    _install_session_hooks()
+    for model in models:
+        _table_namespaces.setdefault(model.__table__.name, set()).add(namespace)
+
+
+def _touch(session, table) -> None:
+    namespaces = _table_namespaces.get(getattr(table, "name", None))
+    if namespaces:
+        session.info.setdefault("cache_namespaces", set()).update(namespaces)
+
+
+_hooks_installed = False
+
+
+def _install_session_hooks() -> None:
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    @event.listens_for(Session, "after_flush")
+    def _track_flush(session, flush_context):
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            _touch(session, getattr(type(instance), "__table__", None))
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _track_statement(orm_execute_state):
+        # Bulk query.update()/delete() and insert()/update()/delete() statements skip the flush
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            _touch(orm_execute_state.session, orm_execute_state.statement.table)
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidate(session):
+        for namespace in session.info.pop("cache_namespaces", ()):
+            get_cache().invalidate(namespace)
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop("cache_namespaces", None)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+_flights: Dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def single_flight(key: str, fn: Callable[[], Any]) -> Any:
+    """fn(), run by only one thread per key at a time in this process: threads
+    calling with the same key meanwhile wait and share its result or exception"""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if not flight.done.wait(FLIGHT_TIMEOUT):
+            return fn()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = fn()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
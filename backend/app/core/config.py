@@ -15,6 +15,56 @@ class Settings(BaseSettings):
 
     ENVIRONMENT: str = "development"
 
+    # Server (python -m app.serve)
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_WORKERS: int = 0  # Worker processes; 0 = one per available CPU
+    WEB_KEEPALIVE: int = 5  # Seconds an idle keep-alive connection is held open
+    WEB_BACKLOG: int = 2048  # Connections queued on the listening socket
+    WEB_MAX_REQUESTS: int = 0  # Requests before a worker is replaced (0 = never)
+    WEB_MAX_REQUESTS_JITTER: int = 0  # Random extra requests so workers don't restart together
+    WEB_GRACEFUL_TIMEOUT: int = 30  # Seconds workers get to finish in-flight requests on shutdown
+    RUN_BACKGROUND_JOBS: bool = True  # app.serve turns this off in all but one worker, app.wsgi in all unless set
+    IMPORT_BUDGET_MS: int = 1500  # Max cold `import app.main` (python -m app.diagnostics.import_profile)
+
+    # Logging (app.core.log)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json (one object per line) or text
+    ACCESS_LOG: bool = True  # One line per request with route, status, duration and DB queries
+    ACCESS_LOG_SAMPLE_RATE: float = 0.1  # Share of requests to ACCESS_LOG_SAMPLED_ROUTES that are logged
+    ACCESS_LOG_SAMPLED_ROUTES: str = "/,/projects,/projects/fragment,/projects/{slug},/static,/health,/health/live,/health/ready,/metrics"
+    ACCESS_LOG_SLOW_MS: int = 1000  # Slower requests and server errors are always logged
+
+    # Cache (app.core.cache)
+    CACHE_BACKEND: str = "memory"  # memory, sqlite, redis, memory+sqlite or memory+redis
+    CACHE_URL: str = ""  # redis://host:6379/0 for the redis backends
+    CACHE_SQLITE_PATH: str = ""  # Defaults to <system temp>/cm-dev-cache.sqlite3
+    CACHE_MAX_ENTRIES: int = 10000  # Per-worker LRU size
+    CACHE_DEFAULT_TTL: int = 300
+    CACHE_L1_TTL: float = 30  # Longest a worker keeps its memory copy of a shared entry
+    CACHE_BROADCAST: bool = True  # Send invalidations to the other workers' memory caches
+    CACHE_INVALIDATION_POLL: float = 0.5  # Seconds between checks for invalidations (SQLite)
+    CACHE_PAGE_TTL: int = 600  # Rendered public pages
+    CACHE_PAGE_STALE_GRACE: int = 60  # Seconds past CACHE_PAGE_TTL an outdated page is served while it re-renders
+    CACHE_PAGE_STALE_IF_ERROR: int = 24 * 60 * 60  # How long the last good page is kept to serve when rendering fails
+    CACHE_USER_TTL: int = 60  # Users looked up by the auth dependencies
+
+    # Health probes (/health/live, /health/ready)
+    HEALTH_CACHE_SECONDS: float = 5  # How long a readiness result is reused
+    HEALTH_DB_BUDGET_MS: int = 500  # Slower database answers make the worker unready
+    HEALTH_POOL_SATURATION: float = 0.9  # Unready at this share of pool connections checked out
+    HEALTH_DEPENDENCY_TIMEOUT: float = 2  # Seconds to reach SMTP/storage before reporting degraded
+
+    # Per-request profiling for admins (X-Profile header)
+    PROFILE_DIR: str = ""  # Defaults to <system temp>/cm-dev-profiles
+    PROFILE_KEEP: int = 50  # Reports kept; older ones are deleted
+    PROFILE_INTERVAL_MS: float = 1  # Sampling interval
+
+    # Metrics (/metrics, Prometheus text format)
+    METRICS_TOKEN: str = ""  # If set, scrapes must send "Authorization: Bearer <token>"
+    METRICS_DIR: str = ""  # Where workers share snapshots; app.serve uses a temp dir when empty
+    METRICS_FLUSH_INTERVAL: int = 5  # Seconds between a worker's snapshot writes
+
     # Email configuration
     SMTP_HOST: str = "smtp.hostinger.com"
     SMTP_PORT: int = 587
@@ -24,11 +74,52 @@ class Settings(BaseSettings):
     SMTP_FROM_NAME: str = "Craig Mackenzie Portfolio"
     NOTIFICATION_EMAIL: str = "craig@cmack.dev"
 
+    # Invoice numbering
+    INVOICE_NUMBER_PREFIX: str = "INV"
+    INVOICE_NUMBER_FORMAT: str = "{prefix}-{year}-{number:04d}"
+
+    # Public pages
+    HOME_PAGE_SIZE: int = 9  # Project cards per page on the home grid
+    PROJECT_FRAGMENT_MAX_AGE: int = 300  # Cache-Control max-age for card fragments
+    RELATED_PROJECTS_LIMIT: int = 3  # Related projects shown on a project page
+
     # Cloudinary configuration
     CLOUDINARY_CLOUD_NAME: str = ""
     CLOUDINARY_API_KEY: str = ""
     CLOUDINARY_API_SECRET: str = ""
 
+    # Media storage backend: local, cloudinary or s3 (default: cloudinary
+    # when CLOUDINARY_CLOUD_NAME is set, otherwise local)
+    MEDIA_STORAGE_BACKEND: str = ""
+    MEDIA_LOCAL_DIR: str = "static/uploads"
+    MEDIA_LOCAL_URL: str = "/static/uploads"
+
+    # S3-compatible storage (requires boto3)
+    S3_BUCKET: str = ""
+    S3_REGION: str = ""
+    S3_ENDPOINT_URL: str = ""  # For non-AWS services, e.g. R2 or MinIO
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_PUBLIC_URL: str = ""  # Public base URL (CDN); defaults to <endpoint>/<bucket>
+
+    # Media storage I/O
+    MEDIA_STORAGE_WORKERS: int = 4  # Threads for blocking storage SDK calls
+    MEDIA_STORAGE_RETRIES: int = 3
+    MEDIA_STORAGE_BACKOFF: float = 0.5  # Seconds, doubled per retry
+    MEDIA_BATCH_PARALLELISM: int = 3  # Concurrent uploads per batch request
+
+    # Deferred media deletion
+    MEDIA_DELETE_INTERVAL: int = 30  # Seconds between drains of the deletion queue
+    MEDIA_DELETE_MAX_ATTEMPTS: int = 10
+    MEDIA_RECONCILE_INTERVAL: int = 24 * 60 * 60  # Seconds between orphan scans (0 disables)
+    MEDIA_RECONCILE_GRACE: int = 24 * 60 * 60  # Files younger than this are never orphans
+
+    # Resumable uploads
+    UPLOAD_SESSION_DIR: str = ""  # Defaults to <system temp>/cm-dev-uploads
+    UPLOAD_CHUNK_SIZE: int = 5 * 1024 * 1024
+    UPLOAD_SESSION_TTL: int = 24 * 60 * 60  # Seconds before an idle session is swept
+    UPLOAD_SWEEP_INTERVAL: int = 15 * 60  # Seconds between sweeps
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True
@@ -3,16 +3,30 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.cache import get_cache, invalidate_on_commit
+from app.core.config import settings
 from app.core.security import decode_access_token
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
+USERS = "users"  # Cache namespace: email -> the user's columns below, or None
+USER_COLUMNS = ("id", "email", "full_name", "company_name", "role", "is_active")
+
+invalidate_on_commit(USERS, User)
+
+
+def _load_user(db: Session, email: str) -> Optional[dict]:
+    user = db.query(User).filter(User.email == email).first()
+    return {column: getattr(user, column) for column in USER_COLUMNS} if user else None
+
 
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
+    """The token's user, from the cache when possible. It isn't attached to
+    db; query it (db.get(User, user.id)) to change it or load relationships."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -27,11 +41,11 @@ def get_current_user(
     if email is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
+    user = get_cache().get_or_set(USERS, email, lambda: _load_user(db, email), ttl=settings.CACHE_USER_TTL)
     if user is None:
         raise credentials_exception
 
-    return user
+    return User(**user)
 
 
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
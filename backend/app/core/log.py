@@ -0,0 +1,194 @@
+"""Structured logging: JSON lines written off the request path, plus an access log.
+
+configure() points the root logger (and uvicorn's loggers) at a
+QueueHandler. Putting a record on the queue never blocks; a
+QueueListener thread formats it as one JSON object per line (or plain
+text with LOG_FORMAT=text) and writes it to stdout. Values passed as
+logging's extra={...} become fields of the JSON object.
+
+AccessLogMiddleware writes one "access" line per request with its
+route, status, duration, bytes sent and the number and total time of
+database queries it made. Requests to the high-volume public routes in
+ACCESS_LOG_SAMPLED_ROUTES are logged at ACCESS_LOG_SAMPLE_RATE (each
+line records its rate so counts can be scaled back up), except errors
+and requests slower than ACCESS_LOG_SLOW_MS, which are always logged.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from time import perf_counter
+from typing import Optional
+from app.core.config import settings
+
+logger = logging.getLogger("app.access")
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+# Attributes every LogRecord has; anything else on a record came from
+# extra={...}. uvicorn adds an ANSI-coloured copy of its messages.
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName", "color_message"}
+
+_listener: Optional[QueueListener] = None
+_configured_pid: Optional[int] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES:
+                data[key] = value
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments and render the traceback now, while they're
+        # still valid, but leave the formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure() -> None:
+    """Send all logging through the queue. Also call in each forked worker:
+    a child inherits the parent's listener but not its thread."""
+    global _listener, _configured_pid
+    if _configured_pid == os.getpid():
+        return
+
+    queue = SimpleQueue()
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter(TEXT_FORMAT) if settings.LOG_FORMAT == "text" else JsonFormatter())
+    _listener = QueueListener(queue, output)
+    _listener.start()
+    _configured_pid = os.getpid()
+
+    root = logging.getLogger()
+    root.handlers = [_QueueHandler(queue)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # AccessLogMiddleware's lines replace uvicorn's
+    logging.getLogger("uvicorn.access").disabled = settings.ACCESS_LOG
+
+
+@atexit.register
+def stop() -> None:
+    """Write out whatever is queued and stop the listener thread, e.g. before
+    forking. Records logged until configure() is called again are lost."""
+    global _configured_pid
+    if _listener is not None and _configured_pid == os.getpid():
+        _listener.stop()
+        _configured_pid = None
+
+
+class RequestStats:
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+# Set per request; threadpool calls run in a copy of the request's context
+# and so update the same RequestStats
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Count and time the queries each request runs"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        if _request_stats.get() is not None:
+            conn.info["query_started"] = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += perf_counter() - conn.info.pop("query_started", perf_counter())
+
+
+def _sampled_routes() -> set:
+    return {route.strip() for route in settings.ACCESS_LOG_SAMPLED_ROUTES.split(",") if route.strip()}
+
+
+class AccessLogMiddleware:
+    """Writes one structured line per HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+        self.sampled_routes = _sampled_routes()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from app.core.metrics import route_label
+
+        status = 500
+        sent = 0
+
+        async def send_counting(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            duration_ms = (perf_counter() - start) * 1000
+            _request_stats.reset(token)
+            route = route_label(scope)
+            rate = 1.0
+            if route in self.sampled_routes and status < 500 and duration_ms < settings.ACCESS_LOG_SLOW_MS:
+                rate = settings.ACCESS_LOG_SAMPLE_RATE
+            if rate >= 1 or random.random() < rate:
+                client = scope.get("client")
+                logger.info(
+                    f"{scope['method']} {scope['path']} {status} {duration_ms:.1f}ms",
+                    extra={
+                        "event": "access",
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": route,
+                        "status": status,
+                        "duration_ms": round(duration_ms, 2),
+                        "db_queries": stats.queries,
+                        "db_ms": round(stats.query_seconds * 1000, 2),
+                        "bytes": sent,
+                        "client": client[0] if client else None,
+                        "sample_rate": rate,
+                    },
+                )
@@ -0,0 +1,394 @@
+"""Prometheus metrics: requests, threadpool, DB pool, templates, outbound calls and caches.
+
+Each process records into in-memory counters and histograms, one
+uncontended lock per metric, so recording costs a few microseconds.
+Gauges (in-flight requests, pool and threadpool usage) are read when a
+snapshot is taken. Under app.serve every worker also writes its snapshot
+to METRICS_DIR/<pid>.json every METRICS_FLUSH_INTERVAL seconds, and
+/metrics merges them, so whichever worker answers a scrape reports the
+whole server. Counters of exited workers are folded into retired.json so
+totals never go backwards. Cache hit ratios come from
+cache_requests_total{result="hit"} / cache_requests_total.
+"""
+import asyncio
+import json
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RETIRED_FILE = "retired.json"  # Counters of workers that have exited
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.samples: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(key), value] for key, value in self.samples.items()]
+        return {"type": self.type, "help": self.help, "labels": list(self.labels), "samples": samples}
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self.samples[label_values] = self.samples.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *label_values) -> None:
+        with self._lock:
+            self.samples[label_values] = value
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self.samples[label_values] = self.samples.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    """Per-bucket counts plus the sum; the last slot counts values above every bucket"""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self.samples.get(label_values)
+            if entry is None:
+                entry = self.samples[label_values] = [0] * (len(self.buckets) + 2)
+            entry[index] += 1
+            entry[-1] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(key), list(value)] for key, value in self.samples.items()]
+        return {
+            "type": self.type, "help": self.help, "labels": list(self.labels),
+            "buckets": list(self.buckets), "samples": samples
+        }
+
+
+REGISTRY: List[Metric] = []
+_collect_hooks: List[Callable[[], None]] = []
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being handled")
+THREADPOOL_BUSY = Gauge("threadpool_threads_busy", "AnyIO worker threads in use (sync routes, run_in_threadpool)")
+THREADPOOL_LIMIT = Gauge("threadpool_threads_limit", "AnyIO worker thread limit")
+DB_POOL_SIZE = Gauge("db_pool_size", "Connections the SQLAlchemy pool keeps open")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Pool connections in use")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond the pool size")
+DB_POOL_ACQUIRE = Histogram(
+    "db_pool_acquire_seconds", "Time to get a connection from the pool, waiting included",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+TEMPLATE_RENDER = Histogram("template_render_seconds", "Jinja template render time", ("template",))
+OUTBOUND_DURATION = Histogram(
+    "outbound_request_seconds", "Calls to external services (storage, SMTP)", ("service", "operation", "outcome")
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by result", ("cache", "result"))
+
+
+def on_collect(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a function that refreshes gauges before each snapshot"""
+    _collect_hooks.append(hook)
+    return hook
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+@contextmanager
+def outbound_call(service: str, operation: str):
+    """Time a call to an external service, labelled by whether it raised"""
+    start = perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        OUTBOUND_DURATION.observe(perf_counter() - start, service, operation, outcome)
+
+
+def instrument_templates(templates) -> None:
+    """Time every template rendered through a Jinja2Templates instance"""
+    environment = templates.env
+    base = environment.template_class
+    if getattr(base, "_timed", False):
+        return
+
+    class TimedTemplate(base):
+        _timed = True
+
+        def render(self, *args, **kwargs):
+            start = perf_counter()
+            try:
+                return super().render(*args, **kwargs)
+            finally:
+                TEMPLATE_RENDER.observe(perf_counter() - start, self.name or "<string>")
+
+    environment.template_class = TimedTemplate
+
+
+def instrument_engine(engine) -> None:
+    """Time connection checkouts and report pool usage"""
+    raw_connection = engine.raw_connection
+
+    # Engine.connect() (and so every Session) gets its DBAPI connection here
+    def timed_raw_connection():
+        start = perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            DB_POOL_ACQUIRE.observe(perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+
+    @on_collect
+    def sample_pool():
+        # engine.pool is replaced by dispose(), so look it up each time
+        pool = engine.pool
+        if hasattr(pool, "size"):
+            DB_POOL_SIZE.set(pool.size())
+        if hasattr(pool, "checkedout"):
+            DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        if hasattr(pool, "overflow"):
+            # Counts up from -size while the pool is still filling
+            DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+@on_collect
+def _sample_threadpool():
+    import anyio.to_thread
+
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:  # Not on the event loop
+        return
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_LIMIT.set(limiter.total_tokens)
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request by its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            HTTP_IN_PROGRESS.dec()
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+            route = route_label(scope)
+            HTTP_REQUESTS.inc(method, route, str(status))
+            HTTP_DURATION.observe(elapsed, method, route)
+
+
+def route_label(scope) -> str:
+    # The router records the matched route in the scope; labelling by its
+    # template (/projects/{slug}) rather than the path keeps cardinality bounded
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("endpoint") is not None:  # A mount such as /static
+        return scope.get("root_path") or "/"
+    return "<unmatched>"
+
+
+def snapshot() -> dict:
+    """This process's metrics, gauges refreshed"""
+    for hook in _collect_hooks:
+        hook()
+    return {metric.name: metric.snapshot() for metric in REGISTRY}
+
+
+def merge(snapshots: List[dict], include_gauges: bool = True) -> dict:
+    """Sum samples with the same labels across snapshots"""
+    merged: Dict[str, dict] = {}
+    for data in snapshots:
+        for name, metric in data.items():
+            if metric["type"] == "gauge" and not include_gauges:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": []})
+            values = {tuple(labels): value for labels, value in target["samples"]}
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if key not in values:
+                    values[key] = value
+                elif metric["type"] == "histogram":
+                    values[key] = [a + b for a, b in zip(values[key], value)]
+                else:
+                    values[key] = values[key] + value
+            target["samples"] = [[list(key), value] for key, value in values.items()]
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra: Optional[tuple] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render(data: dict) -> str:
+    """Prometheus text exposition format"""
+    lines = []
+    for name, metric in sorted(data.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["samples"]):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(metric['labels'], labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric["buckets"] + ["+Inf"], value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(metric['labels'], labels, ('le', bound))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(metric['labels'], labels)} {value[-1]}")
+            lines.append(f"{name}_count{_format_labels(metric['labels'], labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def write_snapshot() -> None:
+    """Publish this process's metrics to METRICS_DIR for the other workers"""
+    if settings.METRICS_DIR:
+        _write_json(Path(settings.METRICS_DIR) / f"{os.getpid()}.json", snapshot())
+
+
+def _retire(directory: Path, dead: List[Path]) -> None:
+    """Fold exited workers' counters into retired.json and remove their files"""
+    try:
+        import fcntl
+    except ImportError:
+        return
+    with open(directory / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        snapshots = [_read_json(path) for path in dead]
+        retired = _read_json(directory / RETIRED_FILE) or {}
+        _write_json(directory / RETIRED_FILE, merge([retired] + [s for s in snapshots if s], include_gauges=False))
+        for path in dead:
+            path.unlink(missing_ok=True)
+
+
+def collect() -> str:
+    """Metrics of every worker in exposition format"""
+    own = snapshot()
+    if not settings.METRICS_DIR:
+        return render(own)
+
+    directory = Path(settings.METRICS_DIR)
+    _write_json(directory / f"{os.getpid()}.json", own)
+    live, dead = [own], []
+    for path in directory.glob("*.json"):
+        if not path.stem.isdigit() or int(path.stem) == os.getpid():
+            continue
+        if _is_running(int(path.stem)):
+            data = _read_json(path)
+            if data:
+                live.append(data)
+        else:
+            dead.append(path)
+    if dead:
+        _retire(directory, dead)
+    retired = _read_json(directory / RETIRED_FILE)
+    return render(merge(live + ([retired] if retired else [])))
+
+
+def reset_dir() -> None:
+    """Give a freshly started server an empty METRICS_DIR (a temp dir if unset)"""
+    import atexit
+    import shutil
+    import tempfile
+
+    if not settings.METRICS_DIR:
+        settings.METRICS_DIR = tempfile.mkdtemp(prefix="portfolio-metrics-")
+        # Workers leave through os._exit, so only the supervisor runs this
+        atexit.register(shutil.rmtree, settings.METRICS_DIR, True)
+        return
+    directory = Path(settings.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+async def flush_periodically() -> None:
+    """Write this worker's snapshot every METRICS_FLUSH_INTERVAL seconds, and once more on shutdown"""
+    try:
+        while True:
+            await asyncio.sleep(settings.METRICS_FLUSH_INTERVAL)
+            write_snapshot()
+    finally:
+        write_snapshot()
@@ -1,13 +1,29 @@
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app.core import log, metrics
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        # SQLite ignores foreign keys, ON DELETE included, unless enabled per connection
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+metrics.instrument_engine(engine)
+log.instrument_engine(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -23,6 +39,8 @@ def get_db():
 
 def init_db():
     """Initialize database by creating all tables"""
-    from app.models import user, client, project, lead, invoice, project_metric
+    from app.models import user, client, project, lead, invoice, invoice_summary, project_metric, search_document, media_asset
+    from app.services.search_service import create_search_index
     Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+    create_search_index(engine)
+    logger.info("Database tables created successfully")
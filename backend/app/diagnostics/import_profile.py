@@ -0,0 +1,94 @@
+"""Report what importing the app costs, module by module.
+
+Runs the import in fresh interpreters: once under -X importtime for the
+per-module breakdown, then --repeat plain times for the wall-clock
+total. Exits with status 1 when the fastest plain import exceeds the
+budget, so it can gate CI.
+
+Usage (from backend/):
+    python -m app.diagnostics.import_profile
+    python -m app.diagnostics.import_profile --top 40 --budget-ms 800
+    python -m app.diagnostics.import_profile --module app.routers.public
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+TIMER = "import sys, time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+
+
+class ModuleCost(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    # Modules are resolved from backend/, like the app itself
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return subprocess.run([sys.executable, *args], cwd=backend_dir, capture_output=True, text=True, check=True)
+
+
+def profile_imports(module: str) -> List[ModuleCost]:
+    """Per-module import cost of importing module in a fresh interpreter"""
+    result = _run(["-X", "importtime", "-c", f"import {module}"])
+    costs = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            costs.append(ModuleCost(match.group(4), int(match.group(1)), int(match.group(2))))
+    return costs
+
+
+def time_import(module: str, repeat: int = 3) -> float:
+    """Fastest wall-clock import time over repeat fresh interpreters, in ms"""
+    return min(float(_run(["-c", TIMER.format(module=module)]).stdout) for _ in range(repeat)) * 1000
+
+
+def by_package(costs: List[ModuleCost]) -> Dict[str, int]:
+    """Self time per top-level package; the app's own modules are kept apart"""
+    totals = defaultdict(int)
+    for cost in costs:
+        parts = cost.name.split(".")
+        totals[".".join(parts[:2]) if parts[0] == "app" else parts[0]] += cost.self_us
+    return dict(totals)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report per-module import cost and check it against a budget")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Rows per table")
+    parser.add_argument("--repeat", type=int, default=3, help="Plain imports timed for the total")
+    parser.add_argument("--budget-ms", type=float, help="Fail above this many ms (default: IMPORT_BUDGET_MS)")
+    args = parser.parse_args(argv)
+
+    if args.budget_ms is None:
+        from app.core.config import settings
+        args.budget_ms = settings.IMPORT_BUDGET_MS
+
+    costs = profile_imports(args.module)
+
+    print(f"Slowest modules by self time ({len(costs)} imported):")
+    print(f"{'self ms':>9} {'cumulative ms':>14}  module")
+    for cost in sorted(costs, key=lambda c: c.self_us, reverse=True)[:args.top]:
+        print(f"{cost.self_us / 1000:>9.1f} {cost.cumulative_us / 1000:>14.1f}  {cost.name}")
+
+    print("\nSelf time by package:")
+    for package, self_us in sorted(by_package(costs).items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>9.1f}  {package}")
+
+    total_ms = time_import(args.module, args.repeat)
+    print(f"\nimport {args.module}: {total_ms:.0f} ms (best of {args.repeat}), budget {args.budget_ms:.0f} ms")
+    if args.budget_ms and total_ms > args.budget_ms:
+        print(f"Over budget by {total_ms - args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""On-demand profiling of single requests, for admins.
+
+A request carrying an admin's access token in the X-Profile header (or
+a __profile=<token> query parameter, for pages opened in a browser) runs
+under a sampling profiler. A background thread records the stacks
+working on that request every PROFILE_INTERVAL_MS: its coroutine on the
+event loop, plus threadpool threads running its endpoint or
+dependencies. Samples that match neither are counted as [waiting], for
+example awaiting I/O or a free thread. Concurrent requests to the same
+endpoint can show up in the threadpool samples too.
+
+Reports are saved as JSON in PROFILE_DIR, keeping only the newest
+PROFILE_KEEP, and rendered as a collapsible HTML call tree or as folded
+stacks (flamegraph.pl, speedscope) by /api/v1/admin/profiles. Requests
+without the header or parameter only pay for one header and query string
+scan.
+"""
+import html
+import json
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl
+from app.core.config import settings
+
+HEADER = b"x-profile"
+QUERY_FLAG = b"__profile="
+REPORT_ID = re.compile(r"^\d{8}T\d{12}-[0-9a-f]{8}$")  # Sorts by creation time
+WAITING = "[waiting]"
+MIN_SHARE = 0.005  # Call tree nodes below this share of samples are hidden
+BACKEND_DIR = str(Path(__file__).resolve().parents[2])
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR or Path(tempfile.gettempdir()) / "cm-dev-profiles")
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR):
+        filename = filename[len(BACKEND_DIR) + 1:]
+    elif "site-packages/" in filename:
+        filename = filename.split("site-packages/", 1)[1]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _request_codes(scope) -> set:
+    """Code objects of the matched route's endpoint and its dependencies"""
+    route = scope.get("route")
+    dependant = getattr(route, "dependant", None)
+    codes = set()
+    pending = [dependant] if dependant else []
+    while pending:
+        current = pending.pop()
+        code = getattr(current.call, "__code__", None)
+        if code:
+            codes.add(code)
+        pending.extend(current.dependencies)
+    return codes
+
+
+class Sampler:
+    """Samples the stacks serving one request from a background thread"""
+
+    def __init__(self, scope, anchor, loop_thread: int, interval: float):
+        self.scope = scope
+        self.anchor = anchor  # The profiling middleware's frame for this request
+        self.loop_thread = loop_thread
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._codes: Optional[set] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if self._codes is None and "route" in self.scope:
+                self._codes = _request_codes(self.scope)
+            self.samples += 1
+            matched = False
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = self._request_stack(frame, thread_id == self.loop_thread)
+                if stack:
+                    self.stacks[stack] += 1
+                    matched = True
+            if not matched:
+                self.stacks[(WAITING,)] += 1
+
+    def _request_stack(self, frame, on_loop: bool) -> Optional[tuple]:
+        """Labels from the request's outermost frame down to the sampled one, or None"""
+        frames = []
+        while frame is not None:
+            if on_loop and frame is self.anchor:
+                return tuple(_frame_label(f.f_code) for f in reversed(frames))
+            frames.append(frame)
+            frame = frame.f_back
+        if on_loop or not self._codes:
+            return None
+        # Start at the outermost endpoint or dependency frame, dropping the threadpool's own
+        for index in range(len(frames) - 1, -1, -1):
+            if frames[index].f_code in self._codes:
+                return ("[threadpool]",) + tuple(_frame_label(f.f_code) for f in reversed(frames[:index + 1]))
+        return None
+
+
+def _token(scope) -> Optional[str]:
+    """Access token from the X-Profile header or __profile query flag, if present"""
+    for name, value in scope["headers"]:
+        if name == HEADER:
+            return value.decode("latin-1")
+    query = scope.get("query_string", b"")
+    if QUERY_FLAG in query:
+        return dict(parse_qsl(query.decode("latin-1"))).get("__profile")
+    return None
+
+
+def _is_admin(token: str) -> bool:
+    """Same checks as get_current_admin_user"""
+    from fastapi import HTTPException
+    from app.core.dependencies import get_current_admin_user, get_current_active_user, get_current_user
+    from app.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        get_current_admin_user(get_current_active_user(get_current_user(token, db)))
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _token(scope)
+        if not token:
+            await self.app(scope, receive, send)
+            return
+
+        from fastapi.concurrency import run_in_threadpool
+
+        if not await run_in_threadpool(_is_admin, token):
+            await self.app(scope, receive, send)
+            return
+
+        report_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{secrets.token_hex(4)}"
+        status = 500
+
+        async def send_with_report_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", report_id.encode())]
+            await send(message)
+
+        sampler = Sampler(scope, sys._getframe(), threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_report_id)
+        finally:
+            sampler.stop()
+            report = {
+                "id": report_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "interval_ms": settings.PROFILE_INTERVAL_MS,
+                "samples": sampler.samples,
+                "stacks": [[list(stack), count] for stack, count in sampler.stacks.most_common()],
+            }
+            await run_in_threadpool(save_report, report)
+
+
+def save_report(report: Dict) -> None:
+    """Write a report and drop the oldest beyond PROFILE_KEEP"""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{report['id']}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(report))
+    tmp.replace(path)
+    for old in sorted(directory.glob("*.json"))[:-max(settings.PROFILE_KEEP, 1)]:
+        old.unlink(missing_ok=True)
+
+
+def list_reports() -> List[Dict]:
+    """Saved reports, newest first, without their stacks"""
+    reports = []
+    for path in sorted(profile_dir().glob("*.json"), reverse=True):
+        try:
+            report = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            continue
+        report.pop("stacks", None)
+        reports.append(report)
+    return reports
+
+
+def load_report(report_id: str) -> Optional[Dict]:
+    if not REPORT_ID.match(report_id):
+        return None
+    try:
+        return json.loads((profile_dir() / f"{report_id}.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def render_folded(report: Dict) -> str:
+    """One "frame;frame;frame count" line per stack"""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in report["stacks"])
+
+
+def render_html(report: Dict) -> str:
+    """Collapsible call tree with each node's share of the request's samples"""
+    tree: Dict = {}
+    for stack, count in report["stacks"]:
+        node = tree
+        for label in stack:
+            entry = node.setdefault(label, [0, {}])
+            entry[0] += count
+            node = entry[1]
+
+    total = max(report["samples"], 1)
+    ms_per_sample = report["duration_ms"] / total
+
+    def render_nodes(nodes: Dict) -> str:
+        parts = []
+        for label, (count, children) in sorted(nodes.items(), key=lambda item: -item[1][0]):
+            if count / total < MIN_SHARE:
+                continue
+            summary = f"{count / total:6.1%} {count * ms_per_sample:8.1f} ms  {html.escape(label)}"
+            if children:
+                parts.append(f"<details open><summary>{summary}</summary>{render_nodes(children)}</details>")
+            else:
+                parts.append(f"<div class=\"leaf\">{summary}</div>")
+        return "".join(parts)
+
+    title = html.escape(f"{report['method']} {report['path']}")
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Profile {html.escape(report['id'])}: {title}</title>
+<style>
+body {{ font-family: monospace; font-size: 13px; }}
+details, .leaf {{ margin-left: 1.5em; white-space: pre; }}
+summary {{ cursor: pointer; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>{report['status']} in {report['duration_ms']} ms &middot; {report['samples']} samples every {report['interval_ms']} ms
+&middot; {html.escape(report['created_at'])}</p>
+{render_nodes(tree)}
+</body>
+</html>
+"""
@@ -1,11 +1,87 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from app.core import log, metrics
 from app.core.config import settings
 from markupsafe import Markup
 
+logger = logging.getLogger(__name__)
+
+
+def _profiling_middleware(app):
+    # Starlette builds the middleware stack on the first request, so the
+    # profiler isn't imported at startup
+    from app.diagnostics.request_profiler import ProfilingMiddleware
+
+    return ProfilingMiddleware(app)
+
+
+async def run_periodically(job, interval: float, description: str, initial_delay: float = 0):
+    """Run a blocking job in the threadpool every interval seconds until cancelled"""
+    from fastapi.concurrency import run_in_threadpool
+
+    await asyncio.sleep(initial_delay)
+    while True:
+        try:
+            await run_in_threadpool(job)
+        except Exception as e:
+            logger.warning(f"{description} failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from fastapi.concurrency import run_in_threadpool
+    from app.core.cache import get_cache
+    from app.db import SessionLocal
+    from app.services import project_service, upload_session_service, media_cleanup_service, health_service
+
+    log.configure()
+    # Hear about other workers' cache invalidations
+    get_cache().start_listener()
+
+    # Warm the old-slug redirect map so /projects/{old-slug} 301s without a query
+    db = SessionLocal()
+    try:
+        project_service.warm_slug_redirects(db)
+    except Exception as e:
+        logger.warning(f"Could not warm slug redirects: {str(e)}")
+    finally:
+        db.close()
+
+    # Background jobs: abandoned upload sweeps, the media deletion queue
+    # and the storage orphan scan
+    jobs = []
+    if settings.RUN_BACKGROUND_JOBS:
+        jobs += [
+            run_periodically(upload_session_service.sweep_expired_sessions, settings.UPLOAD_SWEEP_INTERVAL, "Upload session sweep"),
+            run_periodically(media_cleanup_service.run_deletion_worker, settings.MEDIA_DELETE_INTERVAL, "Media deletion"),
+        ]
+    if settings.RUN_BACKGROUND_JOBS and settings.MEDIA_RECONCILE_INTERVAL > 0:
+        jobs.append(run_periodically(
+            media_cleanup_service.run_reconciliation, settings.MEDIA_RECONCILE_INTERVAL, "Media reconciliation",
+            initial_delay=settings.MEDIA_RECONCILE_INTERVAL
+        ))
+    # Every worker shares its metrics, whether or not it runs the jobs
+    if settings.METRICS_DIR:
+        jobs.append(metrics.flush_periodically())
+    # app.serve compiles templates before forking; otherwise do it in the
+    # background and report not ready until it's done
+    if not health_service.templates_warm():
+        jobs.append(run_in_threadpool(health_service.warm_templates))
+    tasks = [asyncio.create_task(job) for job in jobs]
+    yield
+    for task in tasks:
+        task.cancel()
+    get_cache().stop_listener()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     docs_url="/api/docs" if settings.ENVIRONMENT == "development" else None,
@@ -21,14 +97,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Admin-triggered request profiling (see app/diagnostics/request_profiler.py)
+app.add_middleware(_profiling_middleware)
+
+# Request counts and latency; added after the app's own middleware so it times them too
+app.add_middleware(metrics.MetricsMiddleware)
+
+# One structured line per request (see app/core/log.py)
+if settings.ACCESS_LOG:
+    app.add_middleware(log.AccessLogMiddleware)
+
 # Static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Templates with explicit autoescape
 templates = Jinja2Templates(directory="app/templates")
 templates.env.autoescape = True
+metrics.instrument_templates(templates)
 
-from app.routers import auth, public, contact
+from app.routers import auth, public, contact, health, metrics as metrics_router
 from app.routers.admin import projects as admin_projects
 from app.routers.admin import media as admin_media
 from app.routers.admin import project_metrics as admin_project_metrics
@@ -36,6 +123,9 @@ from app.routers.admin import leads as admin_leads
 from app.routers.admin import clients as admin_clients
 from app.routers.admin import invoices as admin_invoices
 from app.routers.admin import pages as admin_pages
+from app.routers.admin import stats as admin_stats
+from app.routers.admin import search as admin_search
+from app.routers.admin import profiles as admin_profiles
 
 app.include_router(auth.router, prefix=settings.API_PREFIX)
 app.include_router(admin_projects.router, prefix=settings.API_PREFIX)
@@ -45,8 +135,13 @@ app.include_router(contact.router, prefix=settings.API_PREFIX)
 app.include_router(admin_leads.router, prefix=settings.API_PREFIX)
 app.include_router(admin_clients.router, prefix=settings.API_PREFIX)
 app.include_router(admin_invoices.router, prefix=settings.API_PREFIX)
+app.include_router(admin_stats.router, prefix=settings.API_PREFIX)
+app.include_router(admin_search.router, prefix=settings.API_PREFIX)
+app.include_router(admin_profiles.router, prefix=settings.API_PREFIX)
 app.include_router(admin_pages.router)
 app.include_router(public.router)
+app.include_router(metrics_router.router)
+app.include_router(health.router)
 
 
 @app.get("/health")
@@ -1,9 +1,12 @@
 from app.models.user import User
 from app.models.client import Client
 from app.models.lead import Lead, LeadStatus
-from app.models.project import Project, ProjectMedia
+from app.models.project import Project, ProjectMedia, ProjectSlugHistory, ProjectTag, RelatedProject
 from app.models.project_metric import ProjectMetric
-from app.models.invoice import Invoice, InvoiceItem, InvoiceStatus
+from app.models.invoice import Invoice, InvoiceItem, InvoiceStatus, InvoiceNumberCounter
+from app.models.invoice_summary import InvoiceSummary
+from app.models.search_document import SearchDocument
+from app.models.media_asset import MediaAsset, PendingMediaDeletion
 
 __all__ = [
     "User",
@@ -12,8 +15,16 @@ __all__ = [
     "LeadStatus",
     "Project",
     "ProjectMedia",
+    "ProjectSlugHistory",
+    "ProjectTag",
+    "RelatedProject",
     "ProjectMetric",
     "Invoice",
     "InvoiceItem",
     "InvoiceStatus",
+    "InvoiceNumberCounter",
+    "InvoiceSummary",
+    "SearchDocument",
+    "MediaAsset",
+    "PendingMediaDeletion",
 ]
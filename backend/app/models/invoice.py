@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Numeric, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Numeric, Text, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
@@ -18,13 +18,17 @@ class InvoiceStatus(str, enum.Enum):
 class Invoice(Base):
     """Invoice"""
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Numbers are allocated per user (invoice_number_counters)
+        UniqueConstraint("user_id", "invoice_number", name="uq_invoices_user_number"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="SET NULL"), nullable=True, index=True)
 
-    invoice_number = Column(String, nullable=False, unique=True, index=True)
+    invoice_number = Column(String, nullable=False, index=True)
     status = Column(SQLEnum(InvoiceStatus), default=InvoiceStatus.DRAFT, nullable=False)
     currency = Column(String, default="USD", nullable=False)
 
@@ -47,7 +51,7 @@ class Invoice(Base):
     user = relationship("User", back_populates="invoices")
     client = relationship("Client", back_populates="invoices")
     project = relationship("Project", back_populates="invoices")
-    items = relationship("InvoiceItem", back_populates="invoice", cascade="all, delete-orphan")
+    items = relationship("InvoiceItem", back_populates="invoice", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class InvoiceItem(Base):
@@ -55,7 +59,7 @@ class InvoiceItem(Base):
     __tablename__ = "invoice_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=False)
+    invoice_id = Column(Integer, ForeignKey("invoices.id", ondelete="CASCADE"), nullable=False, index=True)
     description = Column(String, nullable=False)
     quantity = Column(Numeric(10, 2), nullable=False)
     unit_price = Column(Numeric(10, 2), nullable=False)
@@ -66,3 +70,12 @@ class InvoiceItem(Base):
     @hybrid_property
     def total(self):
         return self.quantity * self.unit_price
+
+
+class InvoiceNumberCounter(Base):
+    """Last allocated invoice number per user and year"""
+    __tablename__ = "invoice_number_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    last_number = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, UniqueConstraint, Enum as SQLEnum
+from decimal import Decimal
+from app.db import Base
+from app.models.invoice import InvoiceStatus
+
+
+class InvoiceSummary(Base):
+    """Running invoice totals per user, client, status and issue month.
+
+    Maintained by invoice_service on every write, so revenue and AR
+    reporting never has to scan invoices.
+    """
+    __tablename__ = "invoice_summaries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "client_id", "status", "period", name="uq_invoice_summary_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(SQLEnum(InvoiceStatus), nullable=False)
+    period = Column(String(7), nullable=False)  # Issue month, "YYYY-MM"
+
+    invoice_count = Column(Integer, default=0, nullable=False)
+    total = Column(Numeric(12, 2), default=Decimal("0.00"), nullable=False)
@@ -0,0 +1,56 @@
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Float, Text
+from datetime import datetime
+from app.db import Base
+
+
+class MediaMetadata:
+    """Columns describing a media file, extracted at upload"""
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    byte_size = Column(BigInteger, nullable=True)
+    mime_type = Column(String(50), nullable=True)
+    duration = Column(Float, nullable=True)  # Seconds, videos only
+    poster_url = Column(String, nullable=True)  # Still frame, videos only
+    placeholder = Column(Text, nullable=True)  # Tiny blurred preview as a data: URI
+
+
+METADATA_FIELDS = ("width", "height", "byte_size", "mime_type", "duration", "poster_url", "placeholder")
+
+
+class MediaAsset(MediaMetadata, Base):
+    """A stored media file, keyed by the SHA-256 of its content.
+
+    Identical uploads share one asset; ref_count is the number of
+    ProjectMedia rows pointing at it, and the stored file is removed
+    when it drops to zero.
+    """
+    __tablename__ = "media_assets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False, index=True)
+    backend = Column(String(20), nullable=False)  # local, cloudinary, s3
+    storage_key = Column(String, nullable=False)
+    url = Column(String, nullable=False, index=True)
+    media_type = Column(String, default="image", nullable=False)  # image, video
+    size = Column(BigInteger, nullable=False, default=0)
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PendingMediaDeletion(Base):
+    """A stored file queued for removal.
+
+    Rows are written in the same transaction that drops the last
+    reference to a file, and drained in batches by media_cleanup_service.
+    """
+    __tablename__ = "pending_media_deletions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    backend = Column(String(20), nullable=False)
+    storage_key = Column(String, nullable=False)
+    media_type = Column(String, default="image", nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Date, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Date, JSON, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db import Base
+from app.models.media_asset import MediaMetadata
 
 
 class Project(Base):
@@ -9,7 +10,7 @@ class Project(Base):
     __tablename__ = "projects"
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=True)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="SET NULL"), nullable=True, index=True)
     title = Column(String, nullable=False)
     slug = Column(String, unique=True, nullable=False, index=True)
     short_description = Column(String(200), nullable=True)  # Brief preview for cards
@@ -29,21 +30,28 @@ class Project(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Relationships
+    # Relationships; passive_deletes leaves child rows to the foreign keys' ON DELETE
     client = relationship("Client", back_populates="projects")
-    media = relationship("ProjectMedia", back_populates="project", cascade="all, delete-orphan", order_by="ProjectMedia.display_order")
-    metrics = relationship("ProjectMetric", back_populates="project", cascade="all, delete-orphan")
-    invoices = relationship("Invoice", back_populates="project")
+    media = relationship("ProjectMedia", back_populates="project", cascade="all, delete-orphan", passive_deletes=True, order_by="ProjectMedia.display_order")
+    metrics = relationship("ProjectMetric", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    invoices = relationship("Invoice", back_populates="project", passive_deletes=True)
+    slug_history = relationship("ProjectSlugHistory", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    tags = relationship("ProjectTag", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
 
-class ProjectMedia(Base):
+class ProjectMedia(MediaMetadata, Base):
     """Media files for projects"""
     __tablename__ = "project_media"
+    __table_args__ = (
+        # One media item per slot; display_order counts per media type
+        UniqueConstraint("project_id", "media_type", "display_order", name="uq_project_media_slot"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     media_type = Column(String, default="image", nullable=False)  # image, video
     url = Column(String, nullable=False)
+    asset_id = Column(Integer, ForeignKey("media_assets.id", ondelete="SET NULL"), nullable=True, index=True)  # Null for legacy uploads
     alt_text = Column(String, nullable=True)
     display_order = Column(Integer, default=0)
 
@@ -51,3 +59,49 @@ class ProjectMedia(Base):
 
     # Relationships
     project = relationship("Project", back_populates="media")
+    asset = relationship("MediaAsset")
+
+
+class ProjectSlugHistory(Base):
+    """Previous slugs of a project, kept so old /projects/{slug} links redirect"""
+    __tablename__ = "project_slug_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    slug = Column(String, unique=True, nullable=False, index=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    project = relationship("Project", back_populates="slug_history")
+
+
+class ProjectTag(Base):
+    """A project's tech_stack entry, normalized for lookup by tag"""
+    __tablename__ = "project_tags"
+    __table_args__ = (
+        # Covers the tag filter and the tag-overlap join without touching the table
+        Index("ix_project_tags_tag_project", "tag", "project_id"),
+    )
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String(100), primary_key=True)  # Normalized: trimmed, lowercase
+    name = Column(String(100), nullable=False)  # As written in tech_stack
+
+    # Relationships
+    project = relationship("Project", back_populates="tags")
+
+
+class RelatedProject(Base):
+    """Precomputed project pair sharing at least one tag; score is the number shared.
+
+    Stored in both directions so a project's related list is one index scan.
+    """
+    __tablename__ = "related_projects"
+    __table_args__ = (
+        Index("ix_related_projects_project_score", "project_id", "score"),
+    )
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    related_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True, index=True)
+    score = Column(Integer, nullable=False)
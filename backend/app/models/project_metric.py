@@ -9,7 +9,7 @@ class ProjectMetric(Base):
     __tablename__ = "project_metrics"
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Icon configuration
     icon_type = Column(String, nullable=False)  # 'emoji' or 'lucide'
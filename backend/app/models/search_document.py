@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, UniqueConstraint
+from app.db import Base
+
+
+class SearchDocument(Base):
+    """Denormalized search text for a client, lead or project.
+
+    The full-text index itself (SQLite FTS5 tables or the Postgres
+    tsvector/trigram indexes) is built on top of this table; see
+    search_service.
+    """
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_document_entity"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(20), nullable=False)  # client, lead, project
+    entity_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=True)  # Owner for user-scoped entities (clients)
+    title = Column(String, nullable=False, default="")
+    body = Column(Text, nullable=False, default="")
@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app.core.dependencies import get_current_admin_user
@@ -14,11 +14,12 @@ router = APIRouter(prefix="/admin/clients", tags=["admin-clients"])
 def list_clients(
     skip: int = 0,
     limit: int = 100,
+    q: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """List all clients (admin only)"""
-    clients = client_service.get_clients(db, current_user.id, skip=skip, limit=limit)
+    """List all clients, or search them with q (admin only)"""
+    clients = client_service.get_clients(db, current_user.id, skip=skip, limit=limit, search=q)
     return clients
 
 
@@ -1,17 +1,71 @@
+import asyncio
 from typing import List
-from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.config import settings
 from app.core.dependencies import get_current_admin_user
 from app.models.user import User
-from app.schemas.project import ProjectMediaResponse
-from app.services import media_service
+from app.schemas.project import ProjectMediaResponse, MediaOrderUpdate, UploadSessionCreate, UploadSessionResponse
+from app.services import media_service, project_service, upload_session_service
 
-router = APIRouter(prefix="/admin/projects", tags=["admin-media"])
+INVALID_MEDIA_DETAIL = "Invalid file type or size. Allowed images: jpg, jpeg, png, gif, webp, svg (max 5MB). Allowed videos: mp4, webm, mov (max 50MB)"
+MULTIPART_OVERHEAD = 64 * 1024  # Form fields and part headers sent along with a file
+
+
+def max_body_size(limit: int):
+    """Limit the request body of an endpoint on this router (see BodyLimitRoute)"""
+    def decorate(endpoint):
+        endpoint.max_body_size = limit
+        return endpoint
+    return decorate
+
+
+class BodyLimitRoute(APIRoute):
+    """Answers 413 as soon as a request body is over its endpoint's
+    max_body_size: up front from Content-Length, or while a chunked body
+    arrives. Either way before Starlette spools the whole upload to disk."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        limit = getattr(self.endpoint, "max_body_size", None)
+        if limit is None:
+            return handler
+
+        def too_large() -> HTTPException:
+            return HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Request body exceeds {limit // (1024 * 1024)}MB"
+            )
+
+        async def limited_handler(request: Request) -> Response:
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > limit:
+                raise too_large()
+
+            received = 0
+
+            async def receive():
+                nonlocal received
+                message = await request.receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > limit:
+                        raise too_large()
+                return message
+
+            return await handler(Request(request.scope, receive))
+
+        return limited_handler
+
+
+router = APIRouter(prefix="/admin/projects", tags=["admin-media"], route_class=BodyLimitRoute)
 
 
 @router.post("/{project_id}/media", response_model=ProjectMediaResponse, status_code=status.HTTP_201_CREATED)
+@max_body_size(media_service.MAX_VIDEO_SIZE + MULTIPART_OVERHEAD)
 async def upload_project_media(
     project_id: int,
     file: UploadFile = File(...),
@@ -27,7 +81,7 @@ async def upload_project_media(
     if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type or size. Allowed images: jpg, jpeg, png, gif, webp, svg (max 5MB). Allowed videos: mp4, webm, mov (max 50MB)"
+            detail=INVALID_MEDIA_DETAIL
         )
 
     # Save file
@@ -45,24 +99,24 @@ async def upload_project_media(
             detail=f"Failed to save file: {str(e)}"
         )
 
-    # Create or replace database record - if this fails, clean up the uploaded file
+    # Create or replace database record - if this fails, clean up the uploaded file.
+    # Sync DB work runs in the threadpool so it doesn't block the event loop.
     try:
         # Use replace_or_create if display_order is provided, otherwise use create
         if display_order is not None:
-            media = media_service.replace_or_create_media(
+            media = await run_in_threadpool(
+                media_service.replace_or_create_media,
                 db, project_id, url, media_type=media_type, display_order=display_order, alt_text=alt_text
             )
         else:
-            media = media_service.create_project_media(
+            media = await run_in_threadpool(
+                media_service.create_project_media,
                 db, project_id, url, media_type=media_type, alt_text=alt_text
             )
 
         if not media:
             # Clean up orphaned file
-            filename = Path(url).name
-            file_path = media_service.UPLOAD_DIR / filename
-            if file_path.exists():
-                file_path.unlink()
+            await run_in_threadpool(media_service.delete_media_file, url, media_type)
             raise HTTPException(status_code=404, detail="Project not found")
 
         return media
@@ -71,16 +125,168 @@ async def upload_project_media(
     except Exception as e:
         # Clean up orphaned file on any database error
         if url:
-            filename = Path(url).name
-            file_path = media_service.UPLOAD_DIR / filename
-            if file_path.exists():
-                file_path.unlink()
+            await run_in_threadpool(media_service.delete_media_file, url, media_type)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create media record: {str(e)}"
         )
 
 
+@router.post("/{project_id}/media/batch", response_model=List[ProjectMediaResponse], status_code=status.HTTP_201_CREATED)
+async def upload_project_media_batch(
+    project_id: int,
+    files: List[UploadFile] = File(...),
+    alt_text: str = Form(""),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Upload several media files for a project concurrently (admin only).
+    Either every file is stored and recorded, or none are."""
+    media_types = []
+    for file in files:
+        is_valid, media_type = await media_service.validate_media(file)
+        if not is_valid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{file.filename}: {INVALID_MEDIA_DETAIL}"
+            )
+        media_types.append(media_type)
+
+    # Fail fast before uploading anything
+    if not await run_in_threadpool(project_service.get_project, db, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    semaphore = asyncio.Semaphore(settings.MEDIA_BATCH_PARALLELISM)
+
+    async def upload(file: UploadFile) -> str:
+        async with semaphore:
+            return await media_service.save_upload_file(file)
+
+    results = await asyncio.gather(*(upload(file) for file in files), return_exceptions=True)
+    uploads = [
+        (url, media_type) for url, media_type in zip(results, media_types)
+        if not isinstance(url, BaseException)
+    ]
+
+    async def cleanup():
+        await asyncio.gather(*(
+            run_in_threadpool(media_service.delete_media_file, url, media_type)
+            for url, media_type in uploads
+        ))
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await cleanup()
+        error = errors[0]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST if isinstance(error, ValueError) else status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save file: {str(error)}"
+        )
+
+    try:
+        media = await run_in_threadpool(
+            media_service.create_project_media_batch, db, project_id, uploads, alt_text=alt_text
+        )
+    except Exception as e:
+        await cleanup()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create media records: {str(e)}"
+        )
+
+    if media is None:
+        await cleanup()
+        raise HTTPException(status_code=404, detail="Project not found")
+    return media
+
+
+@router.post("/{project_id}/media/uploads", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+def create_upload_session(
+    project_id: int,
+    upload_data: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Start a resumable upload (admin only).
+    Send chunks with PUT, then POST .../complete."""
+    if not project_service.get_project(db, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    try:
+        session = upload_session_service.create_session(project_id, **upload_data.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return upload_session_service.with_expiry(session)
+
+
+def get_upload_session_or_404(upload_id: str) -> dict:
+    session = upload_session_service.get_session(upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+@router.get("/media/uploads/{upload_id}", response_model=UploadSessionResponse)
+def get_upload_session(
+    upload_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Upload progress; `received` is the offset to resume from (admin only)"""
+    return upload_session_service.with_expiry(get_upload_session_or_404(upload_id))
+
+
+@router.put("/media/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def append_upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    chunk_sha256: str = Header(..., alias="X-Chunk-SHA256"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Append the raw request body as the chunk starting at Upload-Offset (admin only)"""
+    session = get_upload_session_or_404(upload_id)
+    try:
+        session = await upload_session_service.append_chunk(session, upload_offset, request.stream(), chunk_sha256)
+    except upload_session_service.OffsetMismatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.expected)}
+        )
+    except upload_session_service.UploadBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return upload_session_service.with_expiry(session)
+
+
+@router.post("/media/uploads/{upload_id}/complete", response_model=UploadSessionResponse, status_code=status.HTTP_202_ACCEPTED)
+def complete_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Finish an upload; storage and the media record are handled in the background (admin only).
+    Poll GET .../uploads/{upload_id} until state is completed or failed."""
+    get_upload_session_or_404(upload_id)
+    try:
+        session = upload_session_service.mark_processing(upload_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    background_tasks.add_task(upload_session_service.process_session, upload_id)
+    return upload_session_service.with_expiry(session)
+
+
+@router.delete("/media/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def abort_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Abort an upload and discard received chunks (admin only)"""
+    get_upload_session_or_404(upload_id)
+    upload_session_service.delete_session(upload_id)
+    return None
+
+
 @router.get("/{project_id}/media", response_model=List[ProjectMediaResponse])
 def list_project_media(
     project_id: int,
@@ -92,6 +298,25 @@ def list_project_media(
     return media
 
 
+@router.put("/{project_id}/media/order", response_model=List[ProjectMediaResponse])
+def reorder_project_media(
+    project_id: int,
+    order_data: MediaOrderUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Reorder all media of a project in one request (admin only)"""
+    if not project_service.get_project(db, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    media = media_service.reorder_project_media(db, project_id, order_data.media_ids)
+    if media is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="media_ids must list every media item of the project exactly once"
+        )
+    return media
+
+
 @router.delete("/media/{media_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_media(
     media_id: int,
@@ -2,12 +2,14 @@ from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
+from app.core import metrics
 from app.db import get_db
 from app.core.dependencies import get_current_admin_user
 from app.models.user import User
 from app.services import client_service
 
 templates = Jinja2Templates(directory="app/templates")
+metrics.instrument_templates(templates)
 router = APIRouter(prefix="/admin", tags=["admin-pages"])
 
 
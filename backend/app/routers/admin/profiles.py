@@ -0,0 +1,40 @@
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from app.core.dependencies import get_current_admin_user
+from app.models.user import User
+from app.schemas.profile import ProfileReportResponse
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin-profiles"])
+
+
+@router.get("", response_model=List[ProfileReportResponse])
+def list_profiles(current_user: User = Depends(get_current_admin_user)):
+    """Saved request profiles, newest first (admin only).
+
+    Profile a request by sending it with "X-Profile: <access token>"; its
+    report id comes back in the X-Profile-Id response header.
+    """
+    from app.diagnostics import request_profiler
+
+    return request_profiler.list_reports()
+
+
+@router.get("/{report_id}")
+def get_profile(
+    report_id: str,
+    format: Literal["html", "folded"] = Query("html"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """One profile as an HTML call tree, or as folded stacks for flame graph tools (admin only)"""
+    from app.diagnostics import request_profiler
+
+    report = request_profiler.load_report(report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse(
+            request_profiler.render_folded(report),
+            headers={"Content-Disposition": f'attachment; filename="{report_id}.folded"'}
+        )
+    return HTMLResponse(request_profiler.render_html(report))
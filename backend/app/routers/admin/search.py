@@ -0,0 +1,23 @@
+from typing import List, Optional, Literal
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.core.dependencies import get_current_admin_user
+from app.models.user import User
+from app.schemas.search import SearchResponse
+from app.services import search_service
+
+router = APIRouter(prefix="/admin/search", tags=["admin-search"])
+
+
+@router.get("", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1),
+    types: Optional[List[Literal["client", "lead", "project"]]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Ranked search across clients, leads and projects (admin only)"""
+    return search_service.search(db, q, current_user.id, entity_types=types, skip=skip, limit=limit)
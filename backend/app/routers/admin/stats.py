@@ -0,0 +1,29 @@
+from typing import List, Literal
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.core.dependencies import get_current_admin_user
+from app.models.user import User
+from app.schemas.stats import DashboardStatsResponse, RevenueSummaryResponse
+from app.services import stats_service, invoice_summary_service
+
+router = APIRouter(prefix="/admin/stats", tags=["admin-stats"])
+
+
+@router.get("", response_model=DashboardStatsResponse)
+def get_dashboard_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Dashboard counts, invoice totals and recent items (admin only)"""
+    return stats_service.get_dashboard_stats(db, current_user.id)
+
+
+@router.get("/revenue", response_model=List[RevenueSummaryResponse])
+def get_revenue_summary(
+    group_by: Literal["month", "client", "status"] = Query("month"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Invoiced, paid, outstanding and overdue totals (admin only)"""
+    return invoice_summary_service.get_revenue_summary(db, current_user.id, group_by=group_by)
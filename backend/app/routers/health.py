@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.services import health_service
+
+router = APIRouter(prefix="/health", tags=["operations"])
+
+
+@router.get("/live")
+async def liveness():
+    """The worker's event loop is responding; checks nothing else"""
+    return {"status": "alive", "version": settings.VERSION}
+
+
+@router.get("/ready")
+async def readiness():
+    """Whether this worker should receive traffic (503 when not).
+
+    Failing SMTP or storage only marks the worker degraded.
+    """
+    result = await health_service.readiness()
+    return JSONResponse(result, status_code=503 if result["status"] == "not_ready" else 200)
@@ -0,0 +1,20 @@
+from secrets import compare_digest
+from fastapi import APIRouter, HTTPException, Request, Response
+from app.core import metrics
+from app.core.config import settings
+
+router = APIRouter(tags=["operations"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Prometheus scrape endpoint covering every worker.
+
+    Async so the threadpool gauges are read on the event loop; it only
+    reads a few small snapshot files.
+    """
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not compare_digest(authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(metrics.collect(), media_type=metrics.CONTENT_TYPE)
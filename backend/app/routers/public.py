@@ -1,32 +1,211 @@
-from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Set, Union
+from fastapi import APIRouter, Request, Depends, HTTPException, Response
+from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.db import get_db
+from app.core import metrics
+from app.core.cache import get_cache, single_flight
+from app.core.config import settings
+from app.db import SessionLocal, get_db
 from app.services import project_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["public"])
 templates = Jinja2Templates(directory="app/templates")
+metrics.instrument_templates(templates)
+
+# Re-renders of outdated pages, off the request path; one queued per page
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="page-refresh")
+_refreshing: Set[str] = set()
+_refreshing_lock = threading.Lock()
+
+Render = Callable[[Session], Union[str, Response]]
+
+
+def _render(name: str, context: dict) -> str:
+    return templates.TemplateResponse(name, context).body.decode()
+
+
+def _render_and_store(key: str, render: Render, db: Session, has_stale: bool) -> Union[str, Response]:
+    cache = get_cache()
+    try:
+        page = render(db)
+    except HTTPException:
+        if has_stale:
+            # Unpublished or deleted: stop serving the old version
+            cache.invalidate(project_service.STALE_PAGES, key)
+        raise
+    if not isinstance(page, str):
+        if has_stale:  # Renamed: redirects from now on
+            cache.invalidate(project_service.STALE_PAGES, key)
+    else:
+        cache.set(project_service.PUBLIC_PAGES, key, page, ttl=settings.CACHE_PAGE_TTL)
+        cache.set(
+            project_service.STALE_PAGES, key, {"html": page, "rendered_at": time.time()},
+            ttl=settings.CACHE_PAGE_STALE_IF_ERROR
+        )
+    return page
+
+
+def _refresh(key: str, render: Render) -> None:
+    db = SessionLocal()
+    try:
+        single_flight(f"page:{key}", lambda: _render_and_store(key, render, db, True))
+    except HTTPException:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not refresh page {key}: {str(e)}")
+    finally:
+        db.close()
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(key: str, render: Render) -> None:
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    _refresh_executor.submit(_refresh, key, render)
+
+
+def _cached_page(key: str, render: Render, db: Session) -> Response:
+    """The page cached under key, or render(db)'s HTML, cached until a project
+    changes or CACHE_PAGE_TTL passes. Responses render returns (redirects)
+    aren't cached, nor are its exceptions (404s).
+
+    Concurrent misses for a page share one render. For CACHE_PAGE_STALE_GRACE
+    seconds after a page expires or is invalidated, its previous version is
+    served while it re-renders in the background. If rendering fails, the
+    last good version is served if there is one.
+    """
+    cache = get_cache()
+    page = cache.get(project_service.PUBLIC_PAGES, key)
+    if page is not None:
+        return HTMLResponse(page)
+
+    stale = cache.get(project_service.STALE_PAGES, key)
+    if stale and time.time() - stale["rendered_at"] < settings.CACHE_PAGE_TTL + settings.CACHE_PAGE_STALE_GRACE:
+        _schedule_refresh(key, render)
+        return HTMLResponse(stale["html"])
+
+    try:
+        page = single_flight(f"page:{key}", lambda: _render_and_store(key, render, db, bool(stale)))
+    except HTTPException:
+        raise
+    except Exception as e:
+        if not stale:
+            raise
+        logger.warning(f"Serving the last good page {key}: rendering failed: {str(e)}")
+        return HTMLResponse(stale["html"])
+    return page if isinstance(page, Response) else HTMLResponse(page)
 
 
 @router.get("/", response_class=HTMLResponse)
 def home(request: Request, db: Session = Depends(get_db)):
-    """Public home page"""
-    projects = project_service.get_projects(db, published_only=True, limit=100)
-    return templates.TemplateResponse("public/home.html", {
-        "request": request,
-        "projects": projects
-    })
+    """Public home page: featured projects and the first page of project cards"""
+    def render(db: Session) -> str:
+        featured_projects = project_service.get_featured_projects(db)
+        projects, next_cursor = project_service.get_project_cards(db, limit=settings.HOME_PAGE_SIZE)
+        return _render("public/home.html", {
+            "request": request,
+            "featured_projects": featured_projects,
+            "projects": projects,
+            "next_cursor": next_cursor
+        })
+
+    return _cached_page("home", render, db)
+
+
+@router.get("/projects", response_class=HTMLResponse)
+def project_list(request: Request, tag: Optional[str] = None, db: Session = Depends(get_db)):
+    """Published projects with a tech-stack tag; without one, the home grid"""
+    tag = project_service.normalize_tag(tag or "")
+    if not tag:
+        return RedirectResponse(url="/#projects", status_code=302)
+
+    def render(db: Session) -> str:
+        tag_name = project_service.get_tag_name(db, tag)
+        if not tag_name:
+            raise HTTPException(status_code=404, detail="Tag not found")
+
+        projects, next_cursor = project_service.get_project_cards(db, limit=settings.HOME_PAGE_SIZE, tag=tag)
+        return _render("public/projects.html", {
+            "request": request,
+            "tag": tag,
+            "tag_name": tag_name,
+            "projects": projects,
+            "next_cursor": next_cursor
+        })
+
+    return _cached_page(f"tag:{tag}", render, db)
+
+
+@router.get("/projects/fragment", response_class=HTMLResponse)
+def project_cards_fragment(
+    request: Request,
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Rendered project cards after cursor, for infinite scroll.
+    Each cursor addresses a fixed page, so responses are cacheable."""
+    tag = project_service.normalize_tag(tag or "") or None
+    if cursor:
+        try:
+            # One cache key per position, however the cursor was spelled
+            cursor = project_service.encode_cursor(*project_service.decode_cursor(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def render(db: Session) -> Union[str, Response]:
+        if tag and not project_service.get_tag_name(db, tag):
+            raise HTTPException(status_code=404, detail="Tag not found")
+
+        projects, next_cursor = project_service.get_project_cards(db, cursor, limit=settings.HOME_PAGE_SIZE, tag=tag)
+        html = _render("public/_project_cards.html", {
+            "request": request,
+            "projects": projects,
+            "next_cursor": next_cursor
+        })
+        # Only pages a visitor can reach are cached, so made-up cursors
+        # can't fill the cache; a cursor whose project has since left the
+        # grid still gets its page
+        if not projects or (cursor and not project_service.is_card_cursor(db, cursor, tag)):
+            return HTMLResponse(html)
+        return html
+
+    response = _cached_page(f"cards:{tag or ''}:{cursor or ''}", render, db)
+    etag = '"' + hashlib.sha256(response.body).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.PROJECT_FRAGMENT_MAX_AGE}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
 
 
 @router.get("/projects/{slug}", response_class=HTMLResponse)
 def project_detail(slug: str, request: Request, db: Session = Depends(get_db)):
     """Public project detail page"""
-    project = project_service.get_project_by_slug(db, slug)
-    if not project or not project.is_published:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    return templates.TemplateResponse("public/project_detail.html", {
-        "request": request,
-        "project": project
-    })
+    def render(db: Session) -> Union[str, Response]:
+        project = project_service.get_project_by_slug(db, slug)
+        if not project:
+            new_slug = project_service.resolve_slug_redirect(db, slug)
+            if new_slug:
+                return RedirectResponse(url=f"/projects/{new_slug}", status_code=301)
+        if not project or not project.is_published:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        return _render("public/project_detail.html", {
+            "request": request,
+            "project": project,
+            "related_projects": project_service.get_related_projects(db, project.id, limit=settings.RELATED_PROJECTS_LIMIT)
+        })
+
+    return _cached_page(f"project:{slug}", render, db)
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class ProfileReportResponse(BaseModel):
+    id: str
+    method: str
+    path: str
+    status: int
+    created_at: datetime
+    duration_ms: float
+    interval_ms: float
+    samples: int
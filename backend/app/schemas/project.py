@@ -36,12 +36,44 @@ class ProjectMediaCreate(ProjectMediaBase):
 class ProjectMediaResponse(ProjectMediaBase):
     id: int
     project_id: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    byte_size: Optional[int] = None
+    mime_type: Optional[str] = None
+    duration: Optional[float] = None
+    poster_url: Optional[str] = None
+    placeholder: Optional[str] = None
     created_at: DateTimeType
 
     class Config:
         from_attributes = True
 
 
+class MediaOrderUpdate(BaseModel):
+    media_ids: List[int]  # Every media id of the project, in display order
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    alt_text: str = ""
+    display_order: Optional[int] = None
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    project_id: int
+    filename: str
+    size: int
+    received: int
+    chunk_size: int
+    state: str  # uploading, processing, completed, failed
+    media_type: Optional[str] = None
+    media_id: Optional[int] = None
+    error: Optional[str] = None
+    expires_at: float
+
+
 class ProjectBase(BaseModel):
     client_id: Optional[int] = None
     title: str
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class SearchResult(BaseModel):
+    entity_type: str
+    entity_id: int
+    title: str
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    mode: str  # fulltext, trigram or like
+    total: int
+    results: List[SearchResult]
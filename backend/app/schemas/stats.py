@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List
+from decimal import Decimal
+from app.models.lead import LeadStatus
+from app.models.invoice import InvoiceStatus
+from app.schemas.invoice import InvoiceListResponse
+
+
+class RecentLeadResponse(BaseModel):
+    id: int
+    name: str
+    email: str
+    status: LeadStatus
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class InvoiceStatusTotal(BaseModel):
+    status: InvoiceStatus
+    count: int
+    total: Decimal
+
+
+class DashboardStatsResponse(BaseModel):
+    total_projects: int
+    new_leads: int
+    total_clients: int
+    pending_invoices: int
+    outstanding_total: Decimal
+    overdue_total: Decimal
+    invoice_totals: List[InvoiceStatusTotal]
+    recent_leads: List[RecentLeadResponse]
+    recent_invoices: List[InvoiceListResponse]
+
+
+class RevenueSummaryResponse(BaseModel):
+    key: str
+    invoiced: Decimal
+    paid: Decimal
+    outstanding: Decimal
+    overdue: Decimal
@@ -0,0 +1,206 @@
+"""Production server: a pre-forking supervisor around uvicorn.
+
+Usage (from backend/):
+    python -m app.serve [--workers N] [--host HOST] [--port PORT]
+
+The app is imported and warmed once, then WEB_WORKERS processes are
+forked from it, so they share the loaded code and compiled templates
+copy-on-write and all accept from one listening socket. A worker that
+exits (e.g. after WEB_MAX_REQUESTS) is replaced; SIGTERM or SIGINT
+gives workers WEB_GRACEFUL_TIMEOUT seconds to finish before they are
+killed. Without fork (Windows) a single in-process server runs instead.
+Workers share their metrics through METRICS_DIR (see app.core.metrics).
+"""
+import argparse
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+import uvicorn
+from app.core import log, metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESPAWN_BACKOFF = 1.0  # Seconds to wait before replacing a worker that died at startup
+MIN_WORKER_UPTIME = 5.0  # Workers exiting sooner than this count as startup failures
+POLL_INTERVAL = 0.2
+
+
+def default_workers() -> int:
+    """One worker per CPU this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def warm_app():
+    """Import the app and do its one-time setup before forking"""
+    from sqlalchemy.orm import configure_mappers
+    from app.db import engine
+    from app.main import app
+    from app.services import health_service
+
+    configure_mappers()
+    # Compile every template once here instead of in each worker
+    health_service.warm_templates()
+
+    # Pooled connections must not be shared between processes
+    engine.dispose()
+    # Move everything loaded so far out of the collector's reach so
+    # collections in workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    # An explicit IPPROTO_TCP lets asyncio set TCP_NODELAY on accepted
+    # connections; with proto 0 it skips them and Nagle adds ~40ms stalls
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def server_config(app) -> uvicorn.Config:
+    max_requests = None
+    if settings.WEB_MAX_REQUESTS > 0:
+        max_requests = settings.WEB_MAX_REQUESTS + random.randint(0, max(settings.WEB_MAX_REQUESTS_JITTER, 0))
+    return uvicorn.Config(
+        app,
+        timeout_keep_alive=settings.WEB_KEEPALIVE,
+        backlog=settings.WEB_BACKLOG,
+        limit_max_requests=max_requests,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        # Logging is set up by app.core.log, which also replaces the access log
+        log_config=None,
+        access_log=not settings.ACCESS_LOG,
+    )
+
+
+def run_worker(app, sock: socket.socket, index: int) -> None:
+    """Serve in a forked worker until it is told to stop; never returns"""
+    random.seed()
+    log.configure()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # One worker runs the background jobs; running them everywhere would
+    # only make the workers race for the same queue rows
+    if index > 0:
+        settings.RUN_BACKGROUND_JOBS = False
+
+    status = 0
+    try:
+        uvicorn.Server(server_config(app)).run(sockets=[sock])
+    except BaseException:
+        logger.exception(f"Worker {index} crashed")
+        status = 1
+    finally:
+        os._exit(status)
+
+
+class Supervisor:
+    """Forks workers, replaces the ones that exit and stops them all on a signal"""
+
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.children: Dict[int, tuple] = {}  # pid -> (worker index, start time)
+        self.stopping = False
+
+    def spawn(self, index: int) -> None:
+        # Fork with no logging thread running, so no lock it holds is copied locked
+        log.stop()
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.app, self.sock, index)
+        log.configure()
+        self.children[pid] = (index, time.monotonic())
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def reap(self) -> Optional[tuple]:
+        """(index, uptime) of a worker that exited, or None"""
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return None
+        if not pid or pid not in self.children:
+            return None
+        index, started = self.children.pop(pid)
+        code = os.waitstatus_to_exitcode(status)
+        if not self.stopping:
+            logger.info(f"Worker {index} (pid {pid}) exited with {code}")
+        return index, time.monotonic() - started
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.workers):
+            self.spawn(index)
+
+        while not self.stopping:
+            exited = self.reap()
+            if not exited:
+                time.sleep(POLL_INTERVAL)
+                continue
+            index, uptime = exited
+            if uptime < MIN_WORKER_UPTIME:
+                time.sleep(RESPAWN_BACKOFF)
+            if not self.stopping:
+                self.spawn(index)
+
+        return self.shutdown()
+
+    def shutdown(self) -> int:
+        logger.info(f"Stopping {len(self.children)} worker(s)")
+        for pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+
+        # uvicorn's own graceful timeout plus a little time to exit
+        deadline = time.monotonic() + settings.WEB_GRACEFUL_TIMEOUT + 5
+        while self.children and time.monotonic() < deadline:
+            if not self.reap():
+                time.sleep(POLL_INTERVAL)
+
+        for pid in self.children:
+            logger.warning(f"Killing worker pid {pid} after the graceful timeout")
+            os.kill(pid, signal.SIGKILL)
+        return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the app with pre-forked uvicorn workers")
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS or default_workers())
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    args = parser.parse_args(argv)
+
+    log.configure()
+    app = warm_app()
+    sock = bind_socket(args.host, args.port, settings.WEB_BACKLOG)
+    logger.info(f"Listening on {args.host}:{args.port} with {args.workers} worker(s)")
+
+    if not hasattr(os, "fork"):
+        uvicorn.Server(server_config(app)).run(sockets=[sock])
+        return 0
+    # Workers publish their metrics here so /metrics can report all of them
+    metrics.reset_dir()
+    return Supervisor(app, sock, max(args.workers, 1)).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,11 @@
-from app.services import project_service, media_service, lead_service, client_service, invoice_service
+from app.services import (
+    project_service, media_service, lead_service, client_service, invoice_service,
+    invoice_summary_service, search_service, stats_service, upload_session_service,
+    storage_service, media_cleanup_service
+)
 
-__all__ = ["project_service", "media_service", "lead_service", "client_service", "invoice_service"]
+__all__ = [
+    "project_service", "media_service", "lead_service", "client_service", "invoice_service",
+    "invoice_summary_service", "search_service", "stats_service", "upload_session_service",
+    "storage_service", "media_cleanup_service"
+]
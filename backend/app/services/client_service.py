@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session, selectinload
 from app.models.client import Client
 from app.schemas.client import ClientCreate, ClientUpdate
+from app.services import search_service
 from typing import List, Optional
 
 
@@ -11,6 +12,8 @@ def create_client(db: Session, client_data: ClientCreate, user_id: int) -> Clien
         user_id=user_id
     )
     db.add(client)
+    db.flush()
+    search_service.index_client(db, client)
     db.commit()
     db.refresh(client)
     return client
@@ -26,8 +29,19 @@ def get_client(db: Session, client_id: int, user_id: int) -> Optional[Client]:
     ).first()
 
 
-def get_clients(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Client]:
-    """Get list of clients"""
+def get_clients(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[str] = None
+) -> List[Client]:
+    """Get list of clients, optionally ranked by a search query"""
+    if search:
+        ids = search_service.search_ids(db, search, user_id, "client", skip=skip, limit=limit)
+        clients = {client.id: client for client in db.query(Client).filter(Client.id.in_(ids))}
+        return [clients[client_id] for client_id in ids if client_id in clients]
+
     return db.query(Client).filter(
         Client.user_id == user_id
     ).order_by(Client.created_at.desc()).offset(skip).limit(limit).all()
@@ -48,6 +62,7 @@ def update_client(
     for field, value in update_data.items():
         setattr(client, field, value)
 
+    search_service.index_client(db, client)
     db.commit()
     db.refresh(client)
     return client
@@ -59,6 +74,7 @@ def delete_client(db: Session, client_id: int, user_id: int) -> bool:
     if not client:
         return False
 
+    search_service.remove_document(db, "client", client.id)
     db.delete(client)
     db.commit()
     return True
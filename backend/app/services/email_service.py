@@ -1,6 +1,4 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from app.core import metrics
 from app.core.config import settings
 import logging
 
@@ -19,6 +17,11 @@ def send_contact_form_notification(name: str, email: str, message: str) -> bool:
     Returns:
         True if email was sent successfully, False otherwise
     """
+    # Imported here so the SMTP and MIME modules load only when mail is sent
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     try:
         # Create message
         msg = MIMEMultipart('alternative')
@@ -98,7 +101,7 @@ This notification was sent from your portfolio website at cmack.dev
             return False
 
         # Use SMTP with STARTTLS for better compatibility (especially on PythonAnywhere)
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
+        with metrics.outbound_call("smtp", "send"), smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
             server.starttls()
             server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
             server.send_message(msg)
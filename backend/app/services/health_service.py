@@ -0,0 +1,164 @@
+"""Liveness and readiness checks for load balancer probes.
+
+A worker is ready when the database answers within HEALTH_DB_BUDGET_MS,
+its schema is at the migrations' head, the connection pool isn't
+saturated and templates have been compiled. SMTP and media storage are
+only probed for reachability; when they fail the worker reports
+"degraded" but stays in rotation. Results are cached for
+HEALTH_CACHE_SECONDS and concurrent probes share one check, so probing
+adds no load however often the balancer asks.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Set
+from urllib.parse import urlparse
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+
+_templates_warm = False
+_expected_heads: Optional[Set[str]] = None
+_schema_current = False  # Once at head a running worker stays there
+_cached: Optional[tuple] = None  # (monotonic time, result)
+_lock: Optional[asyncio.Lock] = None
+
+
+def warm_templates() -> int:
+    """Compile every template so first requests don't pay for it. Returns the count."""
+    global _templates_warm
+    from app.main import templates
+    from app.routers import public
+    from app.routers.admin import pages
+
+    count = 0
+    for environment in {id(t.env): t.env for t in (templates, public.templates, pages.templates)}.values():
+        for name in environment.list_templates():
+            environment.get_template(name)
+            count += 1
+    _templates_warm = True
+    return count
+
+
+def templates_warm() -> bool:
+    return _templates_warm
+
+
+def _load_expected_heads() -> None:
+    global _expected_heads
+    from app.commands import migrate
+
+    _expected_heads = migrate.expected_heads() or set(migrate.script_heads())
+
+
+def _check_database() -> Dict:
+    global _schema_current
+    from app.commands import migrate
+    from app.db import engine
+
+    start = time.perf_counter()
+    revisions = migrate.current_revisions(engine)
+    latency_ms = (time.perf_counter() - start) * 1000
+    result = {"latency_ms": round(latency_ms, 1), "budget_ms": settings.HEALTH_DB_BUDGET_MS}
+
+    if not _schema_current:
+        _schema_current = revisions == _expected_heads
+    result["migrations_current"] = _schema_current
+    result["ok"] = latency_ms <= settings.HEALTH_DB_BUDGET_MS and _schema_current
+    return result
+
+
+def _check_pool() -> Dict:
+    from app.db import engine
+
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"ok": True}
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    checked_out = pool.checkedout()
+    saturation = checked_out / capacity if capacity else 0
+    return {
+        "ok": saturation < settings.HEALTH_POOL_SATURATION,
+        "checked_out": checked_out,
+        "capacity": capacity,
+    }
+
+
+async def _reachable(host: str, port: int) -> Dict:
+    """Whether a TCP connection to host:port opens within HEALTH_DEPENDENCY_TIMEOUT"""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), settings.HEALTH_DEPENDENCY_TIMEOUT)
+    except (OSError, asyncio.TimeoutError) as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    writer.close()
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+async def _check_smtp() -> Dict:
+    if not settings.SMTP_USER or not settings.SMTP_PASSWORD:
+        return {"ok": True, "configured": False}
+    return await _reachable(settings.SMTP_HOST, settings.SMTP_PORT)
+
+
+async def _check_storage() -> Dict:
+    from app.services import storage_service
+
+    try:
+        name = storage_service.get_backend_name()
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+
+    if name == "local":
+        root = settings.MEDIA_LOCAL_DIR
+        writable = os.access(root, os.W_OK) or not os.path.exists(root)
+        return {"ok": writable, "backend": name}
+    if name == "cloudinary":
+        host = "api.cloudinary.com"
+    else:
+        host = urlparse(settings.S3_ENDPOINT_URL).hostname or f"s3.{settings.S3_REGION or 'us-east-1'}.amazonaws.com"
+    return {"backend": name, **await _reachable(host, 443)}
+
+
+async def _run_checks() -> Dict:
+    if _expected_heads is None:
+        # Kept out of the latency budget: without head.json this loads Alembic
+        await run_in_threadpool(_load_expected_heads)
+    try:
+        database = await asyncio.wait_for(run_in_threadpool(_check_database), settings.HEALTH_DB_BUDGET_MS / 1000)
+    except asyncio.TimeoutError:
+        database = {"ok": False, "error": f"No answer within {settings.HEALTH_DB_BUDGET_MS}ms"}
+    except Exception as e:
+        database = {"ok": False, "error": str(e)}
+
+    smtp, storage = await asyncio.gather(_check_smtp(), _check_storage())
+    required = {
+        "database": database,
+        "pool": _check_pool(),
+        "templates": {"ok": _templates_warm},
+    }
+    optional = {"smtp": smtp, "storage": storage}
+
+    if not all(check["ok"] for check in required.values()):
+        status = "not_ready"
+    elif not all(check["ok"] for check in optional.values()):
+        status = "degraded"
+    else:
+        status = "ready"
+    return {"status": status, "checks": {**required, **optional}}
+
+
+async def readiness() -> Dict:
+    """Readiness report, re-checked at most every HEALTH_CACHE_SECONDS"""
+    global _cached, _lock
+    if _cached and time.monotonic() - _cached[0] < settings.HEALTH_CACHE_SECONDS:
+        return _cached[1]
+
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        # Probes that waited on the lock get the result the first one computed
+        if _cached and time.monotonic() - _cached[0] < settings.HEALTH_CACHE_SECONDS:
+            return _cached[1]
+        result = await _run_checks()
+        _cached = (time.monotonic(), result)
+        return result
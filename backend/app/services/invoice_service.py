@@ -1,27 +1,53 @@
 from sqlalchemy.orm import Session
-from app.models.invoice import Invoice, InvoiceItem, InvoiceStatus
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.models.invoice import Invoice, InvoiceItem, InvoiceStatus, InvoiceNumberCounter
 from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceItemCreate
+from app.services import invoice_summary_service
 from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
 
 
-def generate_invoice_number(db: Session, user_id: int, prefix: str = "INV") -> str:
-    """Generate unique invoice number"""
-    # Get count of invoices for this user
-    count = db.query(Invoice).filter(Invoice.user_id == user_id).count()
-    number = count + 1
-
-    # Generate invoice number with year and padded number
-    year = datetime.now().year
-    invoice_number = f"{prefix}-{year}-{number:04d}"
+def allocate_invoice_number(db: Session, user_id: int, year: int) -> int:
+    """Atomically increment and return the user's counter for a year.
+
+    Runs in the caller's transaction: the counter row stays locked until
+    the invoice commits (Postgres row lock, SQLite database write lock),
+    so concurrent creates are serialized and a rollback leaves no gap.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(InvoiceNumberCounter).values(user_id=user_id, year=year, last_number=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InvoiceNumberCounter.user_id, InvoiceNumberCounter.year],
+            set_={"last_number": InvoiceNumberCounter.last_number + 1}
+        ).returning(InvoiceNumberCounter.last_number)
+        return db.execute(stmt).scalar_one()
+
+    # Generic fallback: lock the counter row, then bump it
+    counter = db.query(InvoiceNumberCounter).filter(
+        InvoiceNumberCounter.user_id == user_id,
+        InvoiceNumberCounter.year == year
+    ).with_for_update().first()
+    if not counter:
+        counter = InvoiceNumberCounter(user_id=user_id, year=year, last_number=0)
+        db.add(counter)
+    counter.last_number += 1
+    db.flush()
+    return counter.last_number
 
-    # Ensure uniqueness
-    while db.query(Invoice).filter(Invoice.invoice_number == invoice_number).first():
-        number += 1
-        invoice_number = f"{prefix}-{year}-{number:04d}"
 
-    return invoice_number
+def generate_invoice_number(db: Session, user_id: int, prefix: Optional[str] = None) -> str:
+    """Generate the next invoice number, unique per user"""
+    year = datetime.now().year
+    number = allocate_invoice_number(db, user_id, year)
+    return settings.INVOICE_NUMBER_FORMAT.format(
+        prefix=prefix or settings.INVOICE_NUMBER_PREFIX,
+        year=year,
+        number=number
+    )
 
 
 def calculate_invoice_totals(items: List[InvoiceItemCreate], tax_rate: Decimal) -> dict:
@@ -73,6 +99,8 @@ def create_invoice(db: Session, invoice_data: InvoiceCreate, user_id: int) -> In
         )
         db.add(item)
 
+    invoice_summary_service.apply_bucket(db, invoice_summary_service.invoice_bucket(invoice), 1)
+
     db.commit()
     db.refresh(invoice)
     return invoice
@@ -117,10 +145,13 @@ def update_invoice(
         return None
 
     update_data = invoice_data.model_dump(exclude_unset=True)
+    old_bucket = invoice_summary_service.invoice_bucket(invoice)
 
     for field, value in update_data.items():
         setattr(invoice, field, value)
 
+    invoice_summary_service.move_bucket(db, old_bucket, invoice)
+
     db.commit()
     db.refresh(invoice)
     return invoice
@@ -132,6 +163,7 @@ def delete_invoice(db: Session, invoice_id: int, user_id: int) -> bool:
     if not invoice:
         return False
 
+    invoice_summary_service.apply_bucket(db, invoice_summary_service.invoice_bucket(invoice), -1)
     db.delete(invoice)
     db.commit()
     return True
@@ -143,8 +175,10 @@ def mark_invoice_paid(db: Session, invoice_id: int, user_id: int) -> Optional[In
     if not invoice:
         return None
 
+    old_bucket = invoice_summary_service.invoice_bucket(invoice)
     invoice.status = InvoiceStatus.PAID
     invoice.paid_date = datetime.utcnow()
+    invoice_summary_service.move_bucket(db, old_bucket, invoice)
 
     db.commit()
     db.refresh(invoice)
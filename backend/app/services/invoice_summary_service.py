@@ -0,0 +1,195 @@
+from sqlalchemy import func, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.invoice_summary import InvoiceSummary
+from typing import List, Optional, Tuple
+from decimal import Decimal
+from datetime import datetime
+
+OUTSTANDING_STATUSES = (InvoiceStatus.SENT, InvoiceStatus.OVERDUE)
+INVOICED_STATUSES = (InvoiceStatus.SENT, InvoiceStatus.OVERDUE, InvoiceStatus.PAID)
+GROUP_BY_COLUMNS = {
+    "status": InvoiceSummary.status,
+    "client": InvoiceSummary.client_id,
+    "month": InvoiceSummary.period,
+}
+
+
+def get_period(issue_date: Optional[datetime], created_at: datetime) -> str:
+    """Summary period for an invoice: its issue month, else the month it was
+    created (the same rule as the backfill in the add_invoice_summaries migration)"""
+    return (issue_date or created_at).strftime("%Y-%m")
+
+
+def invoice_bucket(invoice: Invoice) -> Tuple[int, int, InvoiceStatus, str, Decimal]:
+    """Snapshot the fields of an invoice that feed the summary table"""
+    return (
+        invoice.user_id,
+        invoice.client_id,
+        invoice.status,
+        get_period(invoice.issue_date, invoice.created_at),
+        Decimal(str(invoice.total or 0)),
+    )
+
+
+def apply_bucket(db: Session, bucket: Tuple[int, int, InvoiceStatus, str, Decimal], sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one invoice's contribution.
+
+    Runs inside the caller's transaction so the summary commits or rolls
+    back together with the invoice change. Each change is a single
+    statement, so concurrent writes to one bucket can't lose an update or
+    race to create it.
+    """
+    user_id, client_id, status, period, total = bucket
+    in_bucket = (
+        (InvoiceSummary.user_id == user_id)
+        & (InvoiceSummary.client_id == client_id)
+        & (InvoiceSummary.status == status)
+        & (InvoiceSummary.period == period)
+    )
+
+    if sign < 0:
+        db.execute(update(InvoiceSummary).where(in_bucket).values(
+            invoice_count=InvoiceSummary.invoice_count - 1,
+            total=InvoiceSummary.total - total
+        ))
+        db.execute(delete(InvoiceSummary).where(in_bucket, InvoiceSummary.invoice_count <= 0))
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(InvoiceSummary).values(
+            user_id=user_id, client_id=client_id, status=status, period=period, invoice_count=1, total=total
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[InvoiceSummary.user_id, InvoiceSummary.client_id, InvoiceSummary.status, InvoiceSummary.period],
+            set_={
+                "invoice_count": InvoiceSummary.invoice_count + 1,
+                "total": InvoiceSummary.total + total
+            }
+        ))
+        return
+
+    # Generic fallback: lock the bucket row, then bump it
+    row = db.query(InvoiceSummary).filter(in_bucket).with_for_update().first()
+    if not row:
+        row = InvoiceSummary(
+            user_id=user_id,
+            client_id=client_id,
+            status=status,
+            period=period,
+            invoice_count=0,
+            total=Decimal("0.00")
+        )
+        db.add(row)
+    row.invoice_count += 1
+    row.total = Decimal(str(row.total or 0)) + total
+    db.flush()
+
+
+def move_bucket(db: Session, old_bucket: tuple, invoice: Invoice) -> None:
+    """Move an invoice's contribution after an update"""
+    new_bucket = invoice_bucket(invoice)
+    if new_bucket == old_bucket:
+        return
+    apply_bucket(db, old_bucket, -1)
+    apply_bucket(db, new_bucket, 1)
+
+
+def get_status_totals(db: Session, user_id: int) -> dict:
+    """Invoice count and total per status for a user"""
+    rows = db.query(
+        InvoiceSummary.status,
+        func.coalesce(func.sum(InvoiceSummary.invoice_count), 0),
+        func.coalesce(func.sum(InvoiceSummary.total), 0)
+    ).filter(
+        InvoiceSummary.user_id == user_id
+    ).group_by(InvoiceSummary.status).all()
+
+    totals = {
+        status: {"status": status, "count": 0, "total": Decimal("0.00")}
+        for status in InvoiceStatus
+    }
+    for status, count, total in rows:
+        totals[status] = {"status": status, "count": int(count), "total": Decimal(str(total))}
+    return totals
+
+
+def get_revenue_summary(db: Session, user_id: int, group_by: str = "month") -> List[dict]:
+    """Invoiced, paid, outstanding and overdue totals grouped by month, client or status"""
+    column = GROUP_BY_COLUMNS[group_by]
+    rows = db.query(
+        column,
+        InvoiceSummary.status,
+        func.sum(InvoiceSummary.total)
+    ).filter(
+        InvoiceSummary.user_id == user_id
+    ).group_by(column, InvoiceSummary.status).order_by(column).all()
+
+    groups = {}
+    for key, status, total in rows:
+        total = Decimal(str(total or 0))
+        group = groups.setdefault(key, {
+            "key": key.value if isinstance(key, InvoiceStatus) else str(key),
+            "invoiced": Decimal("0.00"),
+            "paid": Decimal("0.00"),
+            "outstanding": Decimal("0.00"),
+            "overdue": Decimal("0.00"),
+        })
+        if status in INVOICED_STATUSES:
+            group["invoiced"] += total
+        if status == InvoiceStatus.PAID:
+            group["paid"] += total
+        if status in OUTSTANDING_STATUSES:
+            group["outstanding"] += total
+        if status == InvoiceStatus.OVERDUE:
+            group["overdue"] += total
+    return list(groups.values())
+
+
+def compute_summaries(db: Session) -> dict:
+    """Full recompute of the summary buckets from the invoices table"""
+    buckets = {}
+    for user_id, client_id, status, issue_date, created_at, total in db.query(
+        Invoice.user_id, Invoice.client_id, Invoice.status, Invoice.issue_date, Invoice.created_at, Invoice.total
+    ).yield_per(1000):
+        key = (user_id, client_id, status, get_period(issue_date, created_at))
+        count, running = buckets.get(key, (0, Decimal("0.00")))
+        buckets[key] = (count + 1, running + Decimal(str(total or 0)))
+    return buckets
+
+
+def verify_summaries(db: Session) -> List[tuple]:
+    """Compare the summary table against a full recompute.
+
+    Returns a list of (bucket, expected, actual) mismatches.
+    """
+    expected = compute_summaries(db)
+    actual = {
+        (row.user_id, row.client_id, row.status, row.period): (row.invoice_count, Decimal(str(row.total)))
+        for row in db.query(InvoiceSummary).all()
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        if expected.get(key) != actual.get(key):
+            mismatches.append((key, expected.get(key), actual.get(key)))
+    return mismatches
+
+
+def rebuild_summaries(db: Session) -> int:
+    """Replace the summary table with a full recompute. Returns the row count."""
+    buckets = compute_summaries(db)
+    db.query(InvoiceSummary).delete(synchronize_session=False)
+    for (user_id, client_id, status, period), (count, total) in buckets.items():
+        db.add(InvoiceSummary(
+            user_id=user_id,
+            client_id=client_id,
+            status=status,
+            period=period,
+            invoice_count=count,
+            total=total
+        ))
+    db.commit()
+    return len(buckets)
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models.lead import Lead, LeadStatus
 from app.schemas.lead import LeadCreate
+from app.services import search_service
 from typing import List, Optional
 
 
@@ -14,6 +15,8 @@ def create_lead(db: Session, lead_data: LeadCreate, source: str = "Contact Form"
         status=LeadStatus.NEW
     )
     db.add(lead)
+    db.flush()
+    search_service.index_lead(db, lead)
     db.commit()
     db.refresh(lead)
     return lead
@@ -55,6 +58,7 @@ def delete_lead(db: Session, lead_id: int) -> bool:
     if not lead:
         return False
 
+    search_service.remove_document(db, "lead", lead.id)
     db.delete(lead)
     db.commit()
     return True
@@ -82,6 +86,8 @@ def convert_lead_to_client(db: Session, lead_id: int, user_id: int) -> Optional[
         user_id=user_id
     )
     db.add(client)
+    db.flush()
+    search_service.index_client(db, client)
 
     # Update lead status
     lead.status = LeadStatus.CONVERTED
@@ -0,0 +1,164 @@
+"""Deferred removal of stored media files.
+
+Releasing the last reference to a file only queues it in
+pending_media_deletions. drain_pending_deletions empties that queue in
+batches using each backend's bulk delete, and reconcile_storage catches
+anything the queue missed by comparing the storage folder with the
+media records.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import SessionLocal
+from app.models.media_asset import MediaAsset, PendingMediaDeletion
+from app.models.project import ProjectMedia
+from app.services import media_service, storage_service
+
+
+def drain_pending_deletions(db: Session, limit: int = 1000) -> int:
+    """Delete queued files in provider-sized batches. Returns the number removed.
+
+    Failed keys stay queued with their attempt count and error; rows past
+    MEDIA_DELETE_MAX_ATTEMPTS are left for inspection.
+    """
+    pending = db.query(PendingMediaDeletion).filter(
+        PendingMediaDeletion.attempts < settings.MEDIA_DELETE_MAX_ATTEMPTS
+    ).order_by(PendingMediaDeletion.id).limit(limit).all()
+
+    groups = defaultdict(list)
+    for item in pending:
+        groups[(item.backend, item.media_type)].append(item)
+
+    removed = 0
+    for (backend_name, media_type), items in groups.items():
+        backend = storage_service.get_storage(backend_name)
+
+        for start in range(0, len(items), backend.delete_batch_size):
+            ids = [item.id for item in items[start:start + backend.delete_batch_size]]
+            # Hold the batch's rows until its files are gone. Registering an
+            # asset cancels queued deletions of its key, so a re-upload waits
+            # here and stores its file after ours is deleted, not before
+            db.query(PendingMediaDeletion).filter(PendingMediaDeletion.id.in_(ids)).update(
+                {PendingMediaDeletion.attempts: PendingMediaDeletion.attempts}, synchronize_session=False
+            )
+            batch = db.query(PendingMediaDeletion).filter(
+                PendingMediaDeletion.id.in_(ids)
+            ).populate_existing().all()
+
+            # A key is live again if identical content was re-uploaded after
+            # it was queued; drop those entries without deleting
+            live = {
+                key for key, in db.query(MediaAsset.storage_key).filter(
+                    MediaAsset.backend == backend_name,
+                    MediaAsset.storage_key.in_({item.storage_key for item in batch})
+                )
+            }
+            keys = list(dict.fromkeys(item.storage_key for item in batch if item.storage_key not in live))
+            error = "Storage provider did not delete the file"
+            try:
+                failed = set(media_service.call_storage(backend.delete_many, keys, media_type)) if keys else set()
+            except Exception as e:
+                failed, error = set(keys), str(e)
+
+            for item in batch:
+                if item.storage_key in failed:
+                    item.attempts += 1
+                    item.last_error = error
+                else:
+                    if item.storage_key not in live:
+                        removed += 1
+                    db.delete(item)
+            db.commit()
+    return removed
+
+
+def _referenced_keys(db: Session, backend: storage_service.StorageBackend) -> set:
+    referenced = {
+        backend.identity(key) for key, in db.query(MediaAsset.storage_key).join(
+            ProjectMedia, ProjectMedia.asset_id == MediaAsset.id
+        ).filter(MediaAsset.backend == backend.name).distinct()
+    }
+    # Media uploaded before content addressing is only known by URL
+    for url, in db.query(ProjectMedia.url).filter(ProjectMedia.asset_id.is_(None)):
+        key = backend.key_from_url(url)
+        if key:
+            referenced.add(backend.identity(key))
+    return referenced
+
+
+def reconcile_storage(db: Session, backend_name: Optional[str] = None, dry_run: bool = False) -> List[str]:
+    """Queue stored files that no media record references. Returns their keys.
+
+    Files newer than MEDIA_RECONCILE_GRACE seconds are skipped so uploads
+    still waiting for their media record are not touched, and neither
+    are files whose asset is still referenced. Asset reference counts
+    below the number of media records using them are repaired as well.
+    """
+    backend = storage_service.get_storage(backend_name)
+    referenced = _referenced_keys(db, backend)
+    queued = {
+        backend.identity(key) for key, in db.query(PendingMediaDeletion.storage_key).filter(
+            PendingMediaDeletion.backend == backend.name
+        )
+    }
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.MEDIA_RECONCILE_GRACE)
+
+    orphans = []
+    for key, media_type, modified in media_service.call_storage(lambda: list(backend.list_keys())):
+        identity = backend.identity(key)
+        if identity in referenced or identity in queued or modified > cutoff:
+            continue
+        orphans.append((key, media_type))
+
+    if dry_run:
+        return [key for key, _ in orphans]
+
+    # An asset without media records may still be held by an upload that
+    # hasn't created its record yet; only reclaim those nobody holds
+    orphan_identities = {backend.identity(key) for key, _ in orphans}
+    held = set()
+    for asset in db.query(MediaAsset).filter(MediaAsset.backend == backend.name).with_for_update().all():
+        identity = backend.identity(asset.storage_key)
+        if identity not in orphan_identities:
+            continue
+        reclaimed = db.execute(
+            delete(MediaAsset).where(MediaAsset.id == asset.id, MediaAsset.ref_count <= 0)
+        ).rowcount
+        if not reclaimed:
+            held.add(identity)
+    orphans = [(key, media_type) for key, media_type in orphans if backend.identity(key) not in held]
+    for key, media_type in orphans:
+        media_service.schedule_deletion(db, backend.name, key, media_type)
+
+    # Repair counts that fell below the media records using them. Counts
+    # are never lowered here: the difference may be references uploads
+    # hold for media records they haven't created yet
+    media_count = select(func.count(ProjectMedia.id)).where(
+        ProjectMedia.asset_id == MediaAsset.id
+    ).scalar_subquery()
+    db.query(MediaAsset).filter(MediaAsset.ref_count < media_count).update(
+        {MediaAsset.ref_count: media_count}, synchronize_session=False
+    )
+    db.commit()
+    return [key for key, _ in orphans]
+
+
+def run_deletion_worker() -> int:
+    """One drain pass with its own session (for the background loop)"""
+    db = SessionLocal()
+    try:
+        return drain_pending_deletions(db)
+    finally:
+        db.close()
+
+
+def run_reconciliation() -> int:
+    """One reconciliation pass with its own session (for the background loop)"""
+    db = SessionLocal()
+    try:
+        return len(reconcile_storage(db))
+    finally:
+        db.close()
@@ -0,0 +1,159 @@
+"""Metadata extraction for uploaded media.
+
+Images are measured with Pillow, which reads only the header, and get a
+tiny blurred preview (LQIP) that templates show until the real image
+loads. MP4/QuickTime videos are measured by walking their box structure,
+so no video tooling is needed.
+"""
+import base64
+import io
+import logging
+import re
+import struct
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_SIZE = 16  # Longest side of the preview, in pixels
+PLACEHOLDER_MAX_PIXELS = 16_000_000  # Larger images (after JPEG draft scaling) get no preview
+MAX_BOX_SCAN = 64  # Top-level MP4 boxes inspected before giving up
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """MIME type from the file's leading bytes"""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video/webm"
+    if head[4:8] == b"ftyp":
+        return "video/quicktime" if head[8:12] == b"qt  " else "video/mp4"
+    if head[4:8] in (b"moov", b"mdat", b"wide", b"free"):
+        return "video/quicktime"
+    if b"<svg" in head.lower():
+        return "image/svg+xml"
+    return None
+
+
+def _image_metadata(stream: BinaryIO) -> dict:
+    from PIL import Image
+
+    with Image.open(stream) as image:
+        metadata = {"width": image.width, "height": image.height}
+        image.draft("RGB", (PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))  # JPEG: decode at reduced scale
+        if image.width * image.height > PLACEHOLDER_MAX_PIXELS:
+            return metadata  # Decoding it just for a preview would cost too much memory
+        # Shrink in the source mode first, so only the tiny preview is converted
+        image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="WEBP", quality=40)
+
+    metadata["placeholder"] = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+    return metadata
+
+
+def _svg_length(value: Optional[str]) -> Optional[int]:
+    match = re.match(r"\s*([\d.]+)\s*(px)?\s*$", value or "")
+    return round(float(match.group(1))) if match else None
+
+
+def _svg_metadata(stream: BinaryIO) -> dict:
+    head = stream.read(4096).decode("utf-8", errors="ignore")
+    tag = re.search(r"<svg\b[^>]*>", head, re.IGNORECASE | re.DOTALL)
+    if not tag:
+        return {}
+    attributes = dict(re.findall(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']', tag.group(0)))
+    width, height = _svg_length(attributes.get("width")), _svg_length(attributes.get("height"))
+    view_box = attributes.get("viewBox", "").replace(",", " ").split()
+    if (not width or not height) and len(view_box) == 4:
+        try:
+            width, height = round(float(view_box[2])), round(float(view_box[3]))
+        except ValueError:
+            pass
+    return {"width": width, "height": height}
+
+
+def _boxes(stream: BinaryIO, end: int):
+    """Yield (type, payload_start, payload_end) for the ISO-BMFF boxes up to end"""
+    position = stream.tell()
+    for _ in range(MAX_BOX_SCAN):
+        if position + 8 > end:
+            return
+        stream.seek(position)
+        header = stream.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        start = position + 8
+        if size == 1:
+            size = struct.unpack(">Q", stream.read(8))[0]
+            start += 8
+        elif size == 0:
+            size = end - position
+        if size < start - position:
+            return
+        yield box_type, start, position + size
+        position += size
+
+
+def _mp4_metadata(stream: BinaryIO, size: int) -> dict:
+    metadata = {}
+    stream.seek(0)
+    for box_type, start, end in _boxes(stream, size):
+        if box_type != b"moov":
+            continue
+        stream.seek(start)
+        for child, child_start, child_end in _boxes(stream, end):
+            stream.seek(child_start)
+            if child == b"mvhd":
+                version = stream.read(4)[0]
+                if version == 1:
+                    timescale, duration = struct.unpack(">16xIQ", stream.read(28))
+                else:
+                    timescale, duration = struct.unpack(">8xII", stream.read(16))
+                if timescale:
+                    metadata["duration"] = round(duration / timescale, 3)
+            elif child == b"trak" and "width" not in metadata:
+                for grandchild, tkhd_start, _ in _boxes(stream, child_end):
+                    if grandchild != b"tkhd":
+                        continue
+                    stream.seek(tkhd_start)
+                    version = stream.read(4)[0]
+                    stream.seek(tkhd_start + (88 if version == 1 else 76))
+                    width, height = struct.unpack(">II", stream.read(8))
+                    # 16.16 fixed point; audio tracks are 0x0
+                    if width and height:
+                        metadata["width"], metadata["height"] = width >> 16, height >> 16
+                    break
+            stream.seek(child_end)
+        break
+    return metadata
+
+
+def extract_metadata(stream: BinaryIO, media_type: str, size: int) -> dict:
+    """Dimensions, MIME type, byte size, duration and placeholder of a seekable file.
+
+    Unreadable or unsupported files yield whatever could be determined;
+    extraction never fails an upload.
+    """
+    stream.seek(0)
+    mime_type = sniff_mime_type(stream.read(512))
+    metadata = {"byte_size": size, "mime_type": mime_type}
+    try:
+        stream.seek(0)
+        if mime_type == "image/svg+xml":
+            metadata.update(_svg_metadata(stream))
+        elif media_type == "image":
+            metadata.update(_image_metadata(stream))
+        elif mime_type in ("video/mp4", "video/quicktime"):
+            metadata.update(_mp4_metadata(stream, size))
+    except Exception as e:
+        logger.warning(f"Could not read {mime_type or media_type} metadata: {str(e)}")
+    finally:
+        stream.seek(0)
+    return metadata
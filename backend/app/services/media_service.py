@@ -1,52 +1,335 @@
+import asyncio
+import hashlib
+import io
+import logging
 import os
-import uuid
-from pathlib import Path
-from typing import Optional
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import BinaryIO, Callable, List, Optional
 from fastapi import UploadFile
+from sqlalchemy import case, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-import cloudinary
-import cloudinary.uploader
+from starlette.concurrency import run_in_threadpool
+from app.db import SessionLocal
+from app.models.media_asset import MediaAsset, PendingMediaDeletion, METADATA_FIELDS
 from app.models.project import Project, ProjectMedia
 from app.schemas.project import ProjectMediaCreate
 from app.core.config import settings
+from app.services import storage_service, media_metadata_service
 
-# Configure Cloudinary from settings
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET
+logger = logging.getLogger(__name__)
+
+# Blocking storage SDK calls run here, never on the event loop. The SDK keeps
+# a pooled keep-alive HTTP connection manager shared by these threads.
+_storage_executor = ThreadPoolExecutor(
+    max_workers=settings.MEDIA_STORAGE_WORKERS,
+    thread_name_prefix="media-storage"
 )
 
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"}
 ALLOWED_VIDEO_EXTENSIONS = {".mp4", ".webm", ".mov"}
 ALLOWED_EXTENSIONS = ALLOWED_IMAGE_EXTENSIONS | ALLOWED_VIDEO_EXTENSIONS
+MIME_EXTENSIONS = {  # Storage key extension for each sniffed format
+    "image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp",
+    "image/svg+xml": ".svg", "video/mp4": ".mp4", "video/webm": ".webm", "video/quicktime": ".mov",
+}
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
 MAX_VIDEO_SIZE = 50 * 1024 * 1024  # 50MB
+SNIFF_SIZE = 512  # Bytes read to detect the file format
+HASH_CHUNK_SIZE = 1024 * 1024
+SLOT_RETRIES = 5  # Attempts to append media when concurrent uploads take the next slot
+SLOT_COLUMNS = ("project_id", "media_type", "display_order")  # Unique per media item
+REGISTER_RETRIES = 3  # Attempts to record a new asset while identical uploads race
+
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    """Detect media type ("image"/"video") from the file's leading bytes"""
+    if head.startswith((b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a")):
+        return "image"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis", b"heic", b"heix", b"mif1", b"msf1"):
+        return None  # HEIF/AVIF images share the ISO media container
+    if head[4:8] == b"ftyp" or head[4:8] in (b"moov", b"mdat", b"wide", b"free"):
+        return "video"  # MP4 / QuickTime
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video"  # WebM (EBML)
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith((b"<?xml", b"<svg", b"<!doctype svg")) and b"<svg" in head.lower():
+        return "image"
+    return None
+
+
+def get_max_size(media_type: str) -> int:
+    return MAX_VIDEO_SIZE if media_type == "video" else MAX_IMAGE_SIZE
+
+
+def stream_size(stream: BinaryIO) -> int:
+    """Size of a seekable stream without reading it"""
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+class SizeLimitedStream(io.RawIOBase):
+    """Read-through wrapper that fails once more than max_size bytes flow through"""
+
+    def __init__(self, stream: BinaryIO, max_size: int):
+        self._stream = stream
+        self._max_size = max_size
+        self._read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        position = self._stream.seek(offset, whence)
+        self._read = self._stream.tell()
+        return position
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self._read += len(chunk)
+        if self._read > self._max_size:
+            raise ValueError(f"File size exceeds maximum allowed size of {self._max_size / (1024 * 1024):.0f}MB")
+        return chunk
+
+    def readinto(self, buffer) -> int:
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def _with_retries(func: Callable, *args, **kwargs):
+    """Call a storage function, retrying transient failures with exponential backoff"""
+    attempts = max(1, settings.MEDIA_STORAGE_RETRIES)
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except ValueError:
+            raise
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            delay = settings.MEDIA_STORAGE_BACKOFF * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay / 2))
 
 
-async def validate_media(file: UploadFile) -> tuple[bool, str]:
-    """Validate media file - returns (is_valid, media_type)"""
-    # Check extension
-    ext = Path(file.filename).suffix.lower()
-    if ext not in ALLOWED_EXTENSIONS:
-        return False, ""
+def call_storage(func: Callable, *args, **kwargs):
+    """Blocking storage call from sync code, bounded by the storage executor"""
+    return _storage_executor.submit(_with_retries, func, *args, **kwargs).result()
+
+
+async def run_storage(func: Callable, *args, **kwargs):
+    """Await a blocking storage call without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_storage_executor, partial(_with_retries, func, *args, **kwargs))
+
+
+def hash_stream(stream: BinaryIO) -> tuple[str, int]:
+    """SHA-256 hex digest and size of a seekable stream, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return digest.hexdigest(), size
 
-    # Determine media type
-    if ext in ALLOWED_IMAGE_EXTENSIONS:
-        media_type = "image"
-        max_size = MAX_IMAGE_SIZE
-    elif ext in ALLOWED_VIDEO_EXTENSIONS:
-        media_type = "video"
-        max_size = MAX_VIDEO_SIZE
+
+def content_key(sha256: str, head: bytes) -> str:
+    """Storage key for content with the given hash and leading bytes.
+
+    The extension comes from the sniffed format, never the client's
+    filename, so a file is always served as the type it really is.
+    """
+    extension = MIME_EXTENSIONS.get(media_metadata_service.sniff_mime_type(head), "")
+    return f"portfolio/{sha256}{extension}"
+
+
+def schedule_deletion(db: Session, backend: str, key: str, media_type: str) -> None:
+    """Queue a stored file for removal (caller commits).
+
+    The file is deleted later, in batches, by media_cleanup_service, so
+    request handlers never wait on the storage provider.
+    """
+    db.add(PendingMediaDeletion(backend=backend, storage_key=key, media_type=media_type))
+
+
+def _deletion_queued(backend: str, key: str) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(PendingMediaDeletion.id).filter(
+            PendingMediaDeletion.backend == backend, PendingMediaDeletion.storage_key == key
+        ).first() is not None
+    finally:
+        db.close()
+
+
+def _take_asset_reference(sha256: str) -> Optional[str]:
+    """Take a reference to the stored asset with this hash and return its URL.
+
+    The reference is taken by the same statement that finds the asset, so
+    the asset can't be dropped in between. Returns None if there is none.
+    """
+    db = SessionLocal()
+    try:
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            url = db.execute(
+                update(MediaAsset).where(MediaAsset.sha256 == sha256).values(
+                    ref_count=MediaAsset.ref_count + 1
+                ).returning(MediaAsset.url)
+            ).scalar()
+        else:
+            # Generic fallback: lock the asset row, then bump it
+            asset = db.query(MediaAsset).filter(MediaAsset.sha256 == sha256).with_for_update().first()
+            url = asset.url if asset else None
+            if asset:
+                asset.ref_count += 1
+        db.commit()
+        return url
+    finally:
+        db.close()
+
+
+def _register_asset(sha256: str, backend: str, key: str, url: str, media_type: str, size: int, metadata: dict) -> str:
+    """Record a newly stored asset holding one reference; returns the URL of
+    whichever copy won a race.
+
+    Queued deletions of the key are cancelled in the same transaction.
+    That waits for a drain already deleting them (see
+    media_cleanup_service.drain_pending_deletions).
+    """
+    for _ in range(REGISTER_RETRIES):
+        db = SessionLocal()
+        try:
+            db.add(MediaAsset(
+                sha256=sha256, backend=backend, storage_key=key, url=url,
+                media_type=media_type, size=size, ref_count=1, **metadata
+            ))
+            db.query(PendingMediaDeletion).filter(
+                PendingMediaDeletion.backend == backend, PendingMediaDeletion.storage_key == key
+            ).delete(synchronize_session=False)
+            db.commit()
+            return url
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+        # A concurrent identical upload registered first (same key, same
+        # bytes); share its asset unless it was dropped again meanwhile
+        existing_url = _take_asset_reference(sha256)
+        if existing_url:
+            return existing_url
+    raise IOError(f"Could not register asset {sha256}")
+
+
+def get_asset(db: Session, url: str) -> Optional[MediaAsset]:
+    """The asset stored at url, if it was uploaded with content addressing"""
+    return db.query(MediaAsset).filter(MediaAsset.url == url).first()
+
+
+def apply_metadata(target, source) -> None:
+    """Copy width, height, MIME type, placeholder etc. from an asset (or dict)
+    onto media, an asset or a dict of column values"""
+    for field in METADATA_FIELDS:
+        value = source.get(field) if isinstance(source, dict) else getattr(source, field, None)
+        if isinstance(target, dict):
+            target[field] = value
+        else:
+            setattr(target, field, value)
+
+
+def release_asset(db: Session, asset_id: int, count: int = 1) -> None:
+    """Drop count references to an asset (caller commits).
+
+    When they were the last references the asset row is deleted and its
+    file queued for deletion in the same transaction.
+    """
+    db.query(MediaAsset).filter(MediaAsset.id == asset_id).update(
+        {MediaAsset.ref_count: MediaAsset.ref_count - count}, synchronize_session=False
+    )
+    asset = db.query(MediaAsset).filter(MediaAsset.id == asset_id, MediaAsset.ref_count <= 0).first()
+    if asset:
+        schedule_deletion(db, asset.backend, asset.storage_key, asset.media_type)
+        db.delete(asset)
+
+
+def _release_media(db: Session, media: ProjectMedia) -> None:
+    """Release a media row's file: its asset reference, or the legacy file itself"""
+    if media.asset_id:
+        release_asset(db, media.asset_id)
     else:
-        return False, ""
+        _release_legacy_file(db, media.url, media.media_type)
+
+
+def _release_legacy_file(db: Session, url: str, media_type: str) -> None:
+    """Queue deletion of a file uploaded before content addressing"""
+    located = storage_service.locate(url)
+    if located:
+        backend, key = located
+        schedule_deletion(db, backend.name, key, media_type)
 
-    # Check file size
-    contents = await file.read()
-    file_size = len(contents)
-    await file.seek(0)  # Reset file pointer for later reading
 
-    if file_size > max_size:
+def delete_media_file(url: str, media_type: str) -> bool:
+    """Give back the reference upload_media_stream took for url.
+
+    Used to clean up after an upload whose media record couldn't be
+    created. The file is queued for deletion only if no other media
+    shares it. Returns False if the deletion couldn't be queued.
+    """
+    db = SessionLocal()
+    try:
+        asset = get_asset(db, url)
+        if asset:
+            release_asset(db, asset.id)
+        else:
+            _release_legacy_file(db, url, media_type)
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to queue deletion of {url}: {str(e)}")
+        return False
+    finally:
+        db.close()
+
+
+async def sniff_upload(file: UploadFile) -> Optional[str]:
+    """Read only the first bytes of an upload to detect its media type"""
+    await file.seek(0)
+    head = await file.read(SNIFF_SIZE)
+    await file.seek(0)
+    return sniff_media_type(head)
+
+
+async def validate_media(file: UploadFile) -> tuple[bool, str]:
+    """Validate media file - returns (is_valid, media_type)
+
+    The type comes from the file's magic bytes, not its extension, and
+    the size from the spooled upload's length; the body is never read
+    into memory.
+    """
+    media_type = await sniff_upload(file)
+    if media_type is None:
+        return False, ""
+
+    if stream_size(file.file) > get_max_size(media_type):
         return False, ""
 
     return True, media_type
@@ -59,41 +342,65 @@ async def validate_image(file: UploadFile) -> bool:
 
 
 async def save_upload_file(file: UploadFile) -> str:
-    """Save uploaded file to Cloudinary and return URL"""
-    # Generate unique filename
-    ext = Path(file.filename).suffix.lower()
-    public_id = f"portfolio/{uuid.uuid4()}"
-
-    # Save file
-    contents = await file.read()
-
-    # Determine max size and resource type based on file type
-    if ext in ALLOWED_IMAGE_EXTENSIONS:
-        max_size = MAX_IMAGE_SIZE
-        resource_type = "image"
-    elif ext in ALLOWED_VIDEO_EXTENSIONS:
-        max_size = MAX_VIDEO_SIZE
-        resource_type = "video"
-    else:
+    """Store an uploaded file and return its URL"""
+    media_type = await sniff_upload(file)
+    if media_type is None:
         raise ValueError("Invalid file type")
 
-    # File size check
-    if len(contents) > max_size:
-        raise ValueError(f"File size exceeds maximum allowed size of {max_size / (1024 * 1024):.0f}MB")
+    return await upload_media_stream(file.file, media_type, file.filename)
 
-    try:
-        # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            contents,
-            public_id=public_id,
-            resource_type=resource_type,
-            folder="portfolio"
-        )
 
-        # Return the secure URL from Cloudinary
-        return upload_result["secure_url"]
+def _read_head(stream: BinaryIO) -> bytes:
+    stream.seek(0)
+    return stream.read(SNIFF_SIZE)
+
+
+async def upload_media_stream(source: BinaryIO, media_type: str, filename: Optional[str] = None) -> str:
+    """Store a seekable file object and return its URL.
+
+    Content is addressed by its SHA-256, so a file identical to an
+    existing asset is not stored again; the existing URL is returned.
+    Either way the URL comes with one reference to its asset, which the
+    media record created for it inherits. If no record is created, give
+    it back with delete_media_file().
+    """
+    stream = SizeLimitedStream(source, get_max_size(media_type))
+    sha256, size = await run_in_threadpool(hash_stream, stream)
+
+    existing_url = await run_in_threadpool(_take_asset_reference, sha256)
+    if existing_url:
+        return existing_url
+
+    storage = storage_service.get_storage()
+    key = content_key(sha256, await run_in_threadpool(_read_head, stream))
+    metadata = await run_in_threadpool(media_metadata_service.extract_metadata, stream, media_type, size)
+
+    def upload():
+        # Rewind so a retried attempt sends the whole file again
+        stream.seek(0)
+        return storage.save(stream, key, media_type, filename)
+
+    # Earlier content with this hash may still be queued for deletion
+    queued = await run_in_threadpool(_deletion_queued, storage.name, key)
+    try:
+        url = await run_storage(upload)
+    except ValueError:
+        raise
     except Exception as e:
-        raise IOError(f"Failed to upload file to Cloudinary: {str(e)}")
+        raise IOError(f"Failed to upload file to {storage.name} storage: {str(e)}")
+
+    if media_type == "video":
+        metadata["poster_url"] = storage.poster_url(url)
+    url = await run_in_threadpool(_register_asset, sha256, storage.name, key, url, media_type, size, metadata)
+    if queued:
+        # A drain may have deleted the file after it was stored; registering
+        # waited for it to finish, so storing it again now is final
+        try:
+            await run_storage(upload)
+        except Exception as e:
+            await run_in_threadpool(delete_media_file, url, media_type)
+            raise IOError(f"Failed to upload file to {storage.name} storage: {str(e)}")
+    return url
 
 
 def create_project_media(
@@ -109,58 +416,109 @@ def create_project_media(
     if not project:
         return None
 
-    # Get max display_order for this project
-    max_order = db.query(ProjectMedia).filter(
-        ProjectMedia.project_id == project_id
-    ).count()
-
+    # The upload already holds the asset reference this record takes over
+    asset = get_asset(db, url)
     media = ProjectMedia(
         project_id=project_id,
         media_type=media_type,
         url=url,
-        alt_text=alt_text or "",
-        display_order=max_order
+        asset_id=asset.id if asset else None,
+        alt_text=alt_text or ""
     )
-    db.add(media)
+    apply_metadata(media, asset or {})
+    _append_media(db, project_id, [media])
     db.commit()
     db.refresh(media)
     return media
 
 
+def get_next_display_order(db: Session, project_id: int) -> int:
+    """Display order after the project's last media item"""
+    max_order = db.query(func.max(ProjectMedia.display_order)).filter(
+        ProjectMedia.project_id == project_id
+    ).scalar()
+    return 0 if max_order is None else max_order + 1
+
+
+def _append_media(db: Session, project_id: int, media_items: List[ProjectMedia]) -> None:
+    """Insert media after the project's last item (caller commits).
+
+    The (project_id, media_type, display_order) constraint rejects a slot
+    a concurrent upload just took; recompute and retry in a savepoint.
+    """
+    for attempt in range(SLOT_RETRIES):
+        next_order = get_next_display_order(db, project_id)
+        for i, media in enumerate(media_items):
+            media.display_order = next_order + i
+        try:
+            with db.begin_nested():
+                db.add_all(media_items)
+            return
+        except IntegrityError:
+            if attempt == SLOT_RETRIES - 1:
+                raise
+
+
+def create_project_media_batch(
+    db: Session,
+    project_id: int,
+    uploads: List[tuple],
+    alt_text: Optional[str] = None
+) -> Optional[List[ProjectMedia]]:
+    """Create media records for (url, media_type) uploads in one transaction"""
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        return None
+
+    assets = [get_asset(db, url) for url, _ in uploads]
+    media_items = [
+        ProjectMedia(
+            project_id=project_id,
+            media_type=media_type,
+            url=url,
+            asset_id=asset.id if asset else None,
+            alt_text=alt_text or ""
+        )
+        for (url, media_type), asset in zip(uploads, assets)
+    ]
+    for media, asset in zip(media_items, assets):
+        apply_metadata(media, asset or {})
+    _append_media(db, project_id, media_items)
+    db.commit()
+    for media in media_items:
+        db.refresh(media)
+    return media_items
+
+
 def delete_project_media(db: Session, media_id: int) -> bool:
-    """Delete project media from Cloudinary and database"""
+    """Delete project media, and its stored file if no other media shares it"""
     media = db.query(ProjectMedia).filter(ProjectMedia.id == media_id).first()
     if not media:
         return False
 
-    # Delete file from Cloudinary
-    try:
-        # Extract public_id from Cloudinary URL
-        # URL format: https://res.cloudinary.com/cloud_name/image/upload/v123456/folder/public_id.ext
-        if "cloudinary.com" in media.url:
-            url_parts = media.url.split("/")
-            # Find the version number (starts with 'v')
-            version_index = next((i for i, part in enumerate(url_parts) if part.startswith('v') and part[1:].isdigit()), None)
-            if version_index:
-                # Everything after version is the public_id (including folder)
-                public_id_with_ext = "/".join(url_parts[version_index + 1:])
-                # Remove file extension
-                public_id = public_id_with_ext.rsplit(".", 1)[0]
-
-                # Determine resource type
-                resource_type = "video" if media.media_type == "video" else "image"
-
-                # Delete from Cloudinary
-                cloudinary.uploader.destroy(public_id, resource_type=resource_type)
-    except Exception as e:
-        # Log error but continue with database deletion
-        print(f"Warning: Failed to delete from Cloudinary: {str(e)}")
-
+    # The file is queued for deletion in the same transaction
+    _release_media(db, media)
     db.delete(media)
     db.commit()
     return True
 
 
+def release_project_media(db: Session, project: Project) -> None:
+    """Release every media file of a project about to be deleted (caller commits).
+
+    Reads only the columns it needs and releases each asset once; the
+    media rows themselves go with the project via ON DELETE CASCADE.
+    """
+    rows = db.query(ProjectMedia.asset_id, ProjectMedia.url, ProjectMedia.media_type).filter(
+        ProjectMedia.project_id == project.id
+    ).all()
+    for asset_id, count in Counter(asset_id for asset_id, _, _ in rows if asset_id).items():
+        release_asset(db, asset_id, count)
+    for asset_id, url, media_type in rows:
+        if not asset_id:
+            _release_legacy_file(db, url, media_type)
+
+
 def get_project_media(db: Session, project_id: int):
     """Get all media for a project"""
     return db.query(ProjectMedia).filter(
@@ -177,6 +535,34 @@ def get_media_by_type_and_order(db: Session, project_id: int, media_type: str, d
     ).first()
 
 
+def _upsert_slot(db: Session, values: dict) -> int:
+    """INSERT ... ON CONFLICT (project_id, media_type, display_order) DO UPDATE.
+
+    Returns the id of the inserted or updated row.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(ProjectMedia).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectMedia.project_id, ProjectMedia.media_type, ProjectMedia.display_order],
+            set_={column: stmt.excluded[column] for column in values if column not in SLOT_COLUMNS}
+        ).returning(ProjectMedia.id)
+        return db.execute(stmt).scalar_one()
+
+    # Generic fallback: lock the slot row, then update or insert it
+    media = db.query(ProjectMedia).filter(
+        *(getattr(ProjectMedia, column) == values[column] for column in SLOT_COLUMNS)
+    ).with_for_update().first()
+    if not media:
+        media = ProjectMedia()
+        db.add(media)
+    for column, value in values.items():
+        setattr(media, column, value)
+    db.flush()
+    return media.id
+
+
 def replace_or_create_media(
     db: Session,
     project_id: int,
@@ -185,45 +571,115 @@ def replace_or_create_media(
     display_order: int = 0,
     alt_text: Optional[str] = None
 ) -> Optional[ProjectMedia]:
-    """Replace existing media at display_order or create new one"""
+    """Replace existing media at display_order or create new one, as one upsert"""
     # Verify project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    if not db.query(Project.id).filter(Project.id == project_id).scalar():
         return None
 
-    # Check if media already exists at this position
-    existing_media = get_media_by_type_and_order(db, project_id, media_type, display_order)
+    # The media being replaced, locked until commit where the database supports it
+    previous = db.query(ProjectMedia.id, ProjectMedia.url, ProjectMedia.asset_id, ProjectMedia.media_type).filter(
+        ProjectMedia.project_id == project_id,
+        ProjectMedia.media_type == media_type,
+        ProjectMedia.display_order == display_order
+    ).with_for_update().first()
+
+    # The upload already holds a reference to the new asset, so releasing
+    # the old one never drops it when the same file is re-uploaded
+    asset = get_asset(db, url)
+    values = {
+        "project_id": project_id,
+        "media_type": media_type,
+        "display_order": display_order,
+        "url": url,
+        "asset_id": asset.id if asset else None,
+        "alt_text": alt_text or "",
+    }
+    apply_metadata(values, asset or {})
+    if previous and (previous.url != url or previous.asset_id):
+        _release_media(db, previous)
+
+    media_id = _upsert_slot(db, values)
+    db.commit()
+    media = db.get(ProjectMedia, media_id)
+    db.refresh(media)
+    return media
+
+
+def reorder_project_media(db: Session, project_id: int, media_ids: List[int]) -> Optional[List[ProjectMedia]]:
+    """Set display order from a list of every media id of the project.
+
+    Positions count per media type, matching the per-type slots. Returns
+    None if the ids are not exactly the project's media.
+    """
+    current = dict(db.query(ProjectMedia.id, ProjectMedia.media_type).filter(
+        ProjectMedia.project_id == project_id
+    ).all())
+    if len(media_ids) != len(set(media_ids)) or set(media_ids) != set(current):
+        return None
+
+    positions = {}
+    counters = {}
+    for media_id in media_ids:
+        media_type = current[media_id]
+        positions[media_id] = counters.get(media_type, 0)
+        counters[media_type] = positions[media_id] + 1
+
+    if positions:
+        project_media = db.query(ProjectMedia).filter(ProjectMedia.project_id == project_id)
+        # Two bulk statements: park every row on a negative order first so no
+        # intermediate state collides on the unique slot, then set the target
+        project_media.update(
+            {ProjectMedia.display_order: case(positions, value=ProjectMedia.id) * -1 - 1},
+            synchronize_session=False
+        )
+        project_media.update(
+            {ProjectMedia.display_order: ProjectMedia.display_order * -1 - 1},
+            synchronize_session=False
+        )
+        db.commit()
+    db.expire_all()
+    return get_project_media(db, project_id)
+
+
+def _read_stored_metadata(media: ProjectMedia) -> dict:
+    located = storage_service.locate(media.url)
+    if not located:
+        raise ValueError("File is not in a known storage location")
+    backend, key = located
+
+    with call_storage(backend.open, key, media.url) as stream:
+        metadata = media_metadata_service.extract_metadata(stream, media.media_type, stream_size(stream))
+    if media.media_type == "video":
+        metadata["poster_url"] = backend.poster_url(media.url)
+    return metadata
 
-    if existing_media:
-        # Delete old file from Cloudinary
+
+def backfill_media_metadata(db: Session, force: bool = False) -> tuple[int, int]:
+    """Extract metadata for media uploaded before it was recorded.
+
+    Reuses the asset's metadata where it has some, otherwise reads the
+    stored file. With force, every row is re-read. Returns (updated, failed).
+    """
+    query = db.query(ProjectMedia)
+    if not force:
+        query = query.filter(ProjectMedia.mime_type.is_(None))
+
+    updated = failed = 0
+    for media in query.order_by(ProjectMedia.id).all():
+        asset = media.asset
         try:
-            if "cloudinary.com" in existing_media.url:
-                url_parts = existing_media.url.split("/")
-                version_index = next((i for i, part in enumerate(url_parts) if part.startswith('v') and part[1:].isdigit()), None)
-                if version_index:
-                    public_id_with_ext = "/".join(url_parts[version_index + 1:])
-                    public_id = public_id_with_ext.rsplit(".", 1)[0]
-                    resource_type = "video" if existing_media.media_type == "video" else "image"
-                    cloudinary.uploader.destroy(public_id, resource_type=resource_type)
+            if asset and asset.mime_type and not force:
+                metadata = {field: getattr(asset, field) for field in METADATA_FIELDS}
+            else:
+                metadata = _read_stored_metadata(media)
         except Exception as e:
-            print(f"Warning: Failed to delete old file from Cloudinary: {str(e)}")
+            logger.warning(f"Could not read media {media.id} ({media.url}): {str(e)}")
+            failed += 1
+            continue
 
-        # Update existing record
-        existing_media.url = url
-        existing_media.alt_text = alt_text or ""
+        apply_metadata(media, metadata)
+        if asset:
+            apply_metadata(asset, metadata)
         db.commit()
-        db.refresh(existing_media)
-        return existing_media
-    else:
-        # Create new media record
-        media = ProjectMedia(
-            project_id=project_id,
-            media_type=media_type,
-            url=url,
-            alt_text=alt_text or "",
-            display_order=display_order
-        )
-        db.add(media)
-        db.commit()
-        db.refresh(media)
-        return media
+        updated += 1
+    return updated, failed
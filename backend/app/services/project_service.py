@@ -1,8 +1,23 @@
+import base64
 import re
-from sqlalchemy.orm import Session
-from app.models.project import Project, ProjectMedia
+from datetime import date
+from sqlalchemy import Date, func, insert, select, union_all, or_, and_
+from sqlalchemy.orm import Session, aliased, load_only, selectinload
+from app.core.cache import get_cache, invalidate_on_commit
+from app.models.project import Project, ProjectMedia, ProjectSlugHistory, ProjectTag, RelatedProject
+from app.models.project_metric import ProjectMetric
 from app.schemas.project import ProjectCreate, ProjectUpdate
-from typing import List, Optional
+from app.services import search_service, media_service
+from typing import Dict, List, Optional, Tuple
+
+# Cache namespaces. Any commit that changes projects or what the public
+# pages show of them invalidates these, in every worker.
+SLUG_REDIRECTS = "slug_redirects"  # Old slug -> current slug ("" while unpublished)
+PUBLIC_PAGES = "public_pages"  # Rendered public pages (app.routers.public)
+STALE_PAGES = "stale_pages"  # Their last good render, kept through invalidations
+
+invalidate_on_commit(SLUG_REDIRECTS, Project, ProjectSlugHistory)
+invalidate_on_commit(PUBLIC_PAGES, Project, ProjectMedia, ProjectMetric, ProjectTag, RelatedProject)
 
 
 def generate_slug(title: str) -> str:
@@ -13,21 +28,171 @@ def generate_slug(title: str) -> str:
     return slug
 
 
+def _slug_family(column, slug: str):
+    """Match slug and slug-<anything> as an index range scan (no LIKE)"""
+    return or_(column == slug, and_(column >= f"{slug}-", column < f"{slug}."))
+
+
 def ensure_unique_slug(db: Session, slug: str, project_id: Optional[int] = None) -> str:
-    """Ensure slug is unique by appending number if needed"""
-    original_slug = slug
-    counter = 1
+    """Ensure slug is unique by appending number if needed.
 
-    while True:
-        query = db.query(Project).filter(Project.slug == slug)
-        if project_id:
-            query = query.filter(Project.id != project_id)
+    Fetches every taken slug in the family (live slugs plus other
+    projects' old slugs) with one query and picks the first free suffix.
+    """
+    live = select(Project.slug).where(_slug_family(Project.slug, slug))
+    history = select(ProjectSlugHistory.slug).where(_slug_family(ProjectSlugHistory.slug, slug))
+    if project_id:
+        live = live.where(Project.id != project_id)
+        history = history.where(ProjectSlugHistory.project_id != project_id)
 
-        if not query.first():
-            return slug
+    taken = set(db.execute(union_all(live, history)).scalars())
+    if slug not in taken:
+        return slug
 
-        slug = f"{original_slug}-{counter}"
+    counter = 1
+    while f"{slug}-{counter}" in taken:
         counter += 1
+    return f"{slug}-{counter}"
+
+
+def warm_slug_redirects(db: Session) -> int:
+    """Cache every published project's old slug -> current slug. Returns the count."""
+    rows = db.query(ProjectSlugHistory.slug, Project.slug).join(
+        Project, Project.id == ProjectSlugHistory.project_id
+    ).filter(Project.is_published == True).all()
+    cache = get_cache()
+    for old_slug, slug in rows:
+        cache.set(SLUG_REDIRECTS, old_slug, slug)
+    return len(rows)
+
+
+def resolve_slug_redirect(db: Session, slug: str) -> Optional[str]:
+    """Current slug for a published project's old slug, or None.
+
+    Unpublished projects get no redirect, so their renames aren't exposed.
+    Only slugs in the history are cached; anyone can request others.
+    """
+    cache = get_cache()
+    redirect = cache.get(SLUG_REDIRECTS, slug)
+    if redirect is None:
+        row = db.query(Project.slug, Project.is_published).join(
+            ProjectSlugHistory, Project.id == ProjectSlugHistory.project_id
+        ).filter(ProjectSlugHistory.slug == slug).first()
+        if not row:
+            return None
+        redirect = row.slug if row.is_published else ""
+        cache.set(SLUG_REDIRECTS, slug, redirect)
+    return redirect or None
+
+
+def _record_slug_change(db: Session, project: Project, new_slug: str) -> None:
+    """Keep the old slug as a redirect; redirects resolve to the project's current slug"""
+    old_slug = project.slug
+    # Reclaiming one of the project's own old slugs
+    db.query(ProjectSlugHistory).filter(
+        ProjectSlugHistory.slug == new_slug
+    ).delete(synchronize_session=False)
+    db.add(ProjectSlugHistory(project_id=project.id, slug=old_slug))
+
+
+def normalize_tag(name: str) -> str:
+    """Lookup form of a tech_stack entry: trimmed, single-spaced, lowercase"""
+    return re.sub(r"\s+", " ", name or "").strip().lower()
+
+
+def _tech_stack_tags(project: Project) -> Dict[str, str]:
+    """Normalized tag -> display name for a project's tech_stack (first spelling wins)"""
+    tags = {}
+    for name in project.tech_stack or []:
+        tag = normalize_tag(name)
+        if tag:
+            tags.setdefault(tag, name.strip())
+    return tags
+
+
+def _related_pairs(project_id: Optional[int] = None):
+    """(project_id, related_id, score) for every pair of projects sharing a tag"""
+    mine, other = aliased(ProjectTag), aliased(ProjectTag)
+    query = select(mine.project_id, other.project_id, func.count()).join(
+        other, and_(other.tag == mine.tag, other.project_id != mine.project_id)
+    ).group_by(mine.project_id, other.project_id)
+    if project_id is not None:
+        query = query.where(mine.project_id == project_id)
+    return query
+
+
+def _refresh_related(db: Session, project_id: int) -> None:
+    """Recompute the related pairs involving one project.
+
+    A pair's score depends only on the two projects' tags, so when one
+    project's tags change no other pair needs recomputing.
+    """
+    db.query(RelatedProject).filter(or_(
+        RelatedProject.project_id == project_id,
+        RelatedProject.related_id == project_id
+    )).delete(synchronize_session=False)
+
+    rows = []
+    for _, related_id, score in db.execute(_related_pairs(project_id)):
+        rows.append({"project_id": project_id, "related_id": related_id, "score": score})
+        rows.append({"project_id": related_id, "related_id": project_id, "score": score})
+    if rows:
+        db.execute(insert(RelatedProject), rows)
+
+
+def sync_project_tags(db: Session, project: Project) -> bool:
+    """Bring project_tags in line with project.tech_stack.
+
+    Related projects are recomputed only when the set of tags changed.
+    Returns whether it did.
+    """
+    wanted = _tech_stack_tags(project)
+    current = {project_tag.tag: project_tag for project_tag in project.tags}
+    for tag, project_tag in current.items():
+        if tag in wanted:
+            project_tag.name = wanted[tag]
+    if current.keys() == wanted.keys():
+        return False
+
+    for tag in current.keys() - wanted.keys():
+        project.tags.remove(current[tag])
+    for tag in wanted.keys() - current.keys():
+        project.tags.append(ProjectTag(tag=tag, name=wanted[tag]))
+    db.flush()
+    _refresh_related(db, project.id)
+    return True
+
+
+def rebuild_project_tags(db: Session) -> int:
+    """Re-derive every project's tags and all related pairs. Returns the pair count."""
+    for project in db.query(Project).options(selectinload(Project.tags)):
+        wanted = _tech_stack_tags(project)
+        # Change only the tags here; the pairs are rebuilt in one statement below
+        if {project_tag.tag for project_tag in project.tags} != wanted.keys():
+            project.tags = [ProjectTag(tag=tag, name=name) for tag, name in wanted.items()]
+    db.flush()
+
+    db.query(RelatedProject).delete(synchronize_session=False)
+    db.execute(insert(RelatedProject).from_select(["project_id", "related_id", "score"], _related_pairs()))
+    db.commit()
+    return db.query(RelatedProject).count()
+
+
+def get_tag_name(db: Session, tag: str) -> Optional[str]:
+    """Display form of a tag, or None if no project uses it"""
+    return db.query(ProjectTag.name).filter(ProjectTag.tag == normalize_tag(tag)).limit(1).scalar()
+
+
+def get_related_projects(db: Session, project_id: int, limit: int = 3) -> List[Project]:
+    """Published projects sharing the most tags with a project"""
+    return db.query(Project).join(
+        RelatedProject, RelatedProject.related_id == Project.id
+    ).options(
+        load_only(*CARD_COLUMNS), selectinload(Project.media)
+    ).filter(
+        RelatedProject.project_id == project_id,
+        Project.is_published == True
+    ).order_by(RelatedProject.score.desc(), _sort_date().desc(), Project.id.desc()).limit(limit).all()
 
 
 def create_project(db: Session, project_data: ProjectCreate) -> Project:
@@ -40,6 +205,9 @@ def create_project(db: Session, project_data: ProjectCreate) -> Project:
         slug=slug
     )
     db.add(project)
+    db.flush()
+    sync_project_tags(db, project)
+    search_service.index_project(db, project)
     db.commit()
     db.refresh(project)
     return project
@@ -55,17 +223,101 @@ def get_project_by_slug(db: Session, slug: str) -> Optional[Project]:
     return db.query(Project).filter(Project.slug == slug).first()
 
 
+def _sort_date():
+    # Sort by date if available, otherwise use created_at
+    # COALESCE returns the first non-NULL value
+    return func.coalesce(Project.date, func.date(Project.created_at), type_=Date)
+
+
 def get_projects(db: Session, skip: int = 0, limit: int = 100, published_only: bool = False) -> List[Project]:
     """Get list of projects - sorted by date (or created_at if no date)"""
-    from sqlalchemy import func
     query = db.query(Project)
     if published_only:
         query = query.filter(Project.is_published == True)
-    # Sort by date if available, otherwise use created_at
-    # COALESCE returns the first non-NULL value
-    return query.order_by(
-        func.coalesce(Project.date, func.date(Project.created_at)).desc()
-    ).offset(skip).limit(limit).all()
+    return query.order_by(_sort_date().desc()).offset(skip).limit(limit).all()
+
+
+def get_featured_projects(db: Session) -> List[Project]:
+    """Published featured projects, newest first"""
+    return db.query(Project).options(selectinload(Project.media)).filter(
+        Project.is_published == True,
+        Project.is_featured == True
+    ).order_by(_sort_date().desc(), Project.id.desc()).all()
+
+
+# Columns a project card renders; long fields like case_study stay unloaded
+CARD_COLUMNS = (
+    Project.slug, Project.title, Project.short_description, Project.description,
+    Project.date, Project.created_at, Project.is_published, Project.is_featured
+)
+
+
+def encode_cursor(sort_date: date, project_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{sort_date.isoformat()}|{project_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        sort_date, project_id = raw.split("|")
+        return date.fromisoformat(sort_date), int(project_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _card_filters(tag: Optional[str]) -> list:
+    """Which projects a card grid lists: the home grid's non-featured
+    published projects, or every published project with a tag"""
+    filters = [Project.is_published == True]
+    if tag is None:
+        filters.append(Project.is_featured.isnot(True))
+    else:
+        filters.append(Project.id.in_(
+            select(ProjectTag.project_id).where(ProjectTag.tag == normalize_tag(tag))
+        ))
+    return filters
+
+
+def get_project_cards(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 9,
+    tag: Optional[str] = None
+) -> Tuple[List[Project], Optional[str]]:
+    """A page of published projects for a card grid: the home grid's
+    non-featured projects, or every project with a tag.
+
+    Keyset-paginated on (date, id), newest first: pass the returned cursor
+    to get the next page; it is None on the last page.
+    """
+    sort_date = _sort_date()
+    query = db.query(Project, sort_date).options(
+        load_only(*CARD_COLUMNS), selectinload(Project.media)
+    ).filter(*_card_filters(tag))
+    if cursor:
+        after_date, after_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            sort_date < after_date,
+            and_(sort_date == after_date, Project.id < after_id)
+        ))
+
+    rows = query.order_by(sort_date.desc(), Project.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last_project, last_date = rows[limit - 1]
+        next_cursor = encode_cursor(last_date, last_project.id)
+    return [project for project, _ in rows[:limit]], next_cursor
+
+
+def is_card_cursor(db: Session, cursor: str, tag: Optional[str] = None) -> bool:
+    """Whether get_project_cards could currently return cursor: it names a
+    project in the grid at that project's sort date. Raises ValueError for
+    a malformed cursor."""
+    after_date, after_id = decode_cursor(cursor)
+    return db.query(Project.id).filter(
+        Project.id == after_id, _sort_date() == after_date, *_card_filters(tag)
+    ).first() is not None
 
 
 def update_project(db: Session, project_id: int, project_data: ProjectUpdate) -> Optional[Project]:
@@ -76,15 +328,20 @@ def update_project(db: Session, project_id: int, project_data: ProjectUpdate) ->
 
     update_data = project_data.model_dump(exclude_unset=True)
 
-    # Regenerate slug if title changed
-    if "title" in update_data:
+    # Regenerate slug only if the title change alters it; keep the old one as a redirect
+    if "title" in update_data and generate_slug(update_data["title"]) != generate_slug(project.title):
         new_slug = generate_slug(update_data["title"])
         new_slug = ensure_unique_slug(db, new_slug, project_id)
-        update_data["slug"] = new_slug
+        if new_slug != project.slug:
+            _record_slug_change(db, project, new_slug)
+            update_data["slug"] = new_slug
 
     for field, value in update_data.items():
         setattr(project, field, value)
 
+    if "tech_stack" in update_data:
+        sync_project_tags(db, project)
+    search_service.index_project(db, project)
     db.commit()
     db.refresh(project)
     return project
@@ -96,6 +353,8 @@ def delete_project(db: Session, project_id: int) -> bool:
     if not project:
         return False
 
+    search_service.remove_document(db, "project", project.id)
+    media_service.release_project_media(db, project)
     db.delete(project)
     db.commit()
     return True
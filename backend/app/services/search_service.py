@@ -0,0 +1,267 @@
+import re
+from sqlalchemy import text, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.client import Client
+from app.models.lead import Lead
+from app.models.project import Project
+from app.models.search_document import SearchDocument
+from typing import List, Optional
+
+ENTITY_TYPES = ("client", "lead", "project")
+MIN_TRIGRAM_LENGTH = 3
+
+SQLITE_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_trigram USING fts5("
+    "title, body, content='search_documents', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); "
+    "INSERT INTO search_documents_trigram(rowid, title, body) VALUES (new.id, new.title, new.body); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_trigram(search_documents_trigram, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_trigram(search_documents_trigram, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); "
+    "INSERT INTO search_documents_trigram(rowid, title, body) VALUES (new.id, new.title, new.body); "
+    "END",
+]
+
+POSTGRES_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_vector ON search_documents USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_trgm ON search_documents "
+    "USING GIN ((title || ' ' || body) gin_trgm_ops)",
+]
+
+
+def create_search_index(engine: Engine) -> None:
+    """Create the dialect-specific full-text index on search_documents"""
+    ddl = {"sqlite": SQLITE_INDEX_DDL, "postgresql": POSTGRES_INDEX_DDL}.get(engine.dialect.name, [])
+    with engine.begin() as conn:
+        for statement in ddl:
+            conn.execute(text(statement))
+
+
+def _join(*parts) -> str:
+    return " ".join(str(part) for part in parts if part)
+
+
+def index_document(
+    db: Session,
+    entity_type: str,
+    entity_id: int,
+    title: str,
+    body: str,
+    user_id: Optional[int] = None
+) -> None:
+    """Insert or update the search document for an entity (caller commits)"""
+    document = db.query(SearchDocument).filter(
+        SearchDocument.entity_type == entity_type,
+        SearchDocument.entity_id == entity_id
+    ).first()
+    if not document:
+        document = SearchDocument(entity_type=entity_type, entity_id=entity_id)
+        db.add(document)
+
+    document.user_id = user_id
+    document.title = title or ""
+    document.body = body or ""
+
+
+def remove_document(db: Session, entity_type: str, entity_id: int) -> None:
+    """Remove the search document for an entity (caller commits)"""
+    db.query(SearchDocument).filter(
+        SearchDocument.entity_type == entity_type,
+        SearchDocument.entity_id == entity_id
+    ).delete(synchronize_session=False)
+
+
+def index_client(db: Session, client: Client) -> None:
+    index_document(
+        db, "client", client.id,
+        title=_join(client.contact_name, client.company_name),
+        body=_join(client.contact_email, client.notes),
+        user_id=client.user_id
+    )
+
+
+def index_lead(db: Session, lead: Lead) -> None:
+    index_document(
+        db, "lead", lead.id,
+        title=lead.name,
+        body=_join(lead.email, lead.message)
+    )
+
+
+def index_project(db: Session, project: Project) -> None:
+    index_document(
+        db, "project", project.id,
+        title=project.title,
+        body=_join(project.description, *(project.tech_stack or []))
+    )
+
+
+def rebuild_index(db: Session) -> int:
+    """Re-index every client, lead and project. Returns the document count."""
+    db.query(SearchDocument).delete(synchronize_session=False)
+    count = 0
+    for model, indexer in ((Client, index_client), (Lead, index_lead), (Project, index_project)):
+        for entity in db.query(model).yield_per(500):
+            indexer(db, entity)
+            count += 1
+    db.commit()
+    return count
+
+
+def _tokens(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _scope_sql(user_id: int, entity_types: Optional[List[str]], params: dict) -> str:
+    clauses = ["(d.user_id IS NULL OR d.user_id = :user_id)"]
+    params["user_id"] = user_id
+    if entity_types:
+        names = []
+        for i, entity_type in enumerate(entity_types):
+            params[f"type_{i}"] = entity_type
+            names.append(f":type_{i}")
+        clauses.append(f"d.entity_type IN ({', '.join(names)})")
+    return " AND ".join(clauses)
+
+
+def _run(db: Session, from_sql: str, rank_sql: str, order: str, params: dict, skip: int, limit: int) -> tuple:
+    total = db.execute(text(f"SELECT COUNT(*) {from_sql}"), params).scalar()
+    rows = db.execute(text(
+        f"SELECT d.entity_type, d.entity_id, d.title, {rank_sql} AS score {from_sql} "
+        f"ORDER BY score {order} LIMIT :limit OFFSET :skip"
+    ), {**params, "limit": limit, "skip": skip}).all()
+    return total, rows
+
+
+def _sqlite_has_index(db: Session) -> bool:
+    return db.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE name = 'search_documents_trigram'"
+    )).first() is not None
+
+
+def _search_sqlite(db: Session, query: str, scope: str, params: dict, skip: int, limit: int) -> Optional[tuple]:
+    tokens = _tokens(query)
+    if tokens:
+        match = " ".join('"' + token + '"*' for token in tokens)
+        total, rows = _run(
+            db,
+            "FROM search_documents_fts JOIN search_documents d ON d.id = search_documents_fts.rowid "
+            f"WHERE search_documents_fts MATCH :match AND {scope}",
+            "bm25(search_documents_fts, 10.0, 1.0)", "ASC",
+            {**params, "match": match}, skip, limit
+        )
+        if total:
+            return "fulltext", total, rows
+
+    if len(query) >= MIN_TRIGRAM_LENGTH:
+        match = '"' + query.replace('"', '""') + '"'
+        total, rows = _run(
+            db,
+            "FROM search_documents_trigram JOIN search_documents d ON d.id = search_documents_trigram.rowid "
+            f"WHERE search_documents_trigram MATCH :match AND {scope}",
+            "bm25(search_documents_trigram, 10.0, 1.0)", "ASC",
+            {**params, "match": match}, skip, limit
+        )
+        return "trigram", total, rows
+    return None
+
+
+def _search_postgres(db: Session, query: str, scope: str, params: dict, skip: int, limit: int) -> Optional[tuple]:
+    tokens = _tokens(query)
+    if tokens:
+        total, rows = _run(
+            db,
+            "FROM search_documents d, to_tsquery('english', :tsquery) q "
+            f"WHERE d.search_vector @@ q AND {scope}",
+            "ts_rank_cd(d.search_vector, q)", "DESC",
+            {**params, "tsquery": " & ".join(token + ":*" for token in tokens)}, skip, limit
+        )
+        if total:
+            return "fulltext", total, rows
+
+    if len(query) >= MIN_TRIGRAM_LENGTH:
+        total, rows = _run(
+            db,
+            f"FROM search_documents d WHERE :raw <% (d.title || ' ' || d.body) AND {scope}",
+            "word_similarity(:raw, d.title || ' ' || d.body)", "DESC",
+            {**params, "raw": query}, skip, limit
+        )
+        return "trigram", total, rows
+    return None
+
+
+def _search_like(db: Session, query: str, user_id: int, entity_types: Optional[List[str]], skip: int, limit: int) -> tuple:
+    pattern = f"%{query}%"
+    documents = db.query(SearchDocument).filter(
+        or_(SearchDocument.user_id.is_(None), SearchDocument.user_id == user_id),
+        or_(SearchDocument.title.ilike(pattern), SearchDocument.body.ilike(pattern))
+    )
+    if entity_types:
+        documents = documents.filter(SearchDocument.entity_type.in_(entity_types))
+    total = documents.count()
+    rows = [
+        (document.entity_type, document.entity_id, document.title, 0.0)
+        for document in documents.order_by(SearchDocument.id.desc()).offset(skip).limit(limit)
+    ]
+    return "like", total, rows
+
+
+def search(
+    db: Session,
+    query: str,
+    user_id: int,
+    entity_types: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> dict:
+    """Ranked, paginated search across clients, leads and projects.
+
+    Tries the full-text index first and falls back to trigram
+    (substring/typo tolerant) matching when it finds nothing.
+    """
+    query = query.strip()
+    if not query:
+        # Whitespace only: would match everything as an empty pattern
+        return {"mode": "like", "total": 0, "results": []}
+    params = {}
+    scope = _scope_sql(user_id, entity_types, params)
+    dialect = db.get_bind().dialect.name
+
+    result = None
+    if dialect == "sqlite" and _sqlite_has_index(db):
+        result = _search_sqlite(db, query, scope, params, skip, limit)
+    elif dialect == "postgresql":
+        result = _search_postgres(db, query, scope, params, skip, limit)
+    if result is None:
+        result = _search_like(db, query, user_id, entity_types, skip, limit)
+
+    mode, total, rows = result
+    return {
+        "mode": mode,
+        "total": total,
+        "results": [
+            {"entity_type": entity_type, "entity_id": entity_id, "title": title, "rank": float(rank or 0)}
+            for entity_type, entity_id, title, rank in rows
+        ],
+    }
+
+
+def search_ids(db: Session, query: str, user_id: int, entity_type: str, skip: int = 0, limit: int = 100) -> List[int]:
+    """Ranked entity ids of one type matching a query"""
+    results = search(db, query, user_id, [entity_type], skip=skip, limit=limit)["results"]
+    return [result["entity_id"] for result in results]
@@ -0,0 +1,47 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.project import Project
+from app.models.lead import Lead, LeadStatus
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceStatus
+from app.services import invoice_summary_service
+
+RECENT_LIMIT = 5
+
+
+def get_dashboard_stats(db: Session, user_id: int) -> dict:
+    """Get dashboard counts, invoice totals and recent items"""
+    # All scalar counts in a single SELECT
+    counts = db.execute(select(
+        select(func.count(Project.id)).scalar_subquery().label("total_projects"),
+        select(func.count(Lead.id)).where(
+            Lead.status == LeadStatus.NEW
+        ).scalar_subquery().label("new_leads"),
+        select(func.count(Client.id)).where(
+            Client.user_id == user_id
+        ).scalar_subquery().label("total_clients"),
+    )).one()
+
+    invoice_totals = invoice_summary_service.get_status_totals(db, user_id)
+    sent = invoice_totals[InvoiceStatus.SENT]
+    overdue = invoice_totals[InvoiceStatus.OVERDUE]
+
+    recent_leads = db.query(Lead).order_by(
+        Lead.created_at.desc()
+    ).limit(RECENT_LIMIT).all()
+
+    recent_invoices = db.query(Invoice).filter(
+        Invoice.user_id == user_id
+    ).order_by(Invoice.created_at.desc()).limit(RECENT_LIMIT).all()
+
+    return {
+        "total_projects": counts.total_projects,
+        "new_leads": counts.new_leads,
+        "total_clients": counts.total_clients,
+        "pending_invoices": sent["count"],
+        "outstanding_total": sent["total"] + overdue["total"],
+        "overdue_total": overdue["total"],
+        "invoice_totals": list(invoice_totals.values()),
+        "recent_leads": recent_leads,
+        "recent_invoices": recent_invoices,
+    }
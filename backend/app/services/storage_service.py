@@ -0,0 +1,335 @@
+"""Media storage backends.
+
+Each backend stores a file under a key and returns its public URL. The
+active backend is chosen by MEDIA_STORAGE_BACKEND; calls are blocking and
+are run through media_service's storage executor.
+"""
+import mimetypes
+import os
+import shutil
+import tempfile
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from functools import wraps
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from app.core import metrics
+from app.core.config import settings
+
+COPY_BUFFER_SIZE = 1024 * 1024
+SPOOL_MEMORY_SIZE = 8 * 1024 * 1024  # Downloads larger than this spill to disk
+DOWNLOAD_TIMEOUT = 60
+MEDIA_PREFIX = "portfolio/"  # Every upload's key starts with this
+TIMED_OPERATIONS = ("save", "delete", "delete_many", "open")
+
+
+def _timed(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with metrics.outbound_call(self.name, method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class StorageBackend:
+    """Interface implemented by every storage backend"""
+    name = ""
+    delete_batch_size = 100  # Max keys per delete_many call
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every backend's calls show up in outbound_request_seconds
+        for operation in TIMED_OPERATIONS:
+            if operation in cls.__dict__:
+                setattr(cls, operation, _timed(cls.__dict__[operation]))
+
+    def save(self, stream: BinaryIO, key: str, media_type: str, filename: Optional[str] = None) -> str:
+        """Store the stream under key and return its public URL"""
+        raise NotImplementedError
+
+    def delete(self, key: str, media_type: str) -> None:
+        """Remove the file stored under key; missing files are not an error"""
+        raise NotImplementedError
+
+    def delete_many(self, keys: List[str], media_type: str) -> List[str]:
+        """Remove up to delete_batch_size files; returns the keys that failed"""
+        failed = []
+        for key in keys:
+            try:
+                self.delete(key, media_type)
+            except Exception:
+                failed.append(key)
+        return failed
+
+    def list_keys(self, prefix: str = MEDIA_PREFIX) -> Iterator[tuple]:
+        """Yield (key, media_type, last_modified) for every stored file under prefix"""
+        raise NotImplementedError
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Storage key for a URL this backend produced, or None"""
+        raise NotImplementedError
+
+    def identity(self, key: str) -> str:
+        """Form of a key used to tell whether two keys name the same stored file"""
+        return key
+
+    def poster_url(self, url: str) -> Optional[str]:
+        """URL of a still frame for a stored video, if the backend can render one"""
+        return None
+
+    def open(self, key: str, url: str) -> BinaryIO:
+        """Seekable local copy of a stored file (caller closes); downloads its URL by default"""
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_SIZE)
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            shutil.copyfileobj(response, spool, COPY_BUFFER_SIZE)
+        spool.seek(0)
+        return spool
+
+
+class LocalStorage(StorageBackend):
+    """Files on the local filesystem, served from /static"""
+    name = "local"
+
+    def __init__(self, root: str = None, base_url: str = None):
+        self.root = Path(root or settings.MEDIA_LOCAL_DIR)
+        self.base_url = (base_url or settings.MEDIA_LOCAL_URL).rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def save(self, stream: BinaryIO, key: str, media_type: str, filename: Optional[str] = None) -> str:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file in the same directory, then rename into place
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                shutil.copyfileobj(stream, target, COPY_BUFFER_SIZE)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return f"{self.base_url}/{key}"
+
+    def delete(self, key: str, media_type: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def open(self, key: str, url: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def list_keys(self, prefix: str = MEDIA_PREFIX) -> Iterator[tuple]:
+        directory = self.root / prefix
+        if not directory.is_dir():
+            return
+        for path in directory.rglob("*"):
+            if path.is_file() and not path.name.startswith(".upload-"):
+                key = path.relative_to(self.root).as_posix()
+                media_type = "video" if path.suffix.lower() in (".mp4", ".webm", ".mov") else "image"
+                yield key, media_type, datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+class CloudinaryStorage(StorageBackend):
+    """Cloudinary; the key (minus extension) is the asset's public_id"""
+    name = "cloudinary"
+    upload_chunk_size = 6 * 1024 * 1024  # Chunked upload part size (min 5MB)
+
+    def __init__(self):
+        import cloudinary
+        import cloudinary.api
+        import cloudinary.uploader
+
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET
+        )
+        self.uploader = cloudinary.uploader
+        self.api = cloudinary.api
+
+    @staticmethod
+    def _public_id(key: str) -> str:
+        return key.rsplit(".", 1)[0]
+
+    def identity(self, key: str) -> str:
+        # Cloudinary addresses files by public_id; the extension is just a format
+        return self._public_id(key)
+
+    def poster_url(self, url: str) -> Optional[str]:
+        # First frame as JPEG, rendered on demand by a delivery transformation
+        if "/video/upload/" not in url:
+            return None
+        poster = url.replace("/video/upload/", "/video/upload/so_0/", 1)
+        return poster.rsplit(".", 1)[0] + ".jpg"
+
+    def save(self, stream: BinaryIO, key: str, media_type: str, filename: Optional[str] = None) -> str:
+        # upload_large reads and sends upload_chunk_size bytes at a time
+        result = self.uploader.upload_large(
+            stream,
+            public_id=self._public_id(key),
+            resource_type=media_type,
+            chunk_size=self.upload_chunk_size,
+            filename=filename or "upload"
+        )
+        return result["secure_url"]
+
+    def delete(self, key: str, media_type: str) -> None:
+        resource_type = "video" if media_type == "video" else "image"
+        self.uploader.destroy(self._public_id(key), resource_type=resource_type)
+
+    def delete_many(self, keys: List[str], media_type: str) -> List[str]:
+        # Admin API bulk delete: up to 100 public_ids per call
+        resource_type = "video" if media_type == "video" else "image"
+        public_ids = {self._public_id(key): key for key in keys}
+        result = self.api.delete_resources(list(public_ids), resource_type=resource_type)
+        return [
+            public_ids[public_id] for public_id, status in result.get("deleted", {}).items()
+            if status not in ("deleted", "not_found") and public_id in public_ids
+        ]
+
+    def list_keys(self, prefix: str = MEDIA_PREFIX) -> Iterator[tuple]:
+        for resource_type in ("image", "video"):
+            cursor = None
+            while True:
+                page = self.api.resources(
+                    type="upload", resource_type=resource_type, prefix=prefix,
+                    max_results=500, next_cursor=cursor
+                )
+                for resource in page.get("resources", []):
+                    key = resource["public_id"]
+                    if resource.get("format"):
+                        key = f"{key}.{resource['format']}"
+                    created_at = datetime.fromisoformat(resource["created_at"].replace("Z", "+00:00"))
+                    yield key, resource_type, created_at
+                cursor = page.get("next_cursor")
+                if not cursor:
+                    break
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Key from a Cloudinary URL
+
+        URL format: https://res.cloudinary.com/cloud_name/image/upload/v123456/folder/public_id.ext
+        """
+        if "cloudinary.com" not in url:
+            return None
+        url_parts = url.split("/")
+        # Find the version number (starts with 'v'); everything after it is the key
+        version_index = next((i for i, part in enumerate(url_parts) if part.startswith('v') and part[1:].isdigit()), None)
+        if not version_index:
+            return None
+        return "/".join(url_parts[version_index + 1:])
+
+
+class S3Storage(StorageBackend):
+    """Amazon S3 or any S3-compatible service (R2, MinIO, Spaces, ...)"""
+    name = "s3"
+    delete_batch_size = 1000  # DeleteObjects limit
+
+    def __init__(self):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("MEDIA_STORAGE_BACKEND=s3 requires the boto3 package")
+
+        self.bucket = settings.S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None
+        )
+        base_url = settings.S3_PUBLIC_URL
+        if not base_url:
+            endpoint = settings.S3_ENDPOINT_URL or f"https://s3.{settings.S3_REGION or 'us-east-1'}.amazonaws.com"
+            base_url = f"{endpoint.rstrip('/')}/{self.bucket}"
+        self.base_url = base_url.rstrip("/")
+
+    def save(self, stream: BinaryIO, key: str, media_type: str, filename: Optional[str] = None) -> str:
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        # upload_fileobj switches to a multipart upload for large files
+        self.client.upload_fileobj(
+            stream, self.bucket, key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": "public, max-age=31536000, immutable"}
+        )
+        return f"{self.base_url}/{key}"
+
+    def delete(self, key: str, media_type: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def open(self, key: str, url: str) -> BinaryIO:
+        # Read through the API so private buckets work too
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_SIZE)
+        self.client.download_fileobj(self.bucket, key, spool)
+        spool.seek(0)
+        return spool
+
+    def delete_many(self, keys: List[str], media_type: str) -> List[str]:
+        result = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+        )
+        return [error["Key"] for error in result.get("Errors", [])]
+
+    def list_keys(self, prefix: str = MEDIA_PREFIX) -> Iterator[tuple]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                content_type = mimetypes.guess_type(item["Key"])[0] or ""
+                media_type = "video" if content_type.startswith("video/") else "image"
+                yield item["Key"], media_type, item["LastModified"]
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+BACKENDS = {
+    LocalStorage.name: LocalStorage,
+    CloudinaryStorage.name: CloudinaryStorage,
+    S3Storage.name: S3Storage,
+}
+
+_instances: Dict[str, StorageBackend] = {}
+
+
+def get_backend_name() -> str:
+    """Configured backend, defaulting to Cloudinary when it has credentials"""
+    name = settings.MEDIA_STORAGE_BACKEND.lower()
+    if not name:
+        name = "cloudinary" if settings.CLOUDINARY_CLOUD_NAME else "local"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown MEDIA_STORAGE_BACKEND: {name}")
+    return name
+
+
+def get_storage(name: Optional[str] = None) -> StorageBackend:
+    """Backend instance by name (the configured one by default), created on first use"""
+    name = name or get_backend_name()
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def _candidate_backends() -> List[StorageBackend]:
+    candidates = [get_storage()]
+    # Media uploaded before storage was configurable lives on Cloudinary
+    for name in (CloudinaryStorage.name, LocalStorage.name):
+        if name != candidates[0].name:
+            candidates.append(get_storage(name))
+    return candidates
+
+
+def locate(url: str) -> Optional[tuple]:
+    """(backend, key) for a stored file's URL, or None if no backend owns it"""
+    for backend in _candidate_backends():
+        key = backend.key_from_url(url)
+        if key:
+            return backend, key
+    return None
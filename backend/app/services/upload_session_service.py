@@ -0,0 +1,294 @@
+"""Resumable chunked uploads (init / append / complete).
+
+Chunks are spooled to a local file next to a small JSON state file, so a
+session survives client disconnects and worker restarts and is visible to
+every worker on the host. Completion hands the assembled file to the
+storage backend in the background.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db import SessionLocal
+from app.services import media_service
+
+SESSION_DIR = Path(settings.UPLOAD_SESSION_DIR or Path(tempfile.gettempdir()) / "cm-dev-uploads")
+MAX_UPLOAD_SIZE = max(media_service.MAX_IMAGE_SIZE, media_service.MAX_VIDEO_SIZE)
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+WRITE_BUFFER_SIZE = 1024 * 1024  # Bytes of a chunk gathered before each write to the spool file
+
+# Uploads this worker is appending to; other workers are kept out by a lock on the spool file
+_appending: set = set()
+
+
+class UploadBusyError(ValueError):
+    """Another request is appending to the same upload"""
+
+    def __init__(self):
+        super().__init__("Another chunk of this upload is being written")
+
+
+class OffsetMismatchError(ValueError):
+    """Chunk offset doesn't match the bytes already received"""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Upload offset must be {expected}")
+        self.expected = expected
+
+
+def _state_path(upload_id: str) -> Path:
+    return SESSION_DIR / f"{upload_id}.json"
+
+
+def _data_path(upload_id: str) -> Path:
+    return SESSION_DIR / f"{upload_id}.part"
+
+
+def _save(session: dict) -> dict:
+    """Atomically write session state"""
+    session["updated_at"] = time.time()
+    path = _state_path(session["upload_id"])
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(session))
+    os.replace(tmp_path, path)
+    return session
+
+
+def with_expiry(session: dict) -> dict:
+    return {**session, "chunk_size": settings.UPLOAD_CHUNK_SIZE, "expires_at": session["updated_at"] + settings.UPLOAD_SESSION_TTL}
+
+
+def create_session(
+    project_id: int,
+    filename: str,
+    size: int,
+    alt_text: str = "",
+    display_order: Optional[int] = None
+) -> dict:
+    """Start an upload session for a file of known size"""
+    if size <= 0 or size > MAX_UPLOAD_SIZE:
+        raise ValueError(f"File size must be between 1 byte and {MAX_UPLOAD_SIZE / (1024 * 1024):.0f}MB")
+
+    SESSION_DIR.mkdir(parents=True, exist_ok=True)
+    upload_id = uuid.uuid4().hex
+    _data_path(upload_id).touch()
+    return _save({
+        "upload_id": upload_id,
+        "project_id": project_id,
+        "filename": filename,
+        "size": size,
+        "received": 0,
+        "media_type": None,
+        "alt_text": alt_text,
+        "display_order": display_order,
+        "state": "uploading",
+        "media_id": None,
+        "error": None,
+        "created_at": time.time(),
+    })
+
+
+def get_session(upload_id: str) -> Optional[dict]:
+    """Load session state, or None if unknown or expired"""
+    if not UPLOAD_ID_PATTERN.match(upload_id):
+        return None
+    try:
+        session = json.loads(_state_path(upload_id).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    if time.time() - session["updated_at"] > settings.UPLOAD_SESSION_TTL:
+        delete_session(upload_id)
+        return None
+    return session
+
+
+def _open_spool(upload_id: str) -> BinaryIO:
+    """Open the spool file for appending, locked against other workers"""
+    spool = open(_data_path(upload_id), "r+b")
+    try:
+        import fcntl
+    except ImportError:
+        return spool
+    try:
+        fcntl.flock(spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        spool.close()
+        raise UploadBusyError()
+    return spool
+
+
+def _sniff_spool(spool: BinaryIO) -> Optional[str]:
+    spool.seek(0)
+    return media_service.sniff_media_type(spool.read(media_service.SNIFF_SIZE))
+
+
+async def append_chunk(session: dict, offset: int, chunks: AsyncIterator[bytes], checksum: str) -> dict:
+    """Append one chunk at offset, verifying its SHA-256 checksum.
+
+    A bad checksum or oversize chunk rolls the spool file back to the
+    previous offset so the client can simply retry the chunk. Only one
+    request at a time may append to an upload; a concurrent one gets
+    UploadBusyError. File I/O runs in the threadpool.
+    """
+    upload_id = session["upload_id"]
+    if upload_id in _appending:
+        raise UploadBusyError()
+    _appending.add(upload_id)
+    try:
+        spool = await run_in_threadpool(_open_spool, upload_id)
+        try:
+            return await _append_locked(upload_id, spool, offset, chunks, checksum)
+        finally:
+            await run_in_threadpool(spool.close)
+    finally:
+        _appending.discard(upload_id)
+
+
+async def _append_locked(upload_id: str, spool: BinaryIO, offset: int, chunks: AsyncIterator[bytes], checksum: str) -> dict:
+    # The caller's copy of the state may predate another request's append
+    session = await run_in_threadpool(get_session, upload_id)
+    if not session:
+        raise ValueError("Upload session not found")
+    if session["state"] != "uploading":
+        raise ValueError(f"Upload is {session['state']}")
+
+    received = (await run_in_threadpool(os.fstat, spool.fileno())).st_size
+    if offset != received:
+        raise OffsetMismatchError(received)
+
+    digest = hashlib.sha256()
+    written = 0
+    buffer = bytearray()
+    spool.seek(received)
+    try:
+        async for piece in chunks:
+            written += len(piece)
+            if written > settings.UPLOAD_CHUNK_SIZE or received + written > session["size"]:
+                raise ValueError("Chunk exceeds the chunk size or the declared file size")
+            digest.update(piece)
+            buffer += piece
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                await run_in_threadpool(spool.write, buffer)
+                buffer = bytearray()
+        if buffer:
+            await run_in_threadpool(spool.write, buffer)
+        if digest.hexdigest() != checksum.lower():
+            raise ValueError("Chunk checksum mismatch")
+    except Exception:
+        await run_in_threadpool(spool.truncate, received)
+        raise
+
+    if received == 0:
+        session["media_type"] = await run_in_threadpool(_sniff_spool, spool)
+        if session["media_type"] is None:
+            await run_in_threadpool(delete_session, upload_id)
+            raise ValueError("Invalid file type")
+
+    session["received"] = received + written
+    return await run_in_threadpool(_save, session)
+
+
+def mark_processing(upload_id: str) -> dict:
+    """Check the upload is whole and lock it for assembly.
+
+    The check and the state change happen under the spool file lock, so
+    of concurrent completions (or a completion racing an append) only one
+    gets through; the others get UploadBusyError or a ValueError.
+    """
+    try:
+        spool = _open_spool(upload_id)
+    except FileNotFoundError:
+        spool = None
+    try:
+        session = get_session(upload_id)
+        if not session:
+            raise ValueError("Upload session not found")
+        if session["state"] != "uploading":
+            raise ValueError(f"Upload is {session['state']}")
+        if session["received"] != session["size"]:
+            raise ValueError(f"Upload incomplete: {session['received']} of {session['size']} bytes received")
+        if session["size"] > media_service.get_max_size(session["media_type"]):
+            raise ValueError("File exceeds the maximum size for its type")
+        session["state"] = "processing"
+        return _save(session)
+    finally:
+        if spool:
+            spool.close()
+
+
+async def process_session(upload_id: str) -> None:
+    """Hand the assembled file to storage and create the media record (background task)"""
+    session = await run_in_threadpool(get_session, upload_id)
+    if not session or session["state"] != "processing":
+        return
+
+    url = None
+    db = SessionLocal()
+    try:
+        spool = await run_in_threadpool(open, _data_path(upload_id), "rb")
+        try:
+            url = await media_service.upload_media_stream(spool, session["media_type"], session["filename"])
+        finally:
+            await run_in_threadpool(spool.close)
+
+        if session["display_order"] is not None:
+            media = await run_in_threadpool(
+                media_service.replace_or_create_media,
+                db, session["project_id"], url, media_type=session["media_type"],
+                display_order=session["display_order"], alt_text=session["alt_text"]
+            )
+        else:
+            media = await run_in_threadpool(
+                media_service.create_project_media,
+                db, session["project_id"], url, media_type=session["media_type"], alt_text=session["alt_text"]
+            )
+        if not media:
+            raise ValueError("Project not found")
+
+        session.update(state="completed", media_id=media.id)
+    except Exception as e:
+        if url:
+            await run_in_threadpool(media_service.delete_media_file, url, session["media_type"])
+        session.update(state="failed", error=str(e))
+    finally:
+        await run_in_threadpool(db.close)
+
+    await run_in_threadpool(_data_path(upload_id).unlink, missing_ok=True)
+    await run_in_threadpool(_save, session)
+
+
+def delete_session(upload_id: str) -> None:
+    """Remove a session's state and spooled data"""
+    _data_path(upload_id).unlink(missing_ok=True)
+    _state_path(upload_id).unlink(missing_ok=True)
+
+
+def sweep_expired_sessions() -> int:
+    """Delete sessions idle for longer than UPLOAD_SESSION_TTL. Returns the count."""
+    if not SESSION_DIR.exists():
+        return 0
+
+    cutoff = time.time() - settings.UPLOAD_SESSION_TTL
+    swept = 0
+    for path in SESSION_DIR.iterdir():
+        upload_id = path.name.split(".", 1)[0]
+        if not UPLOAD_ID_PATTERN.match(upload_id):
+            continue
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        # Expired state file, or spool/temp file left without one
+        if path.suffix == ".json" or not _state_path(upload_id).exists():
+            delete_session(upload_id)
+            path.unlink(missing_ok=True)
+            swept += 1
+    return swept
@@ -0,0 +1,106 @@
+"""WSGI entry point for hosts without ASGI support (PythonAnywhere).
+
+Requests for /static are answered straight from disk by a plain WSGI
+handler. Everything else crosses the a2wsgi bridge into the FastAPI app,
+which costs a hand-off to the bridge's event loop thread per request.
+The bridge doesn't run the app's lifespan, so it is started here on the
+bridge's loop: slug redirects are warmed as they are under uvicorn.
+
+Every process the WSGI server starts imports this module, and there's
+no way to pick one of them, so background jobs are off unless
+RUN_BACKGROUND_JOBS is set explicitly. Run them from a scheduled task
+instead: python -m app.commands.reconcile_media.
+"""
+import asyncio
+import hashlib
+import mimetypes
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from a2wsgi import ASGIMiddleware
+from app.core.config import settings
+from app.main import app
+
+STATIC_PREFIX = "/static/"
+STATIC_ROOT = Path("static").resolve()
+FILE_BLOCK_SIZE = 64 * 1024
+
+
+def _start_bridge() -> ASGIMiddleware:
+    if "RUN_BACKGROUND_JOBS" not in settings.model_fields_set:
+        settings.RUN_BACKGROUND_JOBS = False
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="asgi-bridge", daemon=True).start()
+    lifespan = app.router.lifespan_context(app)
+    asyncio.run_coroutine_threadsafe(lifespan.__aenter__(), loop).result()
+    return ASGIMiddleware(app, loop=loop)
+
+
+def _static_file(path_info: str):
+    """Resolved path of an existing file under STATIC_ROOT, or None"""
+    try:
+        path = (STATIC_ROOT / path_info[len(STATIC_PREFIX):]).resolve()
+    except (OSError, ValueError):
+        return None
+    if STATIC_ROOT not in path.parents or not path.is_file():
+        return None
+    return path
+
+
+def _not_modified(environ, etag: str, mtime: float) -> bool:
+    if_none_match = environ.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = environ.get("HTTP_IF_MODIFIED_SINCE")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def serve_static(environ, start_response, path: Path):
+    stat = path.stat()
+    # Same validators as Starlette's StaticFiles, so caches stay valid
+    # whichever entry point served the file
+    etag = '"' + hashlib.md5(f"{stat.st_mtime}-{stat.st_size}".encode(), usedforsecurity=False).hexdigest() + '"'
+    headers = [
+        ("ETag", etag),
+        ("Last-Modified", formatdate(stat.st_mtime, usegmt=True)),
+    ]
+    if _not_modified(environ, etag, stat.st_mtime):
+        start_response("304 Not Modified", headers)
+        return []
+
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+        content_type += "; charset=utf-8"
+    headers += [("Content-Type", content_type), ("Content-Length", str(stat.st_size))]
+    start_response("200 OK", headers)
+    if environ["REQUEST_METHOD"] == "HEAD":
+        return []
+
+    file = open(path, "rb")
+    file_wrapper = environ.get("wsgi.file_wrapper")
+    if file_wrapper:
+        return file_wrapper(file, FILE_BLOCK_SIZE)
+    return _read_blocks(file)
+
+
+def _read_blocks(file):
+    with file:
+        while block := file.read(FILE_BLOCK_SIZE):
+            yield block
+
+
+bridge = _start_bridge()
+
+
+def application(environ, start_response):
+    path_info = environ.get("PATH_INFO", "")
+    if path_info.startswith(STATIC_PREFIX) and environ["REQUEST_METHOD"] in ("GET", "HEAD"):
+        path = _static_file(path_info)
+        if path:
+            return serve_static(environ, start_response, path)
+    return bridge(environ, start_response)
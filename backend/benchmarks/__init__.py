@@ -0,0 +1 @@
+"""Performance benchmarks, run as modules from backend/ (python -m benchmarks.<name>)"""
@@ -0,0 +1,118 @@
+"""Client delete latency versus the number of invoice lines it owns.
+
+Compares the database cascade (ON DELETE CASCADE with passive_deletes)
+with the ORM cascade it replaced, reproduced by loading the children
+before deleting so SQLAlchemy removes them row by row.
+
+Usage (from backend/):
+    python -m benchmarks.delete_cascade
+    python -m benchmarks.delete_cascade --lines 100,1000,10000 --lines-per-invoice 10
+
+Runs against a throwaway SQLite database unless --database-url is given.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+
+def _seed_client(db, user_id: int, lines: int, lines_per_invoice: int) -> int:
+    from sqlalchemy import insert
+    from app.models.client import Client
+    from app.models.invoice import Invoice, InvoiceItem
+
+    client = Client(user_id=user_id, contact_name="Benchmark", contact_email="bench@example.com")
+    db.add(client)
+    db.flush()
+    invoices = max(1, lines // lines_per_invoice)
+    invoice_ids = db.execute(insert(Invoice).returning(Invoice.id), [
+        {"user_id": user_id, "client_id": client.id, "invoice_number": f"BENCH-{client.id}-{i}"}
+        for i in range(invoices)
+    ]).scalars().all()
+    db.execute(insert(InvoiceItem), [
+        {"invoice_id": invoice_ids[i % invoices], "description": "Line", "quantity": Decimal("1"), "unit_price": Decimal("10")}
+        for i in range(lines)
+    ])
+    db.commit()
+    return client.id
+
+
+def _time_delete(db, user_id: int, client_id: int, orm_cascade: bool) -> tuple:
+    from sqlalchemy import event
+    from sqlalchemy.orm import selectinload
+    from app.models.client import Client
+    from app.models.invoice import Invoice
+    from app.services import client_service
+
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(db.bind, "before_cursor_execute", count)
+    try:
+        start = time.perf_counter()
+        if orm_cascade:
+            db.query(Client).options(
+                selectinload(Client.invoices).selectinload(Invoice.items)
+            ).filter(Client.id == client_id).one()
+        client_service.delete_client(db, client_id, user_id)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(db.bind, "before_cursor_execute", count)
+    db.expunge_all()
+    return elapsed, len(statements)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark client delete latency against child row count")
+    parser.add_argument("--lines", default="100,1000,10000", help="Comma-separated invoice line counts")
+    parser.add_argument("--lines-per-invoice", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best is reported")
+    parser.add_argument("--database-url", help="Database to use instead of a temporary SQLite file")
+    args = parser.parse_args(argv)
+
+    workdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{workdir.name}/benchmark.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret-key-not-for-production")
+
+    from app.db import Base, SessionLocal, engine
+    from app.models.user import User
+    import app.models  # noqa: F401  (registers every table)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email=f"bench-{time.time_ns()}@example.com", hashed_password="-", full_name="Benchmark")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+        print(f"{'lines':>8} {'mode':>9} {'best ms':>9} {'statements':>11}")
+        for lines in [int(value) for value in args.lines.split(",")]:
+            for mode, orm_cascade in (("orm", True), ("database", False)):
+                best, statements = None, 0
+                for _ in range(args.repeat):
+                    client_id = _seed_client(db, user_id, lines, args.lines_per_invoice)
+                    elapsed, statements = _time_delete(db, user_id, client_id, orm_cascade)
+                    best = elapsed if best is None else min(best, elapsed)
+                print(f"{lines:>8} {mode:>9} {best * 1000:>9.1f} {statements:>11}")
+
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+        return 0
+    finally:
+        db.close()
+        if workdir:
+            engine.dispose()
+            workdir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
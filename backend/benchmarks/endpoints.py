@@ -0,0 +1,317 @@
+"""Throughput and latency of every public and admin endpoint, against a baseline.
+
+Drives each scenario below either in-process through the ASGI app
+(--transport asgi, measuring the app alone) or over HTTP against
+python -m app.serve (--transport http, including the server). Requests
+pick random ids, slugs, tags and cursors from the database, so caches
+see a realistic spread. Reports requests/s and p50/p95/p99 latency for
+each scenario.
+
+Results are compared with a saved baseline. A scenario regresses when
+its p95 is more than --threshold slower (and at least --min-delta-ms),
+or its throughput is more than --threshold lower. Any regression makes
+the exit status 1.
+
+Usage (from backend/):
+    python -m benchmarks.seed --database-url sqlite:///./bench.db --scale 0.1
+    python -m benchmarks.endpoints --database-url sqlite:///./bench.db --save-baseline
+    python -m benchmarks.endpoints --database-url sqlite:///./bench.db          # after a change
+    python -m benchmarks.endpoints --transport http --workers 2 --only project,invoice
+
+Contact form submissions add leads, so run against a disposable database.
+SMTP is disabled for the run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+Scenario = namedtuple("Scenario", "name method path admin body", defaults=(False, None))
+
+# Paths are formatted with a random value from each fixture they name
+SCENARIOS = [
+    Scenario("home", "GET", "/"),
+    Scenario("tag_page", "GET", "/projects?tag={tag}"),
+    Scenario("cards_fragment", "GET", "/projects/fragment?cursor={cursor}"),
+    Scenario("project_page", "GET", "/projects/{slug}"),
+    Scenario("contact_submit", "POST", "/api/v1/contact", body="contact"),
+    Scenario("health_ready", "GET", "/health/ready"),
+    Scenario("admin_login_page", "GET", "/admin/login"),
+    Scenario("admin_dashboard_page", "GET", "/admin"),
+    Scenario("admin_projects_page", "GET", "/admin/projects"),
+    Scenario("admin_leads_page", "GET", "/admin/leads"),
+    Scenario("admin_clients_page", "GET", "/admin/clients"),
+    Scenario("admin_client_page", "GET", "/admin/clients/{client_id}"),
+    Scenario("admin_invoices_page", "GET", "/admin/invoices"),
+    Scenario("api_projects", "GET", "/api/v1/admin/projects", admin=True),
+    Scenario("api_project", "GET", "/api/v1/admin/projects/{project_id}", admin=True),
+    Scenario("api_project_media", "GET", "/api/v1/admin/projects/{project_id}/media", admin=True),
+    Scenario("api_project_metrics", "GET", "/api/v1/admin/projects/{project_id}/metrics", admin=True),
+    Scenario("api_leads", "GET", "/api/v1/admin/leads", admin=True),
+    Scenario("api_leads_new", "GET", "/api/v1/admin/leads?status=new", admin=True),
+    Scenario("api_lead", "GET", "/api/v1/admin/leads/{lead_id}", admin=True),
+    Scenario("api_clients", "GET", "/api/v1/admin/clients", admin=True),
+    Scenario("api_clients_search", "GET", "/api/v1/admin/clients?q={word}", admin=True),
+    Scenario("api_client", "GET", "/api/v1/admin/clients/{client_id}", admin=True),
+    Scenario("api_invoices", "GET", "/api/v1/admin/invoices", admin=True),
+    Scenario("api_client_invoices", "GET", "/api/v1/admin/invoices?client_id={client_id}", admin=True),
+    Scenario("api_invoice", "GET", "/api/v1/admin/invoices/{invoice_id}", admin=True),
+    Scenario("api_stats", "GET", "/api/v1/admin/stats", admin=True),
+    Scenario("api_revenue_month", "GET", "/api/v1/admin/stats/revenue?group_by=month", admin=True),
+    Scenario("api_revenue_client", "GET", "/api/v1/admin/stats/revenue?group_by=client", admin=True),
+    Scenario("api_search", "GET", "/api/v1/admin/search?q={word}", admin=True),
+]
+
+SEARCH_WORDS = ["invoice", "dashboard", "smith", "booking", "cloud", "python", "retail", "ana", "portal"]
+FIXTURE_SAMPLE = 1000  # Values sampled per fixture
+
+
+def load_fixtures(admin_email: str) -> Dict[str, list]:
+    """Random ids, slugs, tags and cursors from the seeded database"""
+    from sqlalchemy import func
+    from app.db import SessionLocal
+    from app.models.client import Client
+    from app.models.invoice import Invoice
+    from app.models.lead import Lead
+    from app.models.project import Project, ProjectTag
+    from app.models.user import User
+    from app.services import project_service
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == admin_email).first()
+        if not user:
+            raise SystemExit(f"No user {admin_email}; seed the database with python -m benchmarks.seed first")
+
+        def sample(query) -> list:
+            return [row[0] for row in query.order_by(func.random()).limit(FIXTURE_SAMPLE)]
+
+        cursors = []
+        cursor = None
+        for _ in range(50):
+            _, cursor = project_service.get_project_cards(db, cursor, limit=9)
+            if not cursor:
+                break
+            cursors.append(cursor)
+
+        fixtures = {
+            "slug": sample(db.query(Project.slug).filter(Project.is_published == True)),
+            "project_id": sample(db.query(Project.id)),
+            "tag": sample(db.query(ProjectTag.tag).distinct()),
+            "cursor": cursors,
+            "client_id": sample(db.query(Client.id).filter(Client.user_id == user.id)),
+            "lead_id": sample(db.query(Lead.id)),
+            "invoice_id": sample(db.query(Invoice.id).filter(Invoice.user_id == user.id)),
+            "word": SEARCH_WORDS,
+        }
+        return {name: values for name, values in fixtures.items() if values}
+    finally:
+        db.close()
+
+
+class Runner:
+    def __init__(self, client, fixtures: Dict[str, list], token: str, rng: random.Random):
+        self.client = client
+        self.fixtures = fixtures
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.rng = rng
+
+    def runnable(self, scenario: Scenario) -> bool:
+        names = [part.split("}")[0] for part in scenario.path.split("{")[1:]]
+        return all(name in self.fixtures for name in names)
+
+    def _request(self, scenario: Scenario) -> dict:
+        values = {name: self.rng.choice(options) for name, options in self.fixtures.items()}
+        request = {
+            "method": scenario.method,
+            "url": scenario.path.format(**values),
+            "headers": self.headers if scenario.admin else None,
+        }
+        if scenario.body == "contact":
+            number = self.rng.randint(0, 10 ** 9)
+            request["json"] = {"name": "Benchmark", "email": f"bench.{number}@example.com", "message": "Benchmark enquiry"}
+        return request
+
+    async def run(self, scenario: Scenario, duration: float, concurrency: int, warmup: int) -> dict:
+        for _ in range(warmup):
+            await self.client.request(**self._request(scenario))
+
+        latencies: List[float] = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                request = self._request(scenario)
+                start = time.perf_counter()
+                response = await self.client.request(**request)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        return summarize(latencies, errors, elapsed)
+
+
+def percentile(ordered: List[float], share: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies) or [0.0]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+    }
+
+
+def compare(result: dict, baseline: Optional[dict], threshold: float, min_delta_ms: float) -> tuple:
+    """(p95 change as text, whether it regressed)"""
+    if not baseline:
+        return "", False
+    delta_ms = result["p95_ms"] - baseline["p95_ms"]
+    change = delta_ms / baseline["p95_ms"] if baseline["p95_ms"] else 0
+    slower = change > threshold and delta_ms >= min_delta_ms
+    fewer = baseline["rps"] and result["rps"] < baseline["rps"] * (1 - threshold)
+    return f"{change:+7.1%}", bool(slower or fewer)
+
+
+async def run_scenarios(client, args, fixtures: Dict[str, list], token: str, baseline: dict) -> tuple:
+    runner = Runner(client, fixtures, token, random.Random(args.seed))
+    results, regressions = {}, []
+    print(f"{'scenario':<24} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'p95 vs base':>12}")
+    for scenario in SCENARIOS:
+        if args.only and not any(part in scenario.name for part in args.only.split(",")):
+            continue
+        if not runner.runnable(scenario):
+            print(f"{scenario.name:<24} skipped: no data for {scenario.path}")
+            continue
+        result = await runner.run(scenario, args.duration, args.concurrency, args.warmup)
+        results[scenario.name] = result
+        change, regressed = compare(result, baseline.get(scenario.name), args.threshold, args.min_delta_ms)
+        if regressed:
+            regressions.append(scenario.name)
+        print(
+            f"{scenario.name:<24} {result['rps']:>8.1f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['errors']:>7} {change:>12}{'  REGRESSION' if regressed else ''}",
+            flush=True
+        )
+    return results, regressions
+
+
+async def bench_asgi(args, fixtures: Dict[str, list], token: str, baseline: dict) -> tuple:
+    import httpx
+    from app.main import app
+    from app.services import health_service
+
+    health_service.warm_templates()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await run_scenarios(client, args, fixtures, token, baseline)
+
+
+async def bench_http(args, fixtures: Dict[str, list], token: str, baseline: dict) -> tuple:
+    import httpx
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    command = [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port)]
+    if args.workers:
+        command += ["--workers", str(args.workers)]
+    server = subprocess.Popen(command, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/health/live")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise SystemExit("The server did not start")
+                await asyncio.sleep(0.2)
+            return await run_scenarios(client, args, fixtures, token, baseline)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every endpoint against a baseline")
+    parser.add_argument("--database-url", help="Seeded database (default: DATABASE_URL)")
+    parser.add_argument("--transport", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--workers", type=int, default=0, help="app.serve workers for --transport http (default: WEB_WORKERS)")
+    parser.add_argument("--duration", type=float, default=3, help="Seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests before each scenario")
+    parser.add_argument("--only", help="Comma-separated parts of scenario names to run")
+    parser.add_argument("--baseline", help="Baseline file (default: benchmarks/results/baseline-<transport>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative p95 slowdown / throughput drop")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore p95 slowdowns smaller than this")
+    parser.add_argument("--admin-email", default="bench@example.com")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret-key-not-for-production")
+    # No mail from contact form submissions, no jobs competing for the CPU
+    os.environ["SMTP_USER"] = os.environ["SMTP_PASSWORD"] = ""
+    os.environ["RUN_BACKGROUND_JOBS"] = "false"
+    # Keeps access lines out of the report in --transport asgi (the http server's output is discarded)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from app.core.security import create_access_token
+
+    baseline_path = Path(args.baseline) if args.baseline else RESULTS_DIR / f"baseline-{args.transport}.json"
+    baseline = {}
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text())["results"]
+        print(f"Comparing with {baseline_path}")
+
+    fixtures = load_fixtures(args.admin_email)
+    token = create_access_token({"sub": args.admin_email}, expires_delta=timedelta(days=1))
+    bench = bench_asgi if args.transport == "asgi" else bench_http
+    results, regressions = asyncio.run(bench(args, fixtures, token, baseline))
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({
+            "transport": args.transport,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "settings": {"duration": args.duration, "concurrency": args.concurrency},
+            "results": results,
+        }, indent=2))
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
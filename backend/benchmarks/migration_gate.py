@@ -0,0 +1,66 @@
+"""Boot-time cost of the migration step when the schema is already at head.
+
+Compares `alembic upgrade head`, which start.sh used to run on every
+boot, with `python -m app.commands.migrate` with and without the head
+file it reads.
+
+Usage (from backend/):
+    python -m benchmarks.migration_gate --repeat 5
+
+Runs against a throwaway SQLite database unless --database-url is given.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _time(command, env) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the migration step of a cold start")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="Database to use instead of a temporary SQLite file")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.TemporaryDirectory()
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir.name}/benchmark.db"
+    env.setdefault("SECRET_KEY", "benchmark-only-secret-key-not-for-production")
+
+    from app.commands import migrate
+
+    head_backup = migrate.HEAD_FILE.read_bytes() if migrate.HEAD_FILE.exists() else None
+    try:
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True, capture_output=True)
+        runs = [
+            ("alembic upgrade head", [sys.executable, "-m", "alembic", "upgrade", "head"], True),
+            ("app.commands.migrate, no head file", [sys.executable, "-m", "app.commands.migrate"], False),
+            ("app.commands.migrate, head file", [sys.executable, "-m", "app.commands.migrate"], True),
+        ]
+        print(f"{'':<36} {'best ms':>8} {'median ms':>10}")
+        for label, command, with_head in runs:
+            if with_head:
+                subprocess.run([sys.executable, "-m", "app.commands.migrate", "--write-head"], env=env, check=True, capture_output=True)
+            else:
+                migrate.HEAD_FILE.unlink(missing_ok=True)
+            timings = [_time(command, env) for _ in range(args.repeat)]
+            print(f"{label:<36} {min(timings) * 1000:>8.0f} {statistics.median(timings) * 1000:>10.0f}")
+        return 0
+    finally:
+        if head_backup is None:
+            migrate.HEAD_FILE.unlink(missing_ok=True)
+        else:
+            migrate.HEAD_FILE.write_bytes(head_backup)
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
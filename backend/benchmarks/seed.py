@@ -0,0 +1,373 @@
+"""Fill a database with synthetic data at production-like volumes.
+
+Creates an admin user (bench@example.com / benchmark) who owns:
+- published projects with media, metrics, tech stack tags and related projects;
+- clients;
+- contact form leads;
+- invoices with line items, covering every status over several years.
+It also builds the search index and invoice summaries. Rows are inserted
+in bulk with explicit ids, so tens of millions of rows take minutes
+rather than hours. The data is the same for the same --seed.
+
+Usage (from backend/):
+    python -m benchmarks.seed --database-url sqlite:///./bench.db
+    python -m benchmarks.seed --database-url postgresql://... --clients 100000 --leads 1000000
+    python -m benchmarks.seed --scale 0.01   # Every count times 0.01, for a quick run
+
+The schema is created with init_db() and stamped at the migrations' head
+if missing, so readiness probes pass. Refuses to write to a
+database that already has projects unless --force is given.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+ADMIN_EMAIL = "bench@example.com"
+ADMIN_PASSWORD = "benchmark"
+
+WORDS = (
+    "automated reporting dashboard inventory scheduling booking portal analytics pipeline integration "
+    "customer billing workflow mobile offline sync secure payments logistics warehouse tracking "
+    "notifications realtime search catalogue onboarding compliance audit migration legacy cloud "
+    "serverless api gateway microservice monolith refactor performance caching queue worker batch "
+    "import export spreadsheet invoice quote estimate crm marketing email campaign landing ecommerce "
+    "storefront checkout subscription membership loyalty rewards survey feedback support ticket "
+    "helpdesk knowledge base documentation training hospital clinic school charity restaurant retail"
+).split()
+TECHNOLOGIES = (
+    "Python", "FastAPI", "Django", "Flask", "SQLAlchemy", "PostgreSQL", "SQLite", "MySQL", "Redis",
+    "Celery", "React", "Vue", "Svelte", "TypeScript", "JavaScript", "Tailwind CSS", "Bootstrap",
+    "Node.js", "Express", "Next.js", "Docker", "Kubernetes", "AWS", "GCP", "Azure", "Terraform",
+    "Cloudinary", "Stripe", "Twilio", "SendGrid", "Pandas", "NumPy", "scikit-learn", "PyTorch",
+    "Go", "Rust", "Java", "Kotlin", "Swift", "Flutter", "GraphQL", "REST", "WebSockets", "Nginx",
+    "Jinja2", "HTMX", "Alpine.js", "Elasticsearch", "RabbitMQ", "Kafka",
+)
+BADGES = ("Client Project", "Internal Tool", "Open Source", "Prototype", None)
+METRICS = (("⏱️", "hours saved weekly"), ("📈", "more conversions"), ("💰", "cost reduction"), ("⚡", "faster page loads"))
+FIRST_NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Rowan", "Skyler")
+LAST_NAMES = ("Smith", "Jones", "Brown", "Wilson", "Taylor", "Davies", "Evans", "Thomas", "Roberts", "Walker", "Wright", "Hall")
+LEAD_STATUSES = ("new",) * 5 + ("contacted",) * 3 + ("converted", "archived")
+INVOICE_STATUSES = ("paid",) * 6 + ("sent", "sent", "overdue", "draft", "cancelled")
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng, rng.randint(6, 14)) for _ in range(sentences))
+
+
+def _person(rng: random.Random, index: int) -> tuple:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    return name, f"{name.split()[0].lower()}.{index}@example.com"
+
+
+class Seeder:
+    def __init__(self, engine, rng: random.Random, batch_size: int):
+        self.engine = engine
+        self.rng = rng
+        self.batch_size = batch_size
+
+    def next_id(self, table) -> int:
+        from sqlalchemy import func, select
+
+        with self.engine.connect() as connection:
+            return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def insert(self, table, rows) -> int:
+        """Insert row dicts in batches; returns the count.
+
+        rows is an iterable, or a function of the connection returning one.
+        """
+        from sqlalchemy import insert
+
+        count = 0
+        batch = []
+        with self.engine.begin() as connection:
+            for row in rows(connection) if callable(rows) else rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    connection.execute(insert(table), batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                connection.execute(insert(table), batch)
+                count += len(batch)
+        return count
+
+    def reset_sequences(self, tables) -> None:
+        """Point Postgres id sequences past the explicit ids inserted"""
+        from sqlalchemy import text
+
+        if self.engine.dialect.name != "postgresql":
+            return
+        with self.engine.begin() as connection:
+            for table in tables:
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+                ))
+
+
+def _timed(label: str, func, *args) -> int:
+    start = time.perf_counter()
+    count = func(*args)
+    print(f"  {label:<22} {count:>10,} rows  {time.perf_counter() - start:7.1f}s", flush=True)
+    return count
+
+
+def seed(engine, args) -> None:
+    from app.core.security import get_password_hash
+    from app.models.client import Client
+    from app.models.invoice import Invoice, InvoiceItem, InvoiceStatus
+    from app.models.lead import Lead, LeadStatus
+    from app.models.project import Project, ProjectMedia
+    from app.models.project_metric import ProjectMetric
+    from app.models.search_document import SearchDocument
+    from app.models.user import User
+
+    rng = random.Random(args.seed)
+    seeder = Seeder(engine, rng, args.batch_size)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # Naive UTC, as the models store
+    today = date.today()
+
+    users = User.__table__
+    with engine.begin() as connection:
+        user_id = connection.execute(
+            users.select().with_only_columns(users.c.id).where(users.c.email == ADMIN_EMAIL)
+        ).scalar()
+        if user_id is None:
+            user_id = connection.execute(users.insert().values(
+                email=ADMIN_EMAIL, hashed_password=get_password_hash(ADMIN_PASSWORD),
+                full_name="Benchmark Admin", role="admin", is_active=True, created_at=now, updated_at=now
+            )).inserted_primary_key[0]
+
+    first_project = seeder.next_id(Project.__table__)
+    project_ids = range(first_project, first_project + args.projects)
+
+    def projects():
+        for project_id in project_ids:
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))).title()
+            project_date = today - timedelta(days=rng.randint(0, 5 * 365))
+            yield {
+                "id": project_id,
+                "title": title,
+                "slug": f"{title.lower().replace(' ', '-')}-{project_id}",
+                "short_description": _sentence(rng, 12)[:200],
+                "description": _paragraph(rng, 4),
+                "badge_label": rng.choice(BADGES),
+                "purpose": _sentence(rng, 10)[:200],
+                "summary": _paragraph(rng, 2),
+                "key_features": [{"title": _sentence(rng, 3), "description": _sentence(rng, 10)} for _ in range(3)],
+                "outcome": _paragraph(rng, 3),
+                "case_study": "\n\n".join(_paragraph(rng, 5) for _ in range(4)),
+                "tech_stack": rng.sample(TECHNOLOGIES, rng.randint(3, 7)),
+                "project_url": f"https://example.com/projects/{project_id}",
+                "date": project_date,
+                "is_published": rng.random() < 0.95,
+                "is_featured": rng.random() < 0.01,
+                "created_at": datetime.combine(project_date, datetime.min.time()),
+                "updated_at": now,
+            }
+
+    def media():
+        for project_id in project_ids:
+            for order in range(args.media_per_project):
+                video = order > 0 and rng.random() < 0.1
+                yield {
+                    "project_id": project_id,
+                    "media_type": "video" if video else "image",
+                    "url": f"/static/uploads/portfolio/seed/{project_id}-{order}.{'mp4' if video else 'jpg'}",
+                    "alt_text": _sentence(rng, 5),
+                    "display_order": order,
+                    "width": 1600,
+                    "height": 900,
+                    "byte_size": rng.randint(50_000, 5_000_000),
+                    "mime_type": "video/mp4" if video else "image/jpeg",
+                    "created_at": now,
+                }
+
+    def metrics():
+        for project_id in project_ids:
+            for order in range(args.metrics_per_project):
+                icon, label = rng.choice(METRICS)
+                yield {
+                    "project_id": project_id, "icon_type": "emoji", "icon_value": icon,
+                    "metric_value": f"{rng.randint(2, 90)}%", "metric_label": label,
+                    "display_order": order, "created_at": now, "updated_at": now,
+                }
+
+    first_client = seeder.next_id(Client.__table__)
+    client_ids = range(first_client, first_client + args.clients)
+
+    def clients():
+        for client_id in client_ids:
+            name, email = _person(rng, client_id)
+            created = now - timedelta(days=rng.randint(0, 5 * 365))
+            yield {
+                "id": client_id, "user_id": user_id, "company_name": f"{rng.choice(WORDS).title()} {rng.choice(('Ltd', 'LLC', 'Inc', 'Co'))}",
+                "contact_name": name, "contact_email": email, "phone": f"+44 7700 {client_id % 1000000:06d}",
+                "city": rng.choice(("London", "Leeds", "Glasgow", "Bristol", "Cardiff", "Belfast")), "country": "UK",
+                "notes": _sentence(rng, 10) if rng.random() < 0.3 else None, "created_at": created, "updated_at": created,
+            }
+
+    first_lead = seeder.next_id(Lead.__table__)
+
+    def leads():
+        for lead_id in range(first_lead, first_lead + args.leads):
+            name, email = _person(rng, lead_id)
+            yield {
+                "id": lead_id, "name": name, "email": email, "message": _paragraph(rng, rng.randint(1, 3)),
+                "source": "Contact Form", "status": LeadStatus(rng.choice(LEAD_STATUSES)),
+                "created_at": now - timedelta(minutes=rng.randint(0, 5 * 365 * 24 * 60)),
+            }
+
+    first_invoice = seeder.next_id(Invoice.__table__)
+    invoice_ids = range(first_invoice, first_invoice + args.invoices)
+    invoice_items = {}
+
+    def invoices():
+        for invoice_id in invoice_ids:
+            items = [
+                (_sentence(rng, 4), Decimal(rng.randint(1, 40)), Decimal(rng.randint(20, 150)))
+                for _ in range(rng.randint(1, args.items_per_invoice * 2 - 1))
+            ]
+            invoice_items[invoice_id] = items
+            subtotal = sum(quantity * price for _, quantity, price in items)
+            tax_rate = Decimal("20.00")
+            tax_amount = (subtotal * tax_rate / 100).quantize(Decimal("0.01"))
+            issued = now - timedelta(days=rng.randint(0, 5 * 365))
+            status = rng.choice(INVOICE_STATUSES)
+            yield {
+                "id": invoice_id, "user_id": user_id, "client_id": rng.choice(client_ids),
+                "project_id": rng.choice(project_ids) if project_ids and rng.random() < 0.3 else None,
+                "invoice_number": f"SEED-{invoice_id:08d}", "status": InvoiceStatus(status), "currency": "GBP",
+                "issue_date": issued, "due_date": issued + timedelta(days=30),
+                "paid_date": issued + timedelta(days=rng.randint(1, 45)) if status == "paid" else None,
+                "subtotal": subtotal, "tax_rate": tax_rate, "tax_amount": tax_amount, "total": subtotal + tax_amount,
+                "created_at": issued, "updated_at": issued,
+            }
+
+    def items():
+        for invoice_id in invoice_ids:
+            for description, quantity, price in invoice_items.pop(invoice_id):
+                yield {"invoice_id": invoice_id, "description": description, "quantity": quantity, "unit_price": price}
+
+    print(f"Seeding {engine.url.render_as_string(hide_password=True)}", flush=True)
+    _timed("projects", seeder.insert, Project.__table__, projects())
+    _timed("project media", seeder.insert, ProjectMedia.__table__, media())
+    _timed("project metrics", seeder.insert, ProjectMetric.__table__, metrics())
+    _timed("clients", seeder.insert, Client.__table__, clients())
+    _timed("leads", seeder.insert, Lead.__table__, leads())
+    if client_ids:
+        _timed("invoices", seeder.insert, Invoice.__table__, invoices())
+        _timed("invoice items", seeder.insert, InvoiceItem.__table__, items())
+    seeder.reset_sequences([
+        Project.__table__, ProjectMedia.__table__, ProjectMetric.__table__, Client.__table__,
+        Lead.__table__, Invoice.__table__, InvoiceItem.__table__,
+    ])
+    _timed("search documents", seeder.insert, SearchDocument.__table__, lambda connection: _search_documents(
+        connection, first_project, first_client, first_lead, args.batch_size
+    ))
+    seeder.reset_sequences([SearchDocument.__table__])
+    _timed("derived tables", _rebuild_derived)
+
+
+def _search_documents(connection, first_project: int, first_client: int, first_lead: int, chunk: int):
+    """Documents for the seeded rows, as search_service's index_* functions build them"""
+    from sqlalchemy import func, select
+    from app.models.client import Client
+    from app.models.lead import Lead
+    from app.models.project import Project
+
+    def join(*parts) -> str:
+        return " ".join(str(part) for part in parts if part)
+
+    def rows(query, id_column, first_id: int):
+        # Read in id ranges on the inserting connection, so no second
+        # connection holds a read lock while it writes
+        last_id = connection.execute(select(func.max(id_column))).scalar() or 0
+        while first_id <= last_id:
+            yield from connection.execute(query.where(id_column >= first_id, id_column < first_id + chunk)).all()
+            first_id += chunk
+
+    query = select(Client.id, Client.user_id, Client.contact_name, Client.company_name, Client.contact_email, Client.notes)
+    for row in rows(query, Client.id, first_client):
+        yield {
+            "entity_type": "client", "entity_id": row.id, "user_id": row.user_id,
+            "title": join(row.contact_name, row.company_name), "body": join(row.contact_email, row.notes),
+        }
+    for row in rows(select(Lead.id, Lead.name, Lead.email, Lead.message), Lead.id, first_lead):
+        yield {"entity_type": "lead", "entity_id": row.id, "user_id": None, "title": row.name, "body": join(row.email, row.message)}
+    for row in rows(select(Project.id, Project.title, Project.description, Project.tech_stack), Project.id, first_project):
+        yield {
+            "entity_type": "project", "entity_id": row.id, "user_id": None,
+            "title": row.title, "body": join(row.description, *(row.tech_stack or [])),
+        }
+
+
+def _rebuild_derived() -> int:
+    """Tags, related projects and invoice summaries, through the services that maintain them"""
+    from app.db import SessionLocal
+    from app.services import invoice_summary_service, project_service
+
+    db = SessionLocal()
+    try:
+        pairs = project_service.rebuild_project_tags(db)
+        return pairs + invoice_summary_service.rebuild_summaries(db)
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Seed a database with synthetic benchmark data")
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL)")
+    parser.add_argument("--projects", type=int, default=3000)
+    parser.add_argument("--media-per-project", type=int, default=4)
+    parser.add_argument("--metrics-per-project", type=int, default=3)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--leads", type=int, default=1_000_000)
+    parser.add_argument("--invoices", type=int, default=200_000)
+    parser.add_argument("--items-per-invoice", type=int, default=4, help="Average line items per invoice")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the projects, clients, leads and invoices counts")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="Add to a database that already has projects")
+    args = parser.parse_args(argv)
+    for name in ("projects", "clients", "leads", "invoices"):
+        setattr(args, name, int(getattr(args, name) * args.scale))
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret-key-not-for-production")
+
+    from sqlalchemy import func, inspect, select
+    from app.db import engine, init_db
+    from app.models.project import Project
+
+    if not inspect(engine).has_table("projects"):
+        from alembic import command
+        from alembic.config import Config
+        from app.commands.migrate import ALEMBIC_INI
+
+        init_db()
+        command.stamp(Config(str(ALEMBIC_INI)), "head")
+    with engine.connect() as connection:
+        existing = connection.execute(select(func.count()).select_from(Project)).scalar()
+    if existing and not args.force:
+        print(f"The database already has {existing} projects; pass --force to add to it", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    seed(engine, args)
+    print(f"Done in {time.perf_counter() - start:.0f}s. Admin login: {ADMIN_EMAIL} / {ADMIN_PASSWORD}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Request throughput of the ways the app can be served.
+
+http: the single uvicorn process start.sh used to run against
+python -m app.serve, driven over real sockets by client processes.
+wsgi: the plain a2wsgi bridge wsgi_config.py used to expose against
+app.wsgi's static fast path, called in-process.
+
+Usage (from backend/):
+    python -m benchmarks.serve_throughput
+    python -m benchmarks.serve_throughput --mode http --workers 4 --clients 16 --duration 10
+
+Runs against a throwaway SQLite database unless --database-url is given.
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+PATHS = ["/health", "/", "/static/js/main.js"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def _client(port: int, path: str, duration: float) -> List[float]:
+    """Keep-alive GETs for duration seconds; returns each request's latency"""
+    latencies = []
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.getheader("connection", "").lower() == "close":
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.close()
+    return latencies
+
+
+def _report(label: str, path: str, latencies: List[float], elapsed: float) -> None:
+    if not latencies:
+        print(f"{label:<22} {path:<20} no successful requests")
+        return
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{label:<22} {path:<20} {len(latencies) / elapsed:>9.0f} req/s"
+        f"  p50 {statistics.median(latencies) * 1000:>6.2f} ms  p99 {p99 * 1000:>6.2f} ms"
+    )
+
+
+def bench_http(args, env: dict) -> None:
+    servers = [
+        ("uvicorn (1 process)", [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1"]),
+        (f"app.serve ({args.workers} workers)", [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--workers", str(args.workers)]),
+    ]
+    for label, command in servers:
+        port = _free_port()
+        server = subprocess.Popen(
+            command + ["--port", str(port)], env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _wait_until_up(port)
+            for path in PATHS:
+                with multiprocessing.Pool(args.clients) as pool:
+                    start = time.perf_counter()
+                    results = pool.starmap(_client, [(port, path, args.duration)] * args.clients)
+                    elapsed = time.perf_counter() - start
+                _report(label, path, [latency for result in results for latency in result], elapsed)
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+
+def _call_wsgi(application, path: str) -> None:
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {}
+    setup_testing_defaults(environ)
+    environ["PATH_INFO"] = path
+    body = application(environ, lambda status, headers, exc_info=None: None)
+    for _ in body:
+        pass
+    if hasattr(body, "close"):
+        body.close()
+
+
+def bench_wsgi(args) -> None:
+    from a2wsgi import ASGIMiddleware
+    from app.main import app
+    from app import wsgi
+
+    for label, application in (("a2wsgi bridge", ASGIMiddleware(app)), ("app.wsgi", wsgi.application)):
+        for path in PATHS:
+            for _ in range(20):
+                _call_wsgi(application, path)
+            latencies = []
+            start = time.perf_counter()
+            while time.perf_counter() - start < args.duration:
+                request_start = time.perf_counter()
+                _call_wsgi(application, path)
+                latencies.append(time.perf_counter() - request_start)
+            _report(label, path, latencies, time.perf_counter() - start)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark server and WSGI entry point throughput")
+    parser.add_argument("--mode", choices=["http", "wsgi", "all"], default="all")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client processes (http mode)")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds per measurement")
+    parser.add_argument("--database-url", help="Database to use instead of a temporary SQLite file")
+    args = parser.parse_args(argv)
+
+    workdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{workdir.name}/benchmark.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret-key-not-for-production")
+
+    from app.db import init_db
+    init_db()
+    try:
+        if args.mode in ("http", "all"):
+            bench_http(args, dict(os.environ))
+        if args.mode in ("wsgi", "all"):
+            bench_wsgi(args)
+        return 0
+    finally:
+        if workdir:
+            workdir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
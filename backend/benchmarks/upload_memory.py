@@ -0,0 +1,125 @@
+"""Peak server memory while uploading media files of growing size.
+
+Starts a fresh uvicorn process for each size and uploads one video of
+that size to POST /api/v1/admin/projects/{id}/media over a real socket,
+streamed from disk by the client. It reports the server's resident
+memory before the upload and its peak (VmHWM) afterwards. With the
+upload streamed to storage in chunks, the peak should not grow with the
+file size. Files go to the local storage backend in a temporary
+directory. Reads /proc, so Linux only.
+
+Usage (from backend/):
+    python -m benchmarks.upload_memory
+    python -m benchmarks.upload_memory --sizes 1,10,25,50
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.serve_throughput import _free_port, _wait_until_up
+
+MP4_HEADER = b"\x00\x00\x00\x18ftypmp42"
+
+
+def _memory_kb(pid: int) -> dict:
+    """VmRSS and VmHWM (peak RSS) of a process, in kB"""
+    values = {}
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "VmHWM"):
+                values[name] = int(value.split()[0])
+    return values
+
+
+def _write_video(path: str, size: int) -> None:
+    """Random bytes behind an MP4 header, so no two runs share an asset"""
+    with open(path, "wb") as file:
+        file.write(MP4_HEADER)
+        remaining = size - len(MP4_HEADER)
+        while remaining > 0:
+            block = os.urandom(min(remaining, 1024 * 1024))
+            file.write(block)
+            remaining -= len(block)
+
+
+def _upload(port: int, project_id: int, token: str, path: str) -> int:
+    import httpx
+
+    with open(path, "rb") as file:
+        response = httpx.post(
+            f"http://127.0.0.1:{port}/api/v1/admin/projects/{project_id}/media",
+            files={"file": ("video.mp4", file, "video/mp4")},
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=120,
+        )
+    return response.status_code
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure server peak RSS against upload size")
+    parser.add_argument("--sizes", default="1,10,25,49", help="Comma-separated upload sizes in MB")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{workdir.name}/benchmark.db",
+        "MEDIA_STORAGE_BACKEND": "local",
+        "MEDIA_LOCAL_DIR": os.path.join(workdir.name, "uploads"),
+        "RUN_BACKGROUND_JOBS": "false",
+        "ACCESS_LOG": "false",
+        "LOG_LEVEL": "WARNING",
+    })
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret-key-not-for-production")
+
+    from app.core.security import create_access_token
+    from app.db import SessionLocal, init_db
+    from app.models.project import Project
+    from app.models.user import User
+
+    init_db()
+    db = SessionLocal()
+    try:
+        db.add(User(email="bench@example.com", hashed_password="-", full_name="Benchmark", role="admin"))
+        project = Project(title="Benchmark", slug="benchmark", description="Upload memory benchmark")
+        db.add(project)
+        db.commit()
+        project_id = project.id
+    finally:
+        db.close()
+    token = create_access_token({"sub": "bench@example.com"})
+    warmup = os.path.join(workdir.name, "warmup.mp4")
+    _write_video(warmup, 64 * 1024)
+
+    print(f"{'upload MB':>10} {'status':>7} {'RSS before MB':>14} {'peak MB':>8} {'growth MB':>10}")
+    try:
+        for size_mb in [float(value) for value in args.sizes.split(",")]:
+            path = os.path.join(workdir.name, "upload.mp4")
+            _write_video(path, int(size_mb * 1024 * 1024))
+            port = _free_port()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+                env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                _wait_until_up(port)
+                # Load everything an upload touches, so only the upload itself is measured
+                _upload(port, project_id, token, warmup)
+                time.sleep(0.5)
+                before = _memory_kb(server.pid)["VmRSS"]
+                status = _upload(port, project_id, token, path)
+                peak = _memory_kb(server.pid)["VmHWM"]
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+            print(f"{size_mb:>10.0f} {status:>7} {before / 1024:>14.1f} {peak / 1024:>8.1f} {(peak - before) / 1024:>10.1f}")
+        return 0
+    finally:
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,10 @@
 
 # Render startup script for FastAPI app
 
-# Run database migrations
-alembic upgrade head
+# Run database migrations; skipped without loading Alembic when the
+# schema already matches the head recorded at build time
+python -m app.commands.migrate
 
-# Start the FastAPI app with Uvicorn
-uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
+# Start the FastAPI app with pre-forked Uvicorn workers (see app/serve.py;
+# tuned with the WEB_* settings)
+exec python -m app.serve
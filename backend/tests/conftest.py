@@ -0,0 +1,91 @@
+import itertools
+import os
+import tempfile
+
+# Settings are read when app modules are imported, so point them at a
+# scratch database before any test imports the app
+_tmp = tempfile.mkdtemp(prefix="cm-dev-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["CACHE_SQLITE_PATH"] = os.path.join(_tmp, "cache.sqlite3")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-" + "x" * 32)
+os.environ["SMTP_HOST"] = ""
+os.environ["LOG_LEVEL"] = "WARNING"
+os.environ["RUN_BACKGROUND_JOBS"] = "false"
+os.environ["MEDIA_STORAGE_BACKEND"] = "local"
+os.environ["MEDIA_LOCAL_DIR"] = os.path.join(_tmp, "uploads")
+os.environ["UPLOAD_SESSION_DIR"] = os.path.join(_tmp, "upload-sessions")
+
+import pytest
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from app.db import init_db
+
+    init_db()
+
+
+@pytest.fixture
+def db():
+    from app.db import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Creates an admin user with a unique email"""
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    def make_user() -> User:
+        user = User(
+            email=f"user{next(_emails)}@example.com",
+            hashed_password=get_password_hash("password"),
+            full_name="Test User",
+            role="admin",
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def make_project(db):
+    from app.models.project import Project
+
+    def make_project(is_published: bool = True) -> Project:
+        number = next(_emails)
+        project = Project(title=f"Project {number}", slug=f"project-{number}", description="A project", is_published=is_published)
+        db.add(project)
+        db.commit()
+        return project
+
+    return make_project
+
+
+@pytest.fixture
+def auth_headers():
+    from app.core.security import create_access_token
+
+    def auth_headers(user) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+
+    return auth_headers
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
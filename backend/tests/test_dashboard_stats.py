@@ -0,0 +1,15 @@
+def test_stats_count_only_the_users_own_records(make_project, make_user, client, auth_headers):
+    make_project()
+    headers = auth_headers(make_user())
+    response = client.post("/api/v1/admin/clients", json={"contact_name": "Grace Hopper", "contact_email": "grace@example.com"}, headers=headers)
+    assert response.status_code in (200, 201), response.text
+    other_headers = auth_headers(make_user())
+
+    stats = client.get("/api/v1/admin/stats", headers=headers).json()
+    assert stats["total_clients"] == 1
+    assert stats["total_projects"] >= 1
+    assert stats["pending_invoices"] == 0
+    assert float(stats["outstanding_total"]) == 0
+    assert stats["recent_invoices"] == []
+
+    assert client.get("/api/v1/admin/stats", headers=other_headers).json()["total_clients"] == 0
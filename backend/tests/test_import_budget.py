@@ -0,0 +1,19 @@
+from app.core.config import settings
+from app.diagnostics import import_profile
+
+# Imported on first use, never at startup
+LAZY_MODULES = ("cloudinary", "passlib", "bcrypt", "jose", "smtplib", "app.diagnostics.request_profiler")
+
+
+def test_app_imports_within_budget():
+    elapsed_ms = import_profile.time_import("app.main", repeat=3)
+    assert elapsed_ms <= settings.IMPORT_BUDGET_MS, (
+        f"import app.main took {elapsed_ms:.0f} ms, over IMPORT_BUDGET_MS={settings.IMPORT_BUDGET_MS}; "
+        "see python -m app.diagnostics.import_profile"
+    )
+
+
+def test_heavy_dependencies_load_lazily():
+    loaded = [cost.name for cost in import_profile.profile_imports("app.main")]
+    eager = [name for name in loaded if name in LAZY_MODULES or name.startswith(tuple(f"{m}." for m in LAZY_MODULES))]
+    assert not eager
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+from app.core.config import settings
+from app.db import SessionLocal
+from app.models.client import Client
+from app.schemas.invoice import InvoiceCreate, InvoiceItemCreate
+from app.services import invoice_service
+
+THREADS = 16
+INVOICES_PER_THREAD = 125  # 2000 in all
+
+
+def _make_client(db, user) -> Client:
+    client = Client(user_id=user.id, contact_name="Client", contact_email="client@example.com")
+    db.add(client)
+    db.commit()
+    return client
+
+
+def _invoice_data(client_id: int) -> InvoiceCreate:
+    return InvoiceCreate(
+        client_id=client_id,
+        items=[InvoiceItemCreate(description="Work", quantity=Decimal("1"), unit_price=Decimal("10"))],
+    )
+
+
+def _number(sequence: int) -> str:
+    return settings.INVOICE_NUMBER_FORMAT.format(
+        prefix=settings.INVOICE_NUMBER_PREFIX, year=datetime.now().year, number=sequence
+    )
+
+
+def test_each_user_numbers_from_one(db, make_user, client, auth_headers):
+    for user in (make_user(), make_user()):
+        client_id = _make_client(db, user).id
+        numbers = []
+        for _ in range(2):
+            response = client.post(
+                "/api/v1/admin/invoices",
+                json={"client_id": client_id, "items": [{"description": "Work", "quantity": "1", "unit_price": "10"}]},
+                headers=auth_headers(user),
+            )
+            assert response.status_code == 201, response.text
+            numbers.append(response.json()["invoice_number"])
+        assert numbers == [_number(1), _number(2)]
+
+
+def test_concurrent_creates_get_distinct_numbers(db, make_user):
+    users = [make_user(), make_user()]
+    client_ids = {user.id: _make_client(db, user).id for user in users}
+
+    def create_invoices(user_id: int) -> list:
+        session = SessionLocal()
+        try:
+            return [
+                invoice_service.create_invoice(session, _invoice_data(client_ids[user_id]), user_id).invoice_number
+                for _ in range(INVOICES_PER_THREAD)
+            ]
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        # Half the threads create invoices for each user, interleaved
+        futures = [(user.id, pool.submit(create_invoices, user.id)) for user in users for _ in range(THREADS // 2)]
+        numbers = {user.id: [] for user in users}
+        for user_id, future in futures:
+            numbers[user_id] += future.result()
+
+    expected = sorted(_number(n) for n in range(1, THREADS // 2 * INVOICES_PER_THREAD + 1))
+    for user_id in numbers:
+        assert sorted(numbers[user_id]) == expected
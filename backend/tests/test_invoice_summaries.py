@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+from app.db import SessionLocal
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.invoice_summary import InvoiceSummary
+from app.services import invoice_summary_service
+
+THREADS = 8
+
+
+def _make_client(db, user) -> Client:
+    client = Client(user_id=user.id, contact_name="Client", contact_email="client@example.com")
+    db.add(client)
+    db.commit()
+    return client
+
+
+def _buckets(db, client_id: int) -> dict:
+    return {
+        (row.status, row.period): (row.invoice_count, Decimal(str(row.total)))
+        for row in db.query(InvoiceSummary).filter(InvoiceSummary.client_id == client_id)
+    }
+
+
+def test_concurrent_first_writes_share_a_bucket(db, make_user):
+    user = make_user()
+    client_id = _make_client(db, user).id
+    bucket = (user.id, client_id, InvoiceStatus.DRAFT, "2026-01", Decimal("10.00"))
+
+    def add():
+        session = SessionLocal()
+        try:
+            invoice_summary_service.apply_bucket(session, bucket, 1)
+            session.commit()
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        for future in [pool.submit(add) for _ in range(THREADS * 4)]:
+            future.result()
+
+    assert _buckets(db, client_id) == {(InvoiceStatus.DRAFT, "2026-01"): (THREADS * 4, Decimal("320.00"))}
+
+
+def test_removing_the_last_invoice_drops_the_bucket(db, make_user):
+    user = make_user()
+    client_id = _make_client(db, user).id
+    bucket = (user.id, client_id, InvoiceStatus.SENT, "2026-02", Decimal("5.00"))
+    invoice_summary_service.apply_bucket(db, bucket, 1)
+    invoice_summary_service.apply_bucket(db, bucket, 1)
+    invoice_summary_service.apply_bucket(db, bucket, -1)
+    db.commit()
+    assert _buckets(db, client_id) == {(InvoiceStatus.SENT, "2026-02"): (1, Decimal("5.00"))}
+
+    invoice_summary_service.apply_bucket(db, bucket, -1)
+    db.commit()
+    assert _buckets(db, client_id) == {}
+
+
+def test_invoice_without_issue_date_uses_created_month(db, make_user):
+    user = make_user()
+    client_id = _make_client(db, user).id
+    invoice = Invoice(
+        user_id=user.id, client_id=client_id, invoice_number="NO-ISSUE-DATE",
+        created_at=datetime(2025, 3, 14), total=Decimal("7.00")
+    )
+    db.add(invoice)
+    db.flush()
+    # Only rows from before issue_date had a default lack one
+    invoice.issue_date = None
+    db.flush()
+    invoice_summary_service.apply_bucket(db, invoice_summary_service.invoice_bucket(invoice), 1)
+    db.commit()
+
+    assert _buckets(db, client_id) == {(InvoiceStatus.DRAFT, "2025-03"): (1, Decimal("7.00"))}
+    assert not [m for m in invoice_summary_service.verify_summaries(db) if m[0][1] == client_id]
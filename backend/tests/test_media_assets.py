@@ -0,0 +1,171 @@
+import asyncio
+import io
+import os
+import time
+
+from app.models.media_asset import MediaAsset, PendingMediaDeletion
+from app.services import media_cleanup_service, media_service, storage_service
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def _upload(content: bytes) -> str:
+    return asyncio.run(media_service.upload_media_stream(io.BytesIO(content), "image", "image.png"))
+
+
+def _asset(db, url: str):
+    db.expire_all()
+    return db.query(MediaAsset).filter(MediaAsset.url == url).first()
+
+
+def test_upload_holds_a_reference_until_its_record_takes_it(db, make_project):
+    project = make_project()
+    url = _upload(PNG + b"held" * 100)
+    assert _asset(db, url).ref_count == 1
+
+    media = media_service.create_project_media(db, project.id, url, media_type="image")
+    assert media.asset_id == _asset(db, url).id
+    assert _asset(db, url).ref_count == 1
+
+
+def test_failed_upload_cleanup_keeps_an_asset_another_upload_found(db, make_project):
+    project = make_project()
+    content = PNG + b"shared" * 100
+    first_url = _upload(content)
+    second_url = _upload(content)
+    assert first_url == second_url
+    assert _asset(db, first_url).ref_count == 2
+
+    # The first upload's record couldn't be created, so it gives its reference back
+    assert media_service.delete_media_file(first_url, "image")
+    asset = _asset(db, first_url)
+    assert asset is not None and asset.ref_count == 1
+
+    media = media_service.create_project_media(db, project.id, second_url, media_type="image")
+    assert media.asset_id == asset.id
+    assert _asset(db, second_url).ref_count == 1
+
+
+def test_cleanup_of_the_only_reference_queues_the_file(db):
+    url = _upload(PNG + b"orphan" * 100)
+    storage_key = _asset(db, url).storage_key
+    assert media_service.delete_media_file(url, "image")
+
+    assert _asset(db, url) is None
+    assert db.query(PendingMediaDeletion).filter(PendingMediaDeletion.storage_key == storage_key).count() == 1
+
+
+def test_storage_key_extension_comes_from_the_content(db):
+    url = asyncio.run(media_service.upload_media_stream(io.BytesIO(PNG + b"named" * 100), "image", "page.html"))
+    assert _asset(db, url).storage_key.endswith(".png")
+
+
+def test_huge_image_is_measured_without_a_placeholder():
+    from PIL import Image
+
+    from app.services import media_metadata_service
+
+    buffer = io.BytesIO()
+    Image.new("1", (5000, 4000)).save(buffer, format="PNG")
+    metadata = media_metadata_service.extract_metadata(buffer, "image", buffer.tell())
+    assert (metadata["width"], metadata["height"]) == (5000, 4000)
+    assert "placeholder" not in metadata
+
+
+def test_reupload_survives_its_queued_deletion(db):
+    content = PNG + b"again" * 100
+    url = _upload(content)
+    storage_key = _asset(db, url).storage_key
+    assert media_service.delete_media_file(url, "image")
+
+    # Identical content comes back before the queue is drained
+    url = _upload(content)
+    media_cleanup_service.drain_pending_deletions(db)
+
+    assert _asset(db, url).ref_count == 1
+    assert storage_service.get_storage()._path(storage_key).exists()
+    assert db.query(PendingMediaDeletion).filter(PendingMediaDeletion.storage_key == storage_key).count() == 0
+
+
+def test_reupload_stores_again_after_a_drain_deletes_its_file(db, monkeypatch):
+    content = PNG + b"raced" * 100
+    url = _upload(content)
+    storage_key = _asset(db, url).storage_key
+    assert media_service.delete_media_file(url, "image")
+
+    # The drain runs between the re-upload storing its file and registering it
+    storage = storage_service.get_storage()
+    save = storage.save
+    drained = []
+
+    def save_then_drain(*args, **kwargs):
+        saved = save(*args, **kwargs)
+        if not drained:
+            drained.append(media_cleanup_service.run_deletion_worker())
+        return saved
+
+    monkeypatch.setattr(storage, "save", save_then_drain)
+    url = _upload(content)
+
+    assert drained == [1]
+    assert _asset(db, url).ref_count == 1
+    assert storage._path(storage_key).exists()
+
+
+def test_reconcile_keeps_an_old_asset_an_upload_holds(db, monkeypatch):
+    monkeypatch.setattr(media_cleanup_service.settings, "MEDIA_RECONCILE_GRACE", 60)
+    content = PNG + b"old" * 100
+    url = _upload(content)
+    asset = _asset(db, url)
+    storage_key = asset.storage_key
+    # Its only record was deleted long ago, and now an upload finds it again
+    asset.ref_count = 0
+    db.commit()
+    path = storage_service.get_storage()._path(storage_key)
+    old = time.time() - 3600
+    os.utime(path, (old, old))
+    assert _upload(content) == url
+
+    orphans = media_cleanup_service.reconcile_storage(db)
+
+    assert storage_key not in orphans
+    assert _asset(db, url).ref_count == 1
+    assert db.query(PendingMediaDeletion).filter(PendingMediaDeletion.storage_key == storage_key).count() == 0
+
+
+def test_reconcile_reclaims_an_old_unreferenced_asset(db, monkeypatch):
+    monkeypatch.setattr(media_cleanup_service.settings, "MEDIA_RECONCILE_GRACE", 60)
+    url = _upload(PNG + b"unused" * 100)
+    asset = _asset(db, url)
+    storage_key = asset.storage_key
+    asset.ref_count = 0
+    db.commit()
+    old = time.time() - 3600
+    os.utime(storage_service.get_storage()._path(storage_key), (old, old))
+
+    assert storage_key in media_cleanup_service.reconcile_storage(db)
+    assert _asset(db, url) is None
+
+
+def test_oversized_upload_is_refused_before_its_body_is_read(make_project, make_user, client, auth_headers):
+    project = make_project()
+    headers = {
+        **auth_headers(make_user()),
+        "Content-Type": "multipart/form-data; boundary=x",
+        "Content-Length": str(media_service.MAX_VIDEO_SIZE * 2),
+    }
+    response = client.post(f"/api/v1/admin/projects/{project.id}/media", content=b"--x--\r\n", headers=headers)
+    assert response.status_code == 413
+
+
+def test_oversized_chunked_upload_is_cut_off(make_project, make_user, client, auth_headers):
+    project = make_project()
+
+    def body():
+        yield b'--x\r\nContent-Disposition: form-data; name="file"; filename="video.mp4"\r\n\r\n'
+        for _ in range(media_service.MAX_VIDEO_SIZE // (1024 * 1024) + 2):
+            yield b"\0" * (1024 * 1024)
+
+    headers = {**auth_headers(make_user()), "Content-Type": "multipart/form-data; boundary=x"}
+    response = client.post(f"/api/v1/admin/projects/{project.id}/media", content=body(), headers=headers)
+    assert response.status_code == 413
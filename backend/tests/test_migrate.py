@@ -0,0 +1,26 @@
+import json
+
+from app.commands import migrate
+
+
+def test_fingerprint_changes_with_same_size_edits(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrate, "VERSIONS_DIR", tmp_path)
+    script = tmp_path / "0001_initial.py"
+    script.write_text("revision = 'aaaa'\n")
+    before = migrate.versions_fingerprint()
+
+    script.write_text("revision = 'bbbb'\n")
+    assert migrate.versions_fingerprint() != before
+
+
+def test_edited_migrations_make_head_file_stale(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrate, "VERSIONS_DIR", tmp_path / "versions")
+    monkeypatch.setattr(migrate, "HEAD_FILE", tmp_path / "head.json")
+    migrate.VERSIONS_DIR.mkdir()
+    script = migrate.VERSIONS_DIR / "0001_initial.py"
+    script.write_text("down_revision = None\n")
+    migrate.HEAD_FILE.write_text(json.dumps({"heads": ["0001"], "versions": migrate.versions_fingerprint()}))
+    assert migrate.expected_heads() == {"0001"}
+
+    script.write_text("down_revision = 'x'\n")
+    assert migrate.expected_heads() is None
@@ -0,0 +1,47 @@
+def test_old_slug_of_unpublished_project_is_not_redirected(make_project, client, auth_headers, make_user):
+    headers = auth_headers(make_user())
+    project = make_project(is_published=False)
+    old_slug = project.slug
+    response = client.put(f"/api/v1/admin/projects/{project.id}", json={"title": f"Renamed {project.id}"}, headers=headers)
+    assert response.status_code == 200, response.text
+    new_slug = response.json()["slug"]
+
+    response = client.get(f"/projects/{old_slug}", follow_redirects=False)
+    assert response.status_code == 404
+
+    response = client.put(f"/api/v1/admin/projects/{project.id}", json={"is_published": True}, headers=headers)
+    assert response.status_code == 200, response.text
+    response = client.get(f"/projects/{old_slug}", follow_redirects=False)
+    assert response.status_code == 301
+    assert response.headers["location"] == f"/projects/{new_slug}"
+
+
+def test_unknown_slugs_are_not_cached(db, client):
+    from app.core.cache import get_cache
+    from app.services.project_service import SLUG_REDIRECTS
+
+    for number in range(3):
+        response = client.get(f"/projects/no-such-project-{number}", follow_redirects=False)
+        assert response.status_code == 404
+        assert get_cache().get(SLUG_REDIRECTS, f"no-such-project-{number}") is None
+
+
+def test_card_fragments_cache_only_reachable_pages(make_project, client):
+    from datetime import date
+    from app.core.cache import get_cache
+    from app.services import project_service
+
+    for _ in range(3):
+        make_project()
+    cache = get_cache()
+
+    assert client.get("/projects/fragment?cursor=not-a-cursor").status_code == 400
+    assert client.get("/projects/fragment?tag=no-such-tag").status_code == 404
+
+    made_up = project_service.encode_cursor(date(2001, 1, 1), 999999)
+    assert client.get(f"/projects/fragment?cursor={made_up}").status_code == 200
+    assert cache.get(project_service.PUBLIC_PAGES, f"cards::{made_up}") is None
+
+    response = client.get("/projects/fragment")
+    assert response.status_code == 200
+    assert cache.get(project_service.PUBLIC_PAGES, "cards::") is not None
@@ -0,0 +1,12 @@
+def test_whitespace_query_matches_nothing(make_user, client, auth_headers):
+    headers = auth_headers(make_user())
+    response = client.post("/api/v1/admin/clients", json={"contact_name": "Ada Lovelace", "contact_email": "ada@example.com"}, headers=headers)
+    assert response.status_code in (200, 201), response.text
+
+    response = client.get("/api/v1/admin/search", params={"q": "Ada"}, headers=headers)
+    assert response.json()["total"] == 1
+
+    response = client.get("/api/v1/admin/search", params={"q": "   "}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["total"] == 0
+    assert response.json()["results"] == []
@@ -0,0 +1,102 @@
+import asyncio
+import fcntl
+import hashlib
+import threading
+
+import pytest
+
+from app.services import upload_session_service
+
+CONTENT = b"\x89PNG\r\n\x1a\n" + b"chunked" * 1000
+
+
+async def _pieces(data: bytes, delay: float = 0):
+    for start in range(0, len(data), 1000):
+        await asyncio.sleep(delay)
+        yield data[start:start + 1000]
+
+
+def _checksum(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _session() -> dict:
+    return upload_session_service.create_session(project_id=1, filename="image.png", size=len(CONTENT))
+
+
+def test_concurrent_appends_at_one_offset_are_serialized():
+    session = _session()
+
+    async def race():
+        return await asyncio.gather(*(
+            upload_session_service.append_chunk(session, 0, _pieces(CONTENT, delay=0.001), _checksum(CONTENT))
+            for _ in range(2)
+        ), return_exceptions=True)
+
+    results = asyncio.run(race())
+    assert sum(isinstance(result, dict) for result in results) == 1
+    assert sum(isinstance(result, upload_session_service.UploadBusyError) for result in results) == 1
+
+    saved = upload_session_service.get_session(session["upload_id"])
+    assert saved["received"] == len(CONTENT) and saved["media_type"] == "image"
+    assert upload_session_service._data_path(session["upload_id"]).read_bytes() == CONTENT
+
+
+def test_append_is_refused_while_another_worker_holds_the_lock():
+    session = _session()
+    with open(upload_session_service._data_path(session["upload_id"]), "r+b") as other_worker:
+        fcntl.flock(other_worker, fcntl.LOCK_EX)
+        with pytest.raises(upload_session_service.UploadBusyError):
+            asyncio.run(upload_session_service.append_chunk(session, 0, _pieces(CONTENT), _checksum(CONTENT)))
+
+
+def test_append_uses_the_latest_state_not_the_callers_copy():
+    session = _session()
+    first, rest = CONTENT[:3000], CONTENT[3000:]
+    asyncio.run(upload_session_service.append_chunk(session, 0, _pieces(first), _checksum(first)))
+
+    # session still says 0 bytes received
+    with pytest.raises(upload_session_service.OffsetMismatchError):
+        asyncio.run(upload_session_service.append_chunk(session, 0, _pieces(first), _checksum(first)))
+    saved = asyncio.run(upload_session_service.append_chunk(session, 3000, _pieces(rest), _checksum(rest)))
+    assert saved["received"] == len(CONTENT)
+
+
+def test_bad_checksum_rolls_back_the_chunk():
+    session = _session()
+    with pytest.raises(ValueError):
+        asyncio.run(upload_session_service.append_chunk(session, 0, _pieces(CONTENT), "00"))
+    assert upload_session_service._data_path(session["upload_id"]).stat().st_size == 0
+
+
+def test_concurrent_completions_process_the_upload_once():
+    session = _session()
+    asyncio.run(upload_session_service.append_chunk(session, 0, _pieces(CONTENT), _checksum(CONTENT)))
+    barrier = threading.Barrier(4)
+    results = []
+
+    def complete():
+        barrier.wait()
+        try:
+            results.append(upload_session_service.mark_processing(session["upload_id"]))
+        except ValueError as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=complete) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(isinstance(result, dict) for result in results) == 1
+    assert upload_session_service.get_session(session["upload_id"])["state"] == "processing"
+
+
+def test_completion_is_refused_while_a_chunk_is_being_written():
+    session = _session()
+    asyncio.run(upload_session_service.append_chunk(session, 0, _pieces(CONTENT), _checksum(CONTENT)))
+    with open(upload_session_service._data_path(session["upload_id"]), "r+b") as other_worker:
+        fcntl.flock(other_worker, fcntl.LOCK_EX)
+        with pytest.raises(upload_session_service.UploadBusyError):
+            upload_session_service.mark_processing(session["upload_id"])
+    assert upload_session_service.get_session(session["upload_id"])["state"] == "uploading"
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHECK = "import app.wsgi; from app.core.config import settings; print(settings.RUN_BACKGROUND_JOBS)"
+
+
+def _jobs_enabled(env: dict) -> str:
+    result = subprocess.run([sys.executable, "-c", CHECK], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_wsgi_processes_skip_background_jobs_by_default():
+    env = {key: value for key, value in os.environ.items() if key != "RUN_BACKGROUND_JOBS"}
+    assert _jobs_enabled(env) == "False"
+
+
+def test_wsgi_background_jobs_can_be_enabled_explicitly():
+    assert _jobs_enabled({**os.environ, "RUN_BACKGROUND_JOBS": "true"}) == "True"
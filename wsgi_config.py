@@ -14,8 +14,5 @@ if venv_site_packages not in sys.path:
 # Change to project directory
 os.chdir(project_home)
 
-# Import FastAPI app and wrap with ASGI-to-WSGI adapter
-from app.main import app
-from a2wsgi import ASGIMiddleware
-
-application = ASGIMiddleware(app)
+# WSGI app: static files served directly, the rest bridged to FastAPI
+from app.wsgi import application